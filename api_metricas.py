@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from dados import carimbos_planilhas, carregar_dados_gerenciais, carregar_mapeamento
+from indicadores import (aplicar_filtros, calcular_entregas_por_projeto, calcular_metricas, gerar_alertas,
+                         gerar_alertas_contratuais, get_cache_signature)
+from motor_sql import COLUNAS_FILTRO
+from versao_dados import CacheLRU, versao_dataset
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORTA = int(os.getenv("API_PORTA", "8502"))
+
+# Intervalo mínimo entre conferências das planilhas; mudou o arquivo, a base é recarregada
+API_VERIFICAR_INTERVALO = float(os.getenv("API_VERIFICAR_INTERVALO", "5"))
+
+# Respostas JSON prontas, por ETag (versão dos dados + rota + filtros + dia)
+_respostas = CacheLRU(maxsize=256)
+
+
+class BaseCompartilhada:
+    """Planilhas carregadas uma vez por processo e lidas por todas as requisições.
+
+    `atual()` devolve um retrato imutável (df, contratos, timeline, versão); a
+    troca por uma base nova é atômica, então uma requisição nunca mistura versões.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._estado = None
+        self._carimbos = None
+        self._verificado_em = 0.0
+
+    def atual(self):
+        estado = self._estado
+        if estado is not None and time.monotonic() - self._verificado_em < API_VERIFICAR_INTERVALO:
+            return estado
+        with self._lock:
+            if self._estado is None or time.monotonic() - self._verificado_em >= API_VERIFICAR_INTERVALO:
+                carimbos = carimbos_planilhas()
+                if carimbos != self._carimbos:
+                    df, _ = carregar_mapeamento()
+                    dfcontratos, dftimeline = carregar_dados_gerenciais()
+                    versao = hashlib.sha1(
+                        f"{versao_dataset(df)}|{versao_dataset(dfcontratos)}|{versao_dataset(dftimeline)}".encode()
+                    ).hexdigest()[:12]
+                    self._estado = (df, dfcontratos, dftimeline, versao)
+                    self._carimbos = carimbos
+                self._verificado_em = time.monotonic()
+            return self._estado
+
+
+base = BaseCompartilhada()
+
+
+def _alertas(lista):
+    return [{'nivel': nivel, 'mensagem': mensagem} for nivel, mensagem in lista]
+
+
+def rota_metricas(df, dfcontratos, dftimeline, filtros):
+    return calcular_metricas(aplicar_filtros(df, filtros))
+
+
+def rota_entregas(df, dfcontratos, dftimeline, filtros):
+    return calcular_entregas_por_projeto(aplicar_filtros(df, filtros), dfcontratos).to_dict('records')
+
+
+def rota_alertas(df, dfcontratos, dftimeline, filtros):
+    # Como no dashboard: os alertas contratuais olham a base inteira
+    return {
+        'base': _alertas(gerar_alertas(aplicar_filtros(df, filtros))),
+        'contratos': _alertas(gerar_alertas_contratuais(dfcontratos, calcular_entregas_por_projeto(df, dfcontratos))),
+    }
+
+
+def rota_filtros(df, dfcontratos, dftimeline, filtros):
+    """Valores disponíveis para cada filtro"""
+    return {chave: sorted(map(str, df[coluna].dropna().unique())) if coluna in df.columns else []
+            for chave, coluna in COLUNAS_FILTRO.items()}
+
+
+ROTAS = {
+    '/metricas': rota_metricas,
+    '/entregas': rota_entregas,
+    '/alertas': rota_alertas,
+    '/filtros': rota_filtros,
+}
+
+
+def _json_padrao(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, pd.Timestamp):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} não serializável")
+
+
+def calcular_etag(versao, rota, filtros):
+    """ETag sai só da versão: um 304 não precisa calcular nada"""
+    chave = repr((versao, rota, get_cache_signature(filtros), pd.Timestamp.now().normalize().date()))
+    return '"' + hashlib.sha1(chave.encode()).hexdigest()[:16] + '"'
+
+
+def resposta_json(rota, filtros, estado):
+    """(etag, corpo em bytes) da rota, calculado uma vez por versão e filtros"""
+    df, dfcontratos, dftimeline, versao = estado
+    etag = calcular_etag(versao, rota, filtros)
+
+    def calcular():
+        dados = ROTAS[rota](df, dfcontratos, dftimeline, filtros)
+        corpo = {'versao': versao, 'filtros': filtros, 'dados': dados}
+        return json.dumps(corpo, ensure_ascii=False, default=_json_padrao).encode('utf-8')
+
+    return etag, _respostas.obter_ou_calcular(etag, calcular)
+
+
+def ler_filtros(query):
+    """Filtros da query string (?projetos=A&projetos=B&operadoras=VIVO); ValueError se houver chave desconhecida"""
+    parametros = parse_qs(query)
+    desconhecidas = set(parametros) - set(COLUNAS_FILTRO)
+    if desconhecidas:
+        raise ValueError(f"filtro(s) desconhecido(s): {', '.join(sorted(desconhecidas))}; "
+                         f"use {', '.join(COLUNAS_FILTRO)}")
+    return {chave: sorted(set(valores)) for chave, valores in parametros.items()}
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "BaseMobileAPI/1.0"
+    # Cabeçalho e corpo saem em escritas separadas: com Nagle, cada resposta em keep-alive espera o ACK atrasado
+    disable_nagle_algorithm = True
+
+    def _enviar(self, status, corpo=b"", etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(corpo)
+
+    def _erro(self, status, mensagem):
+        self._enviar(status, json.dumps({'erro': mensagem}, ensure_ascii=False).encode('utf-8'))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        caminho = url.path.rstrip('/') or '/'
+
+        if caminho == '/saude':
+            df, _, _, versao = base.atual()
+            corpo = {'versao': versao, 'linhas': len(df), 'cache': _respostas.estatisticas()}
+            return self._enviar(200, json.dumps(corpo).encode('utf-8'))
+
+        if caminho not in ROTAS:
+            return self._erro(404, f"rota desconhecida; use /saude, {', '.join(ROTAS)}")
+        try:
+            filtros = ler_filtros(url.query)
+        except ValueError as e:
+            return self._erro(400, str(e))
+
+        estado = base.atual()
+        if self.headers.get("If-None-Match") == calcular_etag(estado[3], caminho, filtros):
+            return self._enviar(304, etag=self.headers["If-None-Match"])
+        try:
+            etag, corpo = resposta_json(caminho, filtros, estado)
+        except Exception as e:
+            return self._erro(500, f"{type(e).__name__}: {e}")
+        self._enviar(200, corpo, etag)
+
+    def log_message(self, formato, *args):
+        # Uma linha por requisição não cabe em taxas altas; erros ainda passam por log_error
+        pass
+
+    def log_error(self, formato, *args):
+        sys.stderr.write(f"{self.address_string()} - {formato % args}\n")
+
+
+class ServidorAPI(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def criar_servidor(host=API_HOST, porta=API_PORTA):
+    return ServidorAPI((host, porta), ManipuladorAPI)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON dos indicadores do dashboard (sem Streamlit).")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--porta', type=int, default=API_PORTA)
+    parser.add_argument('-p', '--pasta', default='.', help="pasta com as planilhas (padrão: atual)")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.pasta)
+    df = base.atual()[0]
+    if df.empty:
+        print("❌ Base não encontrada (MAPEAMENTO DE CHIPS.xlsx)", file=sys.stderr)
+        return 2
+
+    servidor = criar_servidor(args.host, args.porta)
+    print(f"API em http://{args.host}:{args.porta} ({len(df)} chips) — rotas: /saude, {', '.join(ROTAS)}",
+          file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,60 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-from pathlib import Path
+from datetime import datetime
 import warnings
 import base64
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import RerunException, add_script_run_ctx, get_script_run_ctx
+from recursos_estaticos import liberar_tipos_estaticos, publicar_assets, css_inline, url_static, exportacao_servivel, DIR_EXPORTS
+import base_compartilhada
+from dados import carregar_dados_gerenciais, carregar_mapeamento
+import graficos
+import indicadores
+import instrumentacao
+import perfil_rerun
+import tabelas_html
+from graficos import COLORS, criar_timeline_projetos
+from indicadores import aplicar_filtros, calcular_metricas, gerar_alertas, get_cache_signature
+from tabelas_html import format_number
+from versao_dados import carimbar, versao_dataset
+from chatbot_pplx import pre_gerar_relatorios
+from exportacao import FORMATOS, INTERVALO_PROGRESSO, LIMITE_DOWNLOAD_MEMORIA, iniciar_exportacao, status_exportacao
+from navegador_chips import (
+    TAMANHOS_PAGINA, colunas_disponiveis, ordenar_posicoes, total_paginas, obter_pagina
+)
+from calendario_vencimentos import (
+    HORIZONTES_PADRAO, GRANULARIDADES, construir_calendario
+)
 
 warnings.filterwarnings('ignore')
 
+# PERFIL: ?perfil=1 ou o botão do painel de desempenho rodam o próximo rerun inteiro sob o cProfile
+def contexto_perfil():
+    df = st.session_state.get('df_filtrado')
+    if df is None:
+        df = st.session_state.get('df_base')
+    return {
+        'pagina': st.session_state.get('pagina_atual'), 'filtros': st.session_state.get('filtros_ativos', {}),
+        'versao_dados': versao_dataset(df) if df is not None else None,
+        'linhas': len(df) if df is not None else None, 'processo': st.get_option('server.port'),
+    }
+
+if not perfil_rerun.ativo() and (st.session_state.get('perfil_pendente') or st.query_params.get('perfil') == '1'):
+    if 'perfil' in st.query_params:
+        del st.query_params['perfil']
+    st.session_state.perfil_pendente = False
+    try:
+        # Antes do set_page_config: o script inteiro roda de novo lá dentro, e este rerun para aqui
+        perfil_rerun.executar_perfilado(__file__, globals(), contexto_perfil)
+    except RerunException:
+        # Rerun cortado (carga inicial, navegação): o pedido continua valendo para o seguinte
+        st.session_state.perfil_pendente = True
+        raise
+    st.stop()
+
 st.set_page_config(
     page_title="Base Mobile | Gestão Integrada",
     page_icon="📊",
@@ -16,21 +62,17 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-COLORS = {
-    'primary': '#1a1a1a', 'secondary': '#8BC34A', 'accent': '#4CAF50',
-    'dark_green': '#2E7D32', 'light_green': '#C5E1A5', 'warning': '#FFB74D',
-    'danger': '#E57373', 'info': '#64B5F6', 'light': '#FAFAFA',
-    'gray': '#BDBDBD', 'dark_gray': '#616161', 'white': '#FFFFFF',
-    'claro': '#FF5252', 'vivo': '#7B1FA2', 'tim': '#1976D2',
-    'oi': '#FDD835', 'algar': '#00C853'
-}
-
-CORES_ACAO = {
-    'ENTREGA': "#4FB853", 'ATIVAÇÃO': '#2196F3', 'VINCULAÇÃO': '#FF9800',
-    'EXPIRAÇÃO': '#F44336', 'CANCELAMENTO': '#9C27B0', 'RENOVAÇÃO': '#00BCD4',
-    'PAGAMENTO': '#8BC34A', 'SUBSTITUIÇÃO': '#FFC107'
-}
+@st.cache_resource(show_spinner=False)
+def obter_assets():
+    """Publica CSS/fontes/logos em static/ uma vez por processo; {} = usar inline"""
+    if not st.get_option('server.enableStaticServing') or not liberar_tipos_estaticos():
+        return {}
+    try:
+        return publicar_assets()
+    except Exception:
+        return {}
 
+@st.cache_data(show_spinner=False)
 def load_logo(variants):
     for v in variants:
         try:
@@ -40,271 +82,67 @@ def load_logo(variants):
             continue
     return None
 
-def normalizar_operadora(operadora):
-    if pd.isna(operadora):
-        return "NÃO INFORMADO"
-    op = str(operadora).strip().upper().split()[0]
-    return {'CLAROTIM': 'CLARO', 'VIVOTIM': 'VIVO', 'TIMCLARO': 'TIM'}.get(op, op)
+def url_logo(nome_logico, variants):
+    url = obter_assets().get(nome_logico)
+    if url:
+        return url
+    logo = load_logo(variants)
+    return f"data:image/png;base64,{logo}" if logo else None
 
-def format_number(num):
-    try:
-        return f"{int(num):,}".replace(',', '.')
-    except:
-        return str(num)
-
-def get_cache_signature(filtros_dict):
-    return (
-        tuple(sorted(filtros_dict.get('projetos', []))),
-        tuple(sorted(filtros_dict.get('operadoras', []))),
-        tuple(sorted(filtros_dict.get('status_op', []))),
-        tuple(sorted(filtros_dict.get('status_licenca', [])))
-    )
+def estilo_tabelas():
+    """<head> das tabelas em iframe: CSS estático se disponível, senão inline"""
+    url = obter_assets().get('css/tabelas.css')
+    if url:
+        return f'<link href="{url}" rel="stylesheet">'
+    return f"<style>{css_inline('css/tabelas.css')}</style>"
 
 def show_premium_loading(message="Processando"):
     return f"""
-    <div style="position: fixed; top: 0; left: 0; width: 100%; height: 100%; background: rgba(26, 26, 26, 0.97); display: flex; flex-direction: column; align-items: center; justify-content: center; z-index: 9999; backdrop-filter: blur(12px);">
-        <div style="position: relative; width: 140px; height: 140px;">
-            <div style="position: absolute; width: 140px; height: 140px; border: 10px solid rgba(139, 195, 74, 0.1); border-top-color: #8BC34A; border-radius: 50%; animation: spin 1.2s cubic-bezier(0.68, -0.55, 0.265, 1.55) infinite;"></div>
-            <div style="position: absolute; top: 20px; left: 20px; width: 100px; height: 100px; border: 8px solid rgba(76, 175, 80, 0.1); border-bottom-color: #4CAF50; border-radius: 50%; animation: spin-reverse 1.8s linear infinite;"></div>
-            <div style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); font-size: 3rem; filter: drop-shadow(0 0 10px rgba(139, 195, 74, 0.5));">⚡</div>
-        </div>
-        <div style="margin-top: 2.5rem; font-size: 1.8rem; font-weight: 900; color: white; text-transform: uppercase; letter-spacing: 2px; animation: pulse 1.5s ease-in-out infinite;">{message}</div>
-        <div style="margin-top: 1.5rem; width: 250px; height: 6px; background: rgba(255, 255, 255, 0.1); border-radius: 3px; overflow: hidden;">
-            <div style="width: 100%; height: 100%; background: linear-gradient(90deg, #8BC34A, #4CAF50, #8BC34A); background-size: 200% 100%; animation: progress 2s ease-in-out infinite;"></div>
-        </div>
+    <div class="premium-loading">
+        <div class="spinner"><div class="ring-outer"></div><div class="ring-inner"></div><div class="bolt">⚡</div></div>
+        <div class="message">{message}</div>
+        <div class="track"><div class="bar"></div></div>
     </div>
-    <style>
-        @keyframes spin {{ 0% {{ transform: rotate(0deg); }} 100% {{ transform: rotate(360deg); }} }}
-        @keyframes spin-reverse {{ 0% {{ transform: rotate(360deg); }} 100% {{ transform: rotate(0deg); }} }}
-        @keyframes pulse {{ 0%, 100% {{ opacity: 1; }} 50% {{ opacity: 0.8; }} }}
-        @keyframes progress {{ 0% {{ background-position: 0% 50%; }} 100% {{ background-position: 200% 50%; }} }}
-    </style>
     """
 
 def aplicar_css():
-    st.markdown(f"""
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800;900&display=swap');
-        * {{ font-family: 'Inter', sans-serif; }}
-        .stApp {{ background: linear-gradient(135deg, #f5f7fa 0%, #e4e9f0 100%); }}
-
-        [data-testid="stSidebar"] {{ 
-            background: rgba(30, 58, 95, 0.85) !important;
-            backdrop-filter: blur(20px) saturate(180%);
-            border-right: 1px solid rgba(255, 255, 255, 0.1);
-        }}
-        [data-testid="stSidebar"] * {{ color: white !important; }}
-
-        [data-testid="stSidebar"] .stButton > button {{ 
-            background: linear-gradient(135deg, rgba(139, 195, 74, 0.2), rgba(76, 175, 80, 0.2)) !important;
-            border: 2px solid rgba(139, 195, 74, 0.5) !important;
-            color: white !important;
-            font-weight: 700 !important;
-            border-radius: 12px !important;
-            transition: all 0.4s ease !important;
-        }}
-        [data-testid="stSidebar"] .stButton > button:hover {{ 
-            background: linear-gradient(135deg, #8BC34A, #4CAF50) !important;
-            transform: translateY(-3px);
-            box-shadow: 0 8px 25px rgba(139, 195, 74, 0.4);
-        }}
-
-        .metric-card {{
-            background: rgba(255, 255, 255, 0.7);
-            backdrop-filter: blur(20px);
-            padding: 2rem 1.5rem;
-            border-radius: 24px;
-            border: 1px solid rgba(255, 255, 255, 0.8);
-            box-shadow: 0 8px 32px rgba(31, 38, 135, 0.15);
-            transition: all 0.6s cubic-bezier(0.23, 1, 0.32, 1);
-            text-align: center;
-            cursor: pointer;
-        }}
-        .metric-card:hover {{
-            transform: translateY(-15px) scale(1.02);
-            box-shadow: 0 25px 80px rgba(139, 195, 74, 0.4);
-        }}
-
-        .metric-icon {{
-            font-size: 2.8rem;
-            margin-bottom: 0.8rem;
-            transition: all 0.5s ease;
-        }}
-        .metric-card:hover .metric-icon {{
-            transform: scale(1.3) rotate(10deg);
-            animation: bounce 0.6s ease infinite;
-        }}
-        @keyframes bounce {{
-            0%, 100% {{ transform: scale(1.3) rotate(10deg) translateY(0); }}
-            50% {{ transform: scale(1.3) rotate(10deg) translateY(-5px); }}
-        }}
-
-        .metric-value {{
-            font-size: 2.8rem;
-            font-weight: 900;
-            margin: 0.8rem 0;
-        }}
-        .metric-label {{
-            font-size: 0.8rem;
-            color: {COLORS['dark_gray']};
-            text-transform: uppercase;
-            letter-spacing: 1.5px;
-            font-weight: 700;
-        }}
-        .metric-delta {{
-            font-size: 0.9rem;
-            font-weight: 600;
-            margin-top: 0.5rem;
-        }}
-        .metric-delta.positive {{ color: {COLORS['accent']}; }}
-        .metric-delta.negative {{ color: {COLORS['danger']}; }}
-
-        .filter-chip {{
-            display: inline-block;
-            background: linear-gradient(135deg, #8BC34A, #4CAF50);
-            color: white;
-            padding: 8px 16px;
-            border-radius: 20px;
-            margin: 4px;
-            font-size: 13px;
-            font-weight: 600;
-            box-shadow: 0 2px 8px rgba(139, 195, 74, 0.3);
-        }}
-
-        .header-parallax {{
-            background: linear-gradient(135deg, #1e3a5f 0%, #2c5282 25%, #8BC34A 75%, #4CAF50 100%);
-            background-size: 400% 400%;
-            animation: gradientShift 15s ease infinite;
-            padding: 2.5rem;
-            border-radius: 24px;
-            margin-bottom: 2rem;
-        }}
-        @keyframes gradientShift {{
-            0%, 100% {{ background-position: 0% 50%; }}
-            50% {{ background-position: 100% 50%; }}
-        }}
-
-        ::-webkit-scrollbar {{ width: 12px; }}
-        ::-webkit-scrollbar-thumb {{ 
-            background: linear-gradient(180deg, {COLORS['secondary']}, {COLORS['accent']}); 
-            border-radius: 10px;
-        }}
-    </style>
-    """, unsafe_allow_html=True)
+    url = obter_assets().get('css/app.css')
+    if url:
+        st.markdown(f'<style>@import url("{url}");</style>', unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>{css_inline('css/app.css')}</style>", unsafe_allow_html=True)
 
 @st.cache_data(ttl=7200, show_spinner=False)
 def load_data_smart():
+    # O corpo só roda quando o cache erra: o painel de desempenho conta o miss
+    instrumentacao.marcar_cache('miss')
     try:
-        excel_path = Path("MAPEAMENTO DE CHIPS.xlsx")
-        parquet_path = Path(".cache_mapeamento.parquet")
-
-        if parquet_path.exists() and excel_path.exists():
-            excel_mtime = excel_path.stat().st_mtime
-            parquet_mtime = parquet_path.stat().st_mtime
-            if parquet_mtime >= excel_mtime:
-                try:
-                    return pd.read_parquet(parquet_path), True
-                except:
-                    pass
-
-        if not excel_path.exists():
-            return pd.DataFrame(), False
-
-        all_sheets = pd.read_excel(excel_path, sheet_name=None, engine='openpyxl')
-        dfs = []
-        for sheet_name, df_sheet in all_sheets.items():
-            df_sheet.columns = df_sheet.columns.str.strip().str.upper()
-            if 'PROJETO' not in df_sheet.columns:
-                df_sheet['PROJETO'] = sheet_name
-            dfs.append(df_sheet)
-
-        df = pd.concat(dfs, ignore_index=True)
-
-        if 'ICCID' in df.columns:
-            df['ICCID'] = df['ICCID'].astype(str)
-        if 'OPERADORA' in df.columns:
-            df['OPERADORA'] = df['OPERADORA'].apply(normalizar_operadora)
-
-        date_cols = ['DATA DE ENTREGA', 'DATA DE ATIVAÇÃO', 'DATA DE VENCIMENTO', 'ÚLTIMA CONEXÃO']
-        for col in date_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-
-        hoje = pd.Timestamp.now().normalize()
-
-        if 'DATA DE VENCIMENTO' in df.columns:
-            df['STATUS_LICENCA'] = df['DATA DE VENCIMENTO'].apply(
-                lambda x: 'Expirado' if pd.notna(x) and x < hoje else 'Válido')
-
-        if 'ÚLTIMA CONEXÃO' in df.columns:
-            def categorizar(data):
-                if pd.isna(data):
-                    return 'Nunca Conectou'
-                dias = (hoje - data).days
-                if dias <= 30:
-                    return '0-30 dias'
-                elif dias <= 90:
-                    return '31-90 dias'
-                elif dias <= 180:
-                    return '91-180 dias'
-                return 'Mais de 180 dias'
-            df['CATEGORIA_CONEXAO'] = df['ÚLTIMA CONEXÃO'].apply(categorizar)
-
-        if 'STATUS NA OP.' in df.columns:
-            df['STATUS NA OP.'] = df['STATUS NA OP.'].fillna('Não Informado').astype(str).str.strip().str.title()
-
-        try:
-            df.to_parquet(parquet_path, compression='snappy', index=False)
-        except:
-            pass
-
-        return df, False
+        return carregar_mapeamento()
     except Exception as e:
         st.error(f"❌ Erro ao carregar MAPEAMENTO: {str(e)}")
         return pd.DataFrame(), False
 
 @st.cache_data(ttl=7200, show_spinner=False)
 def load_dados_gerenciais():
+    instrumentacao.marcar_cache('miss')
     try:
-        excel_path = Path("DADOS-GERENCIAIS.xlsx")
-        if not excel_path.exists():
-            return None, None
-
-        df_contratos = pd.read_excel(excel_path, sheet_name='DADOS CONTRATUAIS', engine='openpyxl')
-        df_timeline = pd.read_excel(excel_path, sheet_name='TIMELINE', engine='openpyxl')
-
-        df_contratos = df_contratos.dropna(how='all').dropna(subset=['PROJETO'])
-        df_timeline = df_timeline.dropna(how='all').dropna(subset=['PROJETO'])
-
-        for df in [df_contratos, df_timeline]:
-            for col in df.select_dtypes(include=['object']).columns:
-                df[col] = df[col].astype(str).str.strip()
-            df.columns = df.columns.str.strip().str.upper()
-
-        df_contratos.reset_index(drop=True, inplace=True)
-        df_timeline.reset_index(drop=True, inplace=True)
-
-        if 'DATA' in df_timeline.columns:
-            df_timeline['DATA'] = pd.to_datetime(df_timeline['DATA'], errors='coerce')
-
-        return df_contratos, df_timeline
+        return carregar_dados_gerenciais()
     except Exception as e:
         st.warning(f"⚠️ Dados gerenciais não carregados: {str(e)}")
         return None, None
 
-def aplicar_filtros(df, filtros):
-    if not filtros or not any(filtros.values()):
-        return df
-    mask = pd.Series(True, index=df.index)
-    if filtros.get('projetos'):
-        mask &= df['PROJETO'].isin(filtros['projetos'])
-    if filtros.get('operadoras'):
-        mask &= df['OPERADORA'].isin(filtros['operadoras'])
-    if filtros.get('status_op'):
-        mask &= df['STATUS NA OP.'].isin(filtros['status_op'])
-    if filtros.get('status_licenca'):
-        mask &= df['STATUS_LICENCA'].isin(filtros['status_licenca'])
-    return df[mask]
+def carregar_bases():
+    """(base, contratos, timeline); rodando em vários processos, mapeados da memória compartilhada"""
+    if base_compartilhada.ativa():
+        try:
+            return base_compartilhada.anexar()
+        except FileNotFoundError as e:
+            st.error(f"❌ Base compartilhada indisponível: {str(e)}")
+            return pd.DataFrame(), None, None
+    df, _ = load_data_smart()
+    # st.cache_data devolve cópias, e o carimbo vale por objeto: carimba a cópia desta sessão
+    return tuple(carimbar(d, d.attrs['versao']) if d is not None and 'versao' in d.attrs else d
+                 for d in (df, *load_dados_gerenciais()))
 
 def calcular_preview(df, filtros_temp):
     if not any(filtros_temp.values()):
@@ -313,536 +151,173 @@ def calcular_preview(df, filtros_temp):
 
 @st.cache_data(ttl=1800)
 def calcular_metricas_cached(cache_signature):
-    df = st.session_state.df_filtrado
-    hoje = pd.Timestamp.now().normalize()
-    df_venc = df[df['DATA DE VENCIMENTO'].notna()]
-
-    validas = int((df_venc['DATA DE VENCIMENTO'] > hoje).sum())
-    expiradas = int((df_venc['DATA DE VENCIMENTO'] <= hoje).sum())
-    total = len(df)
-
-    pct_validas = (validas / total * 100) if total > 0 else 0
-    conectadas_30d = (df['CATEGORIA_CONEXAO'] == '0-30 dias').sum() if 'CATEGORIA_CONEXAO' in df.columns else 0
-    pct_conectadas = (conectadas_30d / total * 100) if total > 0 else 0
-
-    venc_30 = df[(df['DATA DE VENCIMENTO'] > hoje) & 
-                 (df['DATA DE VENCIMENTO'] <= hoje + pd.Timedelta(days=30))]
-    sem_alerta = total - len(venc_30)
-    pct_sem_alerta = (sem_alerta / total * 100) if total > 0 else 0
-
-    health_score = (pct_validas * 0.4) + (pct_conectadas * 0.3) + (pct_sem_alerta * 0.3)
-    chips_com_conexao = df['ÚLTIMA CONEXÃO'].notna().sum() if 'ÚLTIMA CONEXÃO' in df.columns else 0
-    taxa_utilizacao = (chips_com_conexao / total * 100) if total > 0 else 0
-
-    return {
-        'total': total, 'vinculadas': total, 'perc_vinculadas': 100.0,
-        'saldo': 0, 'validas': validas, 'expiradas': expiradas,
-        'health_score': round(health_score, 1),
-        'taxa_utilizacao': round(taxa_utilizacao, 1),
-        'conectadas_30d': conectadas_30d
-    }
+    instrumentacao.marcar_cache('miss')
+    return calcular_metricas(st.session_state.df_filtrado)
 
 def calcular_entregas_por_projeto():
-    df_chips = st.session_state.df_base
-    df_contratos = st.session_state.df_contratos
-
-    if df_contratos is None:
-        return pd.DataFrame()
-
-    entregas = []
-
-    for projeto in df_chips['PROJETO'].unique():
-        df_proj = df_chips[df_chips['PROJETO'] == projeto]
-        total = len(df_proj)
-        contrato = df_contratos[df_contratos['PROJETO'] == projeto]
-        if contrato.empty:
-            continue
-
-        previstas = contrato['TOTAL DE LICENÇAS PREVISTAS'].values[0]
-        pct_entregue = (total / previstas * 100) if previstas > 0 else 0
-
-        claro = len(df_proj[df_proj['OPERADORA'] == 'CLARO'])
-        vivo = len(df_proj[df_proj['OPERADORA'] == 'VIVO'])
-        tim = len(df_proj[df_proj['OPERADORA'] == 'TIM'])
-        algar = len(df_proj[df_proj['OPERADORA'] == 'ALGAR'])
-
-        funcionais = len(df_proj[df_proj['STATUS NA OP.'].isin(['Ativo', 'Suspenso'])])
-        pct_funcional = (funcionais / total * 100) if total > 0 else 0
-
-        entregas.append({
-            'PROJETO': projeto,
-            'TOTAL ENTREGUES': total,
-            '% ENTREGUES': round(pct_entregue, 1),
-            'CLARO': claro,
-            'VIVO': vivo,
-            'TIM': tim,
-            'ALGAR': algar,
-            'FUNCIONAIS': funcionais,
-            '% FUNCIONAIS': round(pct_funcional, 1)
-        })
-
-    return pd.DataFrame(entregas)
+    return indicadores.calcular_entregas_por_projeto(st.session_state.df_base, st.session_state.df_contratos)
 
 def gerar_html_tabela_entregas(df_entregas):
-    """Gera HTML da tabela de entregas - USAR COM st.components.v1.html()"""
-    if df_entregas.empty:
-        return "<p>Nenhum dado disponível</p>"
-
-    linhas = []
-    for _, row in df_entregas.iterrows():
-        pct_ent = row['% ENTREGUES']
-        cor_ent = '#4CAF50' if pct_ent >= 90 else ('#FFB74D' if pct_ent >= 70 else '#E57373')
-
-        pct_func = row['% FUNCIONAIS']
-        cor_func = '#4CAF50' if pct_func >= 80 else ('#FFB74D' if pct_func >= 60 else '#E57373')
-
-        linhas.append(f"""
-        <tr style="border-bottom: 1px solid rgba(0,0,0,0.1);">
-            <td style="padding: 0.8rem; font-weight: 600;">{row['PROJETO']}</td>
-            <td style="padding: 0.8rem; text-align: center;">{format_number(row['TOTAL ENTREGUES'])}</td>
-            <td style="padding: 0.8rem; text-align: center; background: {cor_ent}20; color: {cor_ent}; font-weight: 700;">{pct_ent:.1f}%</td>
-            <td style="padding: 0.8rem; text-align: center;">{format_number(row['CLARO'])}</td>
-            <td style="padding: 0.8rem; text-align: center;">{format_number(row['VIVO'])}</td>
-            <td style="padding: 0.8rem; text-align: center;">{format_number(row['TIM'])}</td>
-            <td style="padding: 0.8rem; text-align: center;">{format_number(row['ALGAR'])}</td>
-            <td style="padding: 0.8rem; text-align: center;">{format_number(row['FUNCIONAIS'])}</td>
-            <td style="padding: 0.8rem; text-align: center; background: {cor_func}20; color: {cor_func}; font-weight: 700;">{pct_func:.1f}%</td>
-        </tr>
-        """)
-
-    html_final = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
-        <style>
-            * {{ font-family: 'Inter', sans-serif; margin: 0; padding: 0; }}
-            body {{ background: transparent; }}
-            .container {{
-                background: rgba(255,255,255,0.7);
-                backdrop-filter: blur(20px);
-                border-radius: 16px;
-                padding: 1rem;
-                overflow-x: auto;
-            }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-            }}
-            thead tr {{
-                background: linear-gradient(135deg, #1e3a5f, #2c5282);
-                color: white;
-            }}
-            th {{
-                padding: 1rem;
-                text-align: center;
-                font-weight: 700;
-                font-size: 0.9rem;
-            }}
-            th:first-child {{
-                text-align: left;
-            }}
-            tbody tr:hover {{
-                background: rgba(139, 195, 74, 0.05);
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <table>
-                <thead>
-                    <tr>
-                        <th>PROJETO</th>
-                        <th>TOTAL</th>
-                        <th>% ENTREGUES</th>
-                        <th>CLARO</th>
-                        <th>VIVO</th>
-                        <th>TIM</th>
-                        <th>ALGAR</th>
-                        <th>FUNCIONAIS</th>
-                        <th>% FUNCIONAIS</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join(linhas)}
-                </tbody>
-            </table>
-        </div>
-    </body>
-    </html>
-    """
-
-    return html_final
+    return tabelas_html.gerar_html_tabela_entregas(df_entregas, estilo_tabelas())
 
 def gerar_html_tabela_contratos(df_contratos):
-    """Gera HTML da tabela de contratos - ESTILO IDÊNTICO À DE ENTREGAS"""
-    if df_contratos.empty:
-        return "<p>Nenhum dado disponível</p>"
-
-    linhas = []
-    for _, row in df_contratos.iterrows():
-        status = row['STATUS ATUAL DO CONTRATO']
-
-        # Cores por status
-        if status == 'VÁLIDO':
-            cor_status = '#4CAF50'
-        elif status == 'EXPIRANDO':
-            cor_status = '#FFB74D'
-        elif status == 'EXPIRADO':
-            cor_status = '#E57373'
-        elif status == 'EM RENOVAÇÃO':
-            cor_status = '#64B5F6'
-        else:
-            cor_status = '#BDBDBD'
-
-        # Formatar datas
-        data_inicial = pd.to_datetime(row['DATA INICIAL'], errors='coerce')
-        data_inicial_fmt = data_inicial.strftime('%d/%m/%Y') if pd.notna(data_inicial) else '-'
+    return tabelas_html.gerar_html_tabela_contratos(df_contratos, estilo_tabelas())
 
-        data_renovacao = pd.to_datetime(row['DATA DA ÚLTIMA RENOVAÇÃO CONTRATUAL'], errors='coerce')
-        data_renovacao_fmt = data_renovacao.strftime('%d/%m/%Y') if pd.notna(data_renovacao) else '-'
+@st.cache_data(ttl=600, show_spinner=False)
+def obter_ordem_chips(cache_signature, coluna, ascendente, busca):
+    instrumentacao.marcar_cache('miss')
+    return ordenar_posicoes(st.session_state.df_filtrado, coluna, ascendente, busca)
 
-        # Formatar licenças previstas
-        try:
-            licencas = format_number(row['TOTAL DE LICENÇAS PREVISTAS'])
-        except:
-            licencas = str(row['TOTAL DE LICENÇAS PREVISTAS']) if pd.notna(row['TOTAL DE LICENÇAS PREVISTAS']) else '-'
-
-        # Formatar duração
-        duracao = f"{row['DURAÇÃO CONTRATUAL (MESES)']} m" if pd.notna(row['DURAÇÃO CONTRATUAL (MESES)']) else '-'
-
-        linhas.append(f"""
-        <tr style="border-bottom: 1px solid rgba(0,0,0,0.1);">
-            <td style="padding: 0.8rem; font-weight: 600;">{row['PROJETO']}</td>
-            <td style="padding: 0.8rem; text-align: center;">{row['FOCAL POINT 1']}</td>
-            <td style="padding: 0.8rem; text-align: center;">{row['FOCAL POINT 2']}</td>
-            <td style="padding: 0.8rem; text-align: center;">{data_inicial_fmt}</td>
-            <td style="padding: 0.8rem; text-align: center;">{row['SERVIÇOS CONTRATADOS']}</td>
-            <td style="padding: 0.8rem; text-align: center; font-weight: 700;">{licencas}</td>
-            <td style="padding: 0.8rem; text-align: center;">{data_renovacao_fmt}</td>
-            <td style="padding: 0.8rem; text-align: center;">{duracao}</td>
-            <td style="padding: 0.8rem; text-align: center; background: {cor_status}20; color: {cor_status}; font-weight: 700;">{status}</td>
-        </tr>
-        """)
-
-    html_final = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
-        <style>
-            * {{ font-family: 'Inter', sans-serif; margin: 0; padding: 0; }}
-            body {{ background: transparent; }}
-            .container {{
-                background: rgba(255,255,255,0.7);
-                backdrop-filter: blur(20px);
-                border-radius: 16px;
-                padding: 1rem;
-                overflow-x: auto;
-            }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                min-width: 1200px;
-            }}
-            thead tr {{
-                background: linear-gradient(135deg, #1e3a5f, #2c5282);
-                color: white;
-            }}
-            th {{
-                padding: 1rem 0.5rem;
-                text-align: center;
-                font-weight: 700;
-                font-size: 0.8rem;
-                white-space: nowrap;
-            }}
-            th:first-child {{
-                text-align: left;
-                padding-left: 0.8rem;
-            }}
-            tbody tr:hover {{
-                background: rgba(139, 195, 74, 0.05);
-                transition: all 0.3s ease;
-            }}
-            td {{
-                font-size: 0.85rem;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <table>
-                <thead>
-                    <tr>
-                        <th>PROJETO</th>
-                        <th>FOCAL 1</th>
-                        <th>FOCAL 2</th>
-                        <th>DATA INICIAL</th>
-                        <th>SERVIÇOS</th>
-                        <th>LICENÇAS</th>
-                        <th>ÚLT. RENOVAÇÃO</th>
-                        <th>DURAÇÃO</th>
-                        <th>STATUS</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join(linhas)}
-                </tbody>
-            </table>
-        </div>
-    </body>
-    </html>
-    """
-
-    return html_final
-
-@st.cache_data(ttl=600)
+@st.cache_data(ttl=600, show_spinner=False)
 def criar_grafico_pizza(cache_signature, coluna, titulo=""):
-    df = st.session_state.df_filtrado
-    dados = df[coluna].value_counts().reset_index()
-    dados.columns = ['Label', 'Valor']
-
-    if coluna == 'OPERADORA':
-        color_map = {'CLARO': COLORS['claro'], 'VIVO': COLORS['vivo'], 
-                    'TIM': COLORS['tim'], 'OI': COLORS['oi'], 'ALGAR': COLORS['algar']}
-    elif coluna == 'CATEGORIA_CONEXAO':
-        color_map = {'Nunca Conectou': COLORS['danger'], 'Mais de 180 dias': COLORS['warning'],
-                    '91-180 dias': COLORS['info'], '31-90 dias': COLORS['light_green'], 
-                    '0-30 dias': COLORS['accent']}
-    else:
-        color_map = {}
-
-    colors = [color_map.get(label, COLORS['gray']) for label in dados['Label']]
-
-    fig = go.Figure(data=[go.Pie(
-        labels=dados['Label'], values=dados['Valor'], hole=0.55,
-        marker=dict(colors=colors, line=dict(color='white', width=3)),
-        textfont=dict(size=14, family='Inter', color='#1a1a1a'),
-        textinfo='label+percent'
-    )])
-
-    fig.add_annotation(
-        text=f'<b style="font-size:28px">{dados["Valor"].sum():,.0f}</b><br><span style="font-size:14px">{titulo}</span>',
-        x=0.5, y=0.5, showarrow=False, font=dict(family='Inter', color='#1a1a1a')
-    )
-
-    fig.update_layout(
-        showlegend=True, height=340,
-        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=10, r=10, t=10, b=60),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
-    )
-    return fig
+    instrumentacao.marcar_cache('miss')
+    return graficos.criar_grafico_pizza(st.session_state.df_filtrado, coluna, titulo)
 
-@st.cache_data(ttl=600)
+@st.cache_data(ttl=600, show_spinner=False)
 def criar_grafico_barras(cache_signature, coluna):
-    df = st.session_state.df_filtrado
-    dados = df[coluna].value_counts().head(10).reset_index()
-    dados.columns = ['Label', 'Valor']
-    dados = dados.sort_values('Valor', ascending=True)
-
-    fig = go.Figure(data=[go.Bar(
-        y=dados['Label'], x=dados['Valor'], orientation='h',
-        marker=dict(
-            color=dados['Valor'],
-            colorscale=[[0, 'rgba(197,225,165,0.9)'], [0.5, 'rgba(139,195,74,1)'], [1, 'rgba(46,125,50,1)']],
-            showscale=False, line=dict(color='white', width=2)
-        ),
-        text=[f'<b>{v:,.0f}</b>' for v in dados['Valor']],
-        textposition='outside',
-        textfont=dict(size=12, family='Inter', color='#1a1a1a')
-    )])
-
-    fig.update_layout(
-        showlegend=False, height=340,
-        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=140, r=60, t=10, b=30),
-        xaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)'),
-        yaxis=dict(showgrid=False)
-    )
-    return fig
-
-@st.cache_data(ttl=600)
-def criar_timeline_vencimentos(cache_signature):
-    df = st.session_state.df_filtrado
-    hoje = pd.Timestamp.now().normalize()
-    df_venc = df[df['DATA DE VENCIMENTO'].notna()].copy()
-    df_venc = df_venc[df_venc['DATA DE VENCIMENTO'] > hoje]
-
-    if df_venc.empty:
-        return go.Figure()
-
-    prox_ano = hoje + pd.DateOffset(months=12)
-    df_prox = df_venc[df_venc['DATA DE VENCIMENTO'] <= prox_ano]
-    df_prox['mes'] = df_prox['DATA DE VENCIMENTO'].dt.to_period('M')
-    venc_mensal = df_prox.groupby('mes').size().reset_index(name='Quantidade')
-    venc_mensal['mes'] = venc_mensal['mes'].dt.to_timestamp()
-
-    fig = go.Figure(data=[go.Scatter(
-        x=venc_mensal['mes'], y=venc_mensal['Quantidade'],
-        # MELHORIA #5: Rótulos visíveis na timeline de vencimentos
-        mode='lines+markers+text',
-        text=venc_mensal['Quantidade'],
-        textposition='top center', fill='tozeroy',
-        fillcolor='rgba(229, 115, 115, 0.2)',
-        line=dict(color=COLORS['danger'], width=4),
-        marker=dict(size=10, color=COLORS['danger'], line=dict(color='white', width=2))
-    )])
-
-    fig.update_layout(
-        showlegend=False, height=340,
-        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=40, r=30, t=10, b=50)
-    )
-    return fig
-
-def criar_timeline_projetos(df_timeline, filtro_projetos=None, filtro_acoes=None, data_inicio=None, data_fim=None):
-    if df_timeline is None or df_timeline.empty:
-        return go.Figure()
-
-    df_filtrado = df_timeline.copy()
-
-    if filtro_projetos:
-        df_filtrado = df_filtrado[df_filtrado['PROJETO'].isin(filtro_projetos)]
-    if filtro_acoes:
-        df_filtrado = df_filtrado[df_filtrado['AÇÃO'].isin(filtro_acoes)]
-    if data_inicio:
-        df_filtrado = df_filtrado[df_filtrado['DATA'] >= pd.Timestamp(data_inicio)]
-    if data_fim:
-        df_filtrado = df_filtrado[df_filtrado['DATA'] <= pd.Timestamp(data_fim)]
-
-    if df_filtrado.empty:
-        return go.Figure()
-
-    fig = go.Figure()
-
-    for acao in df_filtrado['AÇÃO'].unique():
-        df_acao = df_filtrado[df_filtrado['AÇÃO'] == acao]
-        cor = CORES_ACAO.get(acao, COLORS['gray'])
-
-        fig.add_trace(go.Scatter(
-            x=df_acao['DATA'], y=df_acao['QUANTIDADE'],
-            mode='markers+text', name=acao,
-            marker=dict(size=14, color=cor, line=dict(color='white', width=2)),
-            text=df_acao['PROJETO'], textposition='top center',
-            textfont=dict(size=10, color='#1a1a1a', family='Inter'),
-            hovertemplate='<b>%{text}</b><br>%{y:,.0f} licenças<br>%{x|%d/%m/%Y}<extra></extra>'
-        ))
-
-    fig.update_layout(
-        showlegend=True, height=500,
-        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=40, r=30, t=20, b=50),
-        xaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)'),
-        yaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)', title='Quantidade'),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
-    )
-    return fig
-
-@st.cache_data(ttl=600)
-def criar_gauge_health(cache_signature, health_score):
-    if health_score >= 76:
-        color, status = COLORS['accent'], "Excelente"
-    elif health_score >= 51:
-        color, status = COLORS['warning'], "Atenção"
-    else:
-        color, status = COLORS['danger'], "Crítico"
-
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number", value=health_score,
-        title={'text': f"<b>{status}</b>", 'font': {'size': 18}},
-        number={'suffix': "%", 'font': {'size': 42, 'color': color}},
-        gauge={
-            'axis': {'range': [0, 100]},
-            'bar': {'color': color},
-            'steps': [
-                {'range': [0, 50], 'color': 'rgba(229,115,115,0.2)'},
-                {'range': [50, 75], 'color': 'rgba(255,183,77,0.2)'},
-                {'range': [75, 100], 'color': 'rgba(139,195,74,0.2)'}
-            ]
-        }
-    ))
-    fig.update_layout(height=350, paper_bgcolor='rgba(0,0,0,0)', margin=dict(l=10, r=10, t=50, b=10))
-    return fig
-
-@st.cache_data(ttl=600)
-def criar_top_projetos_risco(cache_signature):
-    df = st.session_state.df_filtrado
-    hoje = pd.Timestamp.now().normalize()
-    limite_30d = hoje + pd.Timedelta(days=30)
-
-    df_risco = df[(df['DATA DE VENCIMENTO'] > hoje) & (df['DATA DE VENCIMENTO'] <= limite_30d)]
-    if df_risco.empty:
-        return go.Figure()
-
-    top_risco = df_risco.groupby('PROJETO').size().nlargest(5).reset_index(name='Em Risco')
-    top_risco = top_risco.sort_values('Em Risco', ascending=True)
-
-    fig = go.Figure(data=[go.Bar(
-        y=top_risco['PROJETO'], x=top_risco['Em Risco'], orientation='h',
-        marker=dict(
-            color=top_risco['Em Risco'],
-            colorscale=[[0, 'rgba(255,183,77,0.8)'], [1, 'rgba(229,115,115,1)']],
-            showscale=False
-        ),
-        text=[f'<b>{v:,.0f}</b>' for v in top_risco['Em Risco']],
-        textposition='outside'
-    )])
-
-    fig.update_layout(
-        showlegend=False, height=300,
-        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=120, r=40, t=10, b=30)
-    )
-    return fig
+    instrumentacao.marcar_cache('miss')
+    return graficos.criar_grafico_barras(st.session_state.df_filtrado, coluna)
 
-def gerar_alertas(df):
-    alertas = []
-    hoje = pd.Timestamp.now().normalize()
+@st.cache_data(ttl=600, show_spinner=False)
+def obter_calendario_vencimentos(cache_signature):
+    instrumentacao.marcar_cache('miss')
+    return construir_calendario(st.session_state.df_filtrado)
 
-    venc_30 = df[(df['DATA DE VENCIMENTO'] > hoje) & 
-                 (df['DATA DE VENCIMENTO'] <= hoje + pd.Timedelta(days=30))]
-    if len(venc_30) > 0:
-        alertas.append(("warning", f"⚠️ {len(venc_30)} licenças vencem em 30 dias"))
+@st.cache_data(ttl=600, show_spinner=False)
+def criar_timeline_vencimentos(cache_signature, horizonte_dias=365, granularidade='M', acumulado=False):
+    instrumentacao.marcar_cache('miss')
+    return graficos.criar_timeline_vencimentos(
+        obter_calendario_vencimentos(cache_signature), horizonte_dias, granularidade, acumulado)
 
-    if 'CATEGORIA_CONEXAO' in df.columns:
-        sem_conexao = df[df['CATEGORIA_CONEXAO'] == 'Mais de 180 dias']
-        if len(sem_conexao) > 0:
-            alertas.append(("error", f"🔴 {len(sem_conexao)} chips sem conexão há 180+ dias"))
-
-    if 'STATUS_LICENCA' in df.columns:
-        expiradas = df[df['STATUS_LICENCA'] == 'Expirado']
-        if len(expiradas) > 0:
-            alertas.append(("error", f"❌ {len(expiradas)} licenças expiradas"))
+@st.cache_data(ttl=600, show_spinner=False)
+def criar_gauge_health(cache_signature, health_score):
+    instrumentacao.marcar_cache('miss')
+    return graficos.criar_gauge_health(health_score)
 
-    return alertas
+@st.cache_data(ttl=600, show_spinner=False)
+def criar_top_projetos_risco(cache_signature, horizonte_dias=30):
+    instrumentacao.marcar_cache('miss')
+    return graficos.criar_top_projetos_risco(obter_calendario_vencimentos(cache_signature), horizonte_dias)
 
 def gerar_alertas_contratuais():
-    if st.session_state.df_contratos is None:
-        return []
-
-    alertas = []
-    df = st.session_state.df_contratos
-
-    expirados = df[df['STATUS ATUAL DO CONTRATO'] == 'EXPIRADO']
-    if len(expirados) > 0:
-        alertas.append(("error", f"🔴 {len(expirados)} contrato(s) EXPIRADO(S)"))
-
-    expirando = df[df['STATUS ATUAL DO CONTRATO'] == 'EXPIRANDO']
-    if len(expirando) > 0:
-        alertas.append(("warning", f"⚠️ {len(expirando)} contrato(s) EXPIRANDO"))
-
-    df_entregas = calcular_entregas_por_projeto()
-    if not df_entregas.empty:
-        baixa_entrega = df_entregas[df_entregas['% ENTREGUES'] < 80]
-        if len(baixa_entrega) > 0:
-            alertas.append(("warning", f"📉 {len(baixa_entrega)} projeto(s) com <80% de entregas"))
-
-        baixa_funcional = df_entregas[df_entregas['% FUNCIONAIS'] < 70]
-        if len(baixa_funcional) > 0:
-            alertas.append(("error", f"⚙️ {len(baixa_funcional)} projeto(s) com <70% de licenças funcionais"))
-
-    return alertas
+    return indicadores.gerar_alertas_contratuais(st.session_state.df_contratos, calcular_entregas_por_projeto())
+
+@st.cache_resource(show_spinner=False)
+def obter_pool_graficos():
+    # Limitado: o pool é do processo e atende todas as sessões
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix='graficos')
+
+def construir_em_paralelo(tarefas, medicao):
+    """Executa {nome: (funcao, args)} no pool de gráficos e devolve {nome: resultado}"""
+    ctx = get_script_run_ctx()
+
+    def medir(nome, funcao, args):
+        # Funções de st.cache_data têm .clear; as outras não passam por cache
+        with medicao.etapa(f"grafico:{nome}", cacheavel=hasattr(funcao, 'clear')) as etapa:
+            return etapa.resultado(funcao(*args))
+
+    def executar(nome, funcao, args):
+        # Os builders usam st.session_state e st.cache_data: precisam do contexto da sessão.
+        # Toda tarefa do pool grava o seu antes de rodar, então o da anterior nunca vale aqui
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return medir(nome, funcao, args)
+
+    if perfil_rerun.ativo():
+        # O cProfile só enxerga a thread do script: sob o perfil, os gráficos rodam nela
+        return {nome: medir(nome, funcao, args) for nome, (funcao, args) in tarefas.items()}
+
+    pool = obter_pool_graficos()
+    futuros = {nome: pool.submit(executar, nome, funcao, args) for nome, (funcao, args) in tarefas.items()}
+    return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+def periodo_timeline(range_datas):
+    data_inicio = range_datas[0] if isinstance(range_datas, tuple) and len(range_datas) == 2 else None
+    data_fim = range_datas[1] if isinstance(range_datas, tuple) and len(range_datas) == 2 else range_datas
+    return data_inicio, data_fim
+
+def mostrar_status_exportacao(painel, status):
+    with painel.container():
+        if status['estado'] in ('fila', 'executando'):
+            st.progress(status['progresso'], text=f"📤 Exportando {format_number(status['linhas'])} de {format_number(status['total'])}...")
+        elif status['estado'] == 'erro':
+            st.error(f"❌ Falha na exportação: {status['erro']}")
+        else:
+            arquivo = status['arquivo']
+            nome, tamanho = arquivo.name, arquivo.stat().st_size
+            mb = format_number(tamanho / 1024 / 1024)
+            if obter_assets() and exportacao_servivel(arquivo):
+                # Link para o /app/static: o tornado manda o arquivo em blocos, sem passar pela sessão
+                st.markdown(f'<a href="{url_static(arquivo)}" download="{nome}">⬇️ Baixar {nome}</a> ({mb} MB)', unsafe_allow_html=True)
+            elif tamanho <= LIMITE_DOWNLOAD_MEMORIA:
+                with open(arquivo, 'rb') as f:
+                    st.download_button(f"⬇️ Baixar {nome}", f, file_name=nome, use_container_width=True)
+            else:
+                st.warning(f"Arquivo de {mb} MB grande demais para baixar pela página; "
+                           f"ficou no servidor em {arquivo}. Filtre a seleção ou ative o server.enableStaticServing.")
+
+def tabela_etapas(medicao):
+    return pd.DataFrame([{
+        'Etapa': e.nome, 'ms': round(e.ms, 1), 'Cache': e.cache or '-',
+        'Tamanho': f"{format_number(e.tamanho)} {e.unidade}" if e.tamanho is not None else '-'
+    } for e in medicao.etapas])
+
+def mostrar_painel_desempenho(medicao):
+    """Painel oculto (?perf=1): etapas deste rerun e do anterior, se foi cortado, e totais do processo"""
+    df = st.session_state.df_filtrado if st.session_state.df_filtrado is not None else st.session_state.df_base
+    with st.expander(f"⏱️ Desempenho do rerun • {format_number(medicao.total_ms)} ms", expanded=True):
+        st.caption(f"Página: {medicao.pagina} • dados: `{versao_dataset(df)}` • "
+                   f"filtros: {st.session_state.filtros_ativos or 'nenhum'}")
+        aba_rerun, aba_processo, aba_prometheus, aba_perfis = st.tabs(["Este rerun", "Processo", "Prometheus", "Perfis"])
+        with aba_rerun:
+            st.dataframe(tabela_etapas(medicao), use_container_width=True, hide_index=True)
+            interrompida = st.session_state.get('perf_interrompida')
+            if interrompida is not None:
+                st.caption(f"Rerun anterior, interrompido por st.rerun/st.stop ({format_number(interrompida.total_ms)} ms)")
+                st.dataframe(tabela_etapas(interrompida), use_container_width=True, hide_index=True)
+        with aba_processo:
+            etapas, reruns = instrumentacao.totais()
+            media = reruns['segundos'] * 1000 / reruns['execucoes'] if reruns['execucoes'] else 0
+            st.caption(f"{reruns['execucoes']} rerun(s) neste processo ({reruns['interrompidos']} interrompido(s)), "
+                       f"média de {format_number(media)} ms")
+            st.dataframe(pd.DataFrame([{
+                'Etapa': nome, 'Execuções': t['execucoes'], 'Média (ms)': round(t['segundos'] * 1000 / t['execucoes'], 1),
+                'Hits': t['hit'], 'Misses': t['miss'],
+            } for nome, t in sorted(etapas.items())]), use_container_width=True, hide_index=True)
+        with aba_prometheus:
+            if instrumentacao.METRICAS_DIR:
+                st.caption(f"Gravado em {instrumentacao.METRICAS_DIR} a cada {instrumentacao.METRICAS_INTERVALO:.0f}s")
+            else:
+                st.caption("Defina METRICAS_PROMETHEUS_DIR para gravar o arquivo do textfile collector")
+            st.code(instrumentacao.texto_prometheus(st.get_option('server.port')), language='text')
+        with aba_perfis:
+            if st.button("🔬 Perfilar o próximo rerun", key='btn_perfilar'):
+                st.session_state.perfil_pendente = True
+                st.rerun()
+            capturas = perfil_rerun.capturas_recentes()
+            if not capturas:
+                st.caption(f"Nenhuma captura em {perfil_rerun.PERFIL_DIR}/ (também dá para pedir com ?perfil=1)")
+            else:
+                st.dataframe(pd.DataFrame([{
+                    'Capturado em': c['capturado_em'], 'Página': c.get('pagina'), 'ms': c['duracao_ms'],
+                    'Encerrado por': c.get('encerrado_por') or '-', 'Dados': c.get('versao_dados'),
+                    'Arquivo': c['arquivo_prof'],
+                } for c in capturas]), use_container_width=True, hide_index=True)
+                st.caption(f"Hotspots da última captura (tempo próprio) • perfil completo em "
+                           f"{perfil_rerun.PERFIL_DIR}/{capturas[0]['arquivo_prof']}")
+                st.dataframe(pd.DataFrame(capturas[0]['hotspots'][:15]), use_container_width=True, hide_index=True)
+
+def acompanhar_exportacao(painel):
+    """Mostra o progresso e, com o job rodando, agenda outro rerun - roda no fim do script para não atrasar a página"""
+    job_id = st.session_state.get('exportacao_job')
+    if painel is None or not job_id:
+        return
+    status = status_exportacao(job_id)
+    if not status:
+        return
+    mostrar_status_exportacao(painel, status)
+    if status['estado'] in ('fila', 'executando'):
+        time.sleep(INTERVALO_PROGRESSO)
+        st.rerun()
 
 # SESSION STATE
 if 'df_base' not in st.session_state:
@@ -859,14 +334,29 @@ if 'pagina_atual' not in st.session_state:
     st.session_state.pagina_atual = 'dashboard'
 if 'timeline_expandida' not in st.session_state:
     st.session_state.timeline_expandida = False
+if 'exportacao_job' not in st.session_state:
+    st.session_state.exportacao_job = None
+
+# DESEMPENHO: etapas de cada rerun; ?perf=1 mostra o painel no fim da página
+medicao_anterior = st.session_state.get('perf_medicao')
+st.session_state.perf_interrompida = None
+if medicao_anterior is not None and not medicao_anterior.concluida:
+    # Cortado por st.rerun/st.stop (carga, resposta do chatbot...): fecha agora e mostra neste painel
+    medicao_anterior.concluir(interrompida=True)
+    if medicao_anterior.etapas:
+        st.session_state.perf_interrompida = medicao_anterior
+medicao = instrumentacao.iniciar(st.session_state.pagina_atual)
+st.session_state.perf_medicao = medicao
+
+painel_exportacao = None
 
 aplicar_css()
-logo_icon = load_logo(["BM-Icone.png", "BM Ícone.png"])
+logo_icon = url_logo("img/BM-Icone.png", ["BM-Icone.png", "BM Ícone.png"])
 
 # SIDEBAR
 with st.sidebar:
     if logo_icon:
-        st.markdown(f'<div style="text-align:center; padding:1.2rem; background:rgba(255,255,255,0.1); border-radius:14px; margin-bottom:1.5rem;"><img src="data:image/png;base64,{logo_icon}" style="max-width:90px;"></div>', unsafe_allow_html=True)
+        st.markdown(f'<div style="text-align:center; padding:1.2rem; background:rgba(255,255,255,0.1); border-radius:14px; margin-bottom:1.5rem;"><img src="{logo_icon}" style="max-width:90px;"></div>', unsafe_allow_html=True)
 
     st.markdown("### 📊 Base Mobile")
     st.caption("Gestão Integrada • Projetos e Serviços")
@@ -881,6 +371,10 @@ with st.sidebar:
     if st.button("📋 Dados Contratuais", use_container_width=True, type="primary" if st.session_state.pagina_atual == 'contratos' else "secondary"):
         st.session_state.pagina_atual = 'contratos'
         st.rerun()
+
+    if st.button("🔎 Navegador de Chips", use_container_width=True, type="primary" if st.session_state.pagina_atual == 'chips' else "secondary"):
+        st.session_state.pagina_atual = 'chips'
+        st.rerun()
 # ADIÇÃO DO CHATBOT - DELETAR SE FOR TIRAR 
     if st.button("🤖 Chatbot IA", use_container_width=True, 
                 type="primary" if st.session_state.pagina_atual == "chatbot" else "secondary"):
@@ -891,7 +385,7 @@ with st.sidebar:
     st.markdown("---")
 
     # MELHORIA #1: Filtros sempre visíveis (mesmo durante carregamento/refresh)
-    if st.session_state.pagina_atual == 'dashboard':
+    if st.session_state.pagina_atual in ('dashboard', 'chips'):
         st.markdown("### 🎛️ Filtros")
 
         carregando = (st.session_state.df_base is None)
@@ -971,6 +465,17 @@ with st.sidebar:
             st.markdown(chips, unsafe_allow_html=True)
 
         st.markdown("---")
+        st.markdown("### 📤 Exportar")
+        formato_export = st.selectbox("Formato", options=list(FORMATOS), format_func=FORMATOS.get,
+                                      disabled=carregando, key='exportacao_formato')
+        if st.button("Exportar seleção", use_container_width=True, disabled=carregando):
+            df_export = st.session_state.df_filtrado
+            if df_export is None:
+                df_export = aplicar_filtros(df_temp, st.session_state.filtros_ativos)
+            st.session_state.exportacao_job = iniciar_exportacao(df_export, formato_export, DIR_EXPORTS)
+        painel_exportacao = st.empty()
+
+        st.markdown("---")
 
     if st.button("Recarregar Tudo", use_container_width=True, key='btn_recarregar_tudo'):
         st.cache_data.clear()
@@ -983,13 +488,25 @@ with st.sidebar:
         st.session_state.timeline_expandida = False
         st.rerun()
 
-# CARREGAMENTO
+# BASE COMPARTILHADA: geração nova publicada -> as sessões de todos os processos trocam juntas
+if base_compartilhada.ativa() and st.session_state.df_base is not None:
+    geracao = base_compartilhada.geracao_atual()
+    if st.session_state.df_base.attrs.get('geracao') != geracao:
+        if base_compartilhada.nova_geracao_no_processo(geracao):
+            st.cache_data.clear()
+        st.session_state.df_base = None
+        st.session_state.df_filtrado = None
+        st.session_state.df_contratos = None
+        st.session_state.df_timeline = None
+
 # CARREGAMENTO
 if st.session_state.df_base is None:
     loading = st.empty()
     loading.markdown(show_premium_loading("Carregando Bases"), unsafe_allow_html=True)
-    st.session_state.df_base, _ = load_data_smart()
-    st.session_state.df_contratos, st.session_state.df_timeline = load_dados_gerenciais()
+    with medicao.etapa('carregar_bases', cacheavel=not base_compartilhada.ativa()) as etapa:
+        st.session_state.df_base, st.session_state.df_contratos, st.session_state.df_timeline = carregar_bases()
+        etapa.resultado(st.session_state.df_base)
+    pre_gerar_relatorios(st.session_state.df_base)
     loading.empty()
     # MELHORIA #1: garante refresh da sidebar após o carregamento (evita 'Aguardando carregamento...' infinito)
     st.rerun()
@@ -1015,7 +532,8 @@ if st.session_state.pagina_atual == 'dashboard':
         st.stop()
 
     if st.session_state.df_filtrado is None:
-        st.session_state.df_filtrado = aplicar_filtros(df, st.session_state.filtros_ativos)
+        with medicao.etapa('filtros') as etapa:
+            st.session_state.df_filtrado = etapa.resultado(aplicar_filtros(df, st.session_state.filtros_ativos))
 
     df_filtrado = st.session_state.df_filtrado
 
@@ -1026,7 +544,8 @@ if st.session_state.pagina_atual == 'dashboard':
     st.markdown("### 🎯 Indicadores Estratégicos")
 
     cache_sig = get_cache_signature(st.session_state.filtros_ativos)
-    metricas = calcular_metricas_cached(cache_sig)
+    with medicao.etapa('metricas', cacheavel=True) as etapa:
+        metricas = etapa.resultado(calcular_metricas_cached(cache_sig))
 
     cols = st.columns(6)
     cards = [
@@ -1052,12 +571,43 @@ if st.session_state.pagina_atual == 'dashboard':
 
     st.markdown("---")
 
+    # GRÁFICOS EM PARALELO: widgets ainda não desenhados são lidos do session_state (mesmos defaults)
+    df_tl = st.session_state.df_timeline
+    tem_timeline = df_tl is not None and not df_tl.empty
+    tarefas = {
+        'gauge': (criar_gauge_health, (cache_sig, metricas['health_score'])),
+        'venc': (criar_timeline_vencimentos, (
+            cache_sig,
+            st.session_state.get('venc_horizonte', HORIZONTES_PADRAO[-1]),
+            st.session_state.get('venc_granularidade', 'M'),
+            st.session_state.get('venc_acumulado', False)
+        )),
+        'top10': (criar_grafico_barras, (cache_sig, 'PROJETO')),
+        'risco': (criar_top_projetos_risco, (cache_sig, st.session_state.get('risco_horizonte', HORIZONTES_PADRAO[0]))),
+    }
+    if 'OPERADORA' in df_filtrado.columns:
+        tarefas['operadora'] = (criar_grafico_pizza, (cache_sig, 'OPERADORA', 'Total'))
+    if 'STATUS NA OP.' in df_filtrado.columns:
+        tarefas['status_op'] = (criar_grafico_barras, (cache_sig, 'STATUS NA OP.'))
+    if 'CATEGORIA_CONEXAO' in df_filtrado.columns:
+        tarefas['conexao'] = (criar_grafico_pizza, (cache_sig, 'CATEGORIA_CONEXAO', 'Total'))
+    if tem_timeline:
+        projetos_tl = st.session_state.get('filtro_timeline_projetos', [])
+        acoes_tl = st.session_state.get('filtro_timeline_acoes', [])
+        inicio_tl, fim_tl = periodo_timeline(st.session_state.get(
+            'filtro_timeline_datas', (df_tl['DATA'].min().date(), df_tl['DATA'].max().date())))
+        tarefas['timeline'] = (criar_timeline_projetos, (
+            df_tl, projetos_tl if projetos_tl else None, acoes_tl if acoes_tl else None, inicio_tl, fim_tl))
+
+    with medicao.etapa('graficos'):
+        figuras = construir_em_paralelo(tarefas, medicao)
+
     # HEALTH SCORE
     st.markdown("### 🏥 Indicadores de Saúde")
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        st.plotly_chart(criar_gauge_health(cache_sig, metricas['health_score']), use_container_width=True)
+        st.plotly_chart(figuras['gauge'], use_container_width=True)
 
     with col2:
         st.markdown(f"""
@@ -1078,8 +628,10 @@ if st.session_state.pagina_atual == 'dashboard':
     st.markdown("---")
 
     # ALERTAS
-    alertas = gerar_alertas(df_filtrado)
-    alertas_contratos = gerar_alertas_contratuais()
+    with medicao.etapa('alertas') as etapa:
+        alertas = gerar_alertas(df_filtrado)
+        alertas_contratos = gerar_alertas_contratuais()
+        etapa.resultado(alertas + alertas_contratos)
 
     # MELHORIA #3: Alertas em expander (sino clicável + contador)
     total_alertas = len(alertas) + len(alertas_contratos)
@@ -1102,28 +654,45 @@ if st.session_state.pagina_atual == 'dashboard':
     with col1:
         st.markdown("#### 📡 Distribuição por Operadora")
         if 'OPERADORA' in df_filtrado.columns:
-            st.plotly_chart(criar_grafico_pizza(cache_sig, 'OPERADORA', 'Total'), use_container_width=True)
+            st.plotly_chart(figuras['operadora'], use_container_width=True)
 
         st.markdown("#### 🔌 Status Operadora")
         if 'STATUS NA OP.' in df_filtrado.columns:
-            st.plotly_chart(criar_grafico_barras(cache_sig, 'STATUS NA OP.'), use_container_width=True)
+            st.plotly_chart(figuras['status_op'], use_container_width=True)
 
     with col2:
         st.markdown("#### 🔄 Última Conexão")
         if 'CATEGORIA_CONEXAO' in df_filtrado.columns:
-            st.plotly_chart(criar_grafico_pizza(cache_sig, 'CATEGORIA_CONEXAO', 'Total'), use_container_width=True)
+            st.plotly_chart(figuras['conexao'], use_container_width=True)
 
         st.markdown("#### 📅 Timeline Vencimentos")
-        st.plotly_chart(criar_timeline_vencimentos(cache_sig), use_container_width=True)
+        col_h, col_g, col_a = st.columns([2, 2, 1])
+        with col_h:
+            st.selectbox(
+                "Horizonte", options=HORIZONTES_PADRAO, index=len(HORIZONTES_PADRAO) - 1,
+                format_func=lambda d: f"{d} dias", key='venc_horizonte', label_visibility='collapsed'
+            )
+        with col_g:
+            st.selectbox(
+                "Granularidade", options=list(GRANULARIDADES), index=2,
+                format_func=GRANULARIDADES.get, key='venc_granularidade', label_visibility='collapsed'
+            )
+        with col_a:
+            st.checkbox("Acumulado", key='venc_acumulado')
+        st.plotly_chart(figuras['venc'], use_container_width=True)
 
     # MELHORIA #6: Top 10 e Top 5 lado a lado (50/50)
     col_top10, col_top5 = st.columns(2)
     with col_top10:
         st.markdown("#### 🏆 Top 10 Projetos")
-        st.plotly_chart(criar_grafico_barras(cache_sig, 'PROJETO'), use_container_width=True)
+        st.plotly_chart(figuras['top10'], use_container_width=True)
     with col_top5:
         st.markdown("### ⚠️ Top 5 Projetos em Risco")
-        fig_risco = criar_top_projetos_risco(cache_sig)
+        st.radio(
+            "Horizonte de risco", options=HORIZONTES_PADRAO, index=0, horizontal=True,
+            format_func=lambda d: f"{d} dias", key='risco_horizonte', label_visibility='collapsed'
+        )
+        fig_risco = figuras['risco']
         if fig_risco.data:
             st.plotly_chart(fig_risco, use_container_width=True)
         else:
@@ -1133,10 +702,12 @@ if st.session_state.pagina_atual == 'dashboard':
 
     # PAINEL DE ENTREGAS
     st.markdown("### 📦 Painel de Entregas por Projeto")
-    df_entregas = calcular_entregas_por_projeto()
+    with medicao.etapa('entregas') as etapa:
+        df_entregas = etapa.resultado(calcular_entregas_por_projeto())
 
     if not df_entregas.empty:
-        html_tabela = gerar_html_tabela_entregas(df_entregas)
+        with medicao.etapa('entregas:html') as etapa:
+            html_tabela = etapa.resultado(gerar_html_tabela_entregas(df_entregas))
         components.html(html_tabela, height=600, scrolling=True)
     else:
         st.info("ℹ️ Dados contratuais não disponíveis para calcular entregas.")
@@ -1146,7 +717,7 @@ if st.session_state.pagina_atual == 'dashboard':
     # TIMELINE DE PROJETOS
     st.markdown("### 📅 Timeline de Projetos")
 
-    if st.session_state.df_timeline is not None and not st.session_state.df_timeline.empty:
+    if tem_timeline:
         col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
 
         with col1:
@@ -1181,38 +752,31 @@ if st.session_state.pagina_atual == 'dashboard':
             if st.button("🔍 Expandir Detalhes", use_container_width=True):
                 st.session_state.timeline_expandida = not st.session_state.timeline_expandida
 
-        data_inicio = range_datas[0] if isinstance(range_datas, tuple) and len(range_datas) == 2 else None
-        data_fim = range_datas[1] if isinstance(range_datas, tuple) and len(range_datas) == 2 else range_datas
-
-        fig_timeline = criar_timeline_projetos(
-            st.session_state.df_timeline,
-            filtro_projetos=projetos_timeline if projetos_timeline else None,
-            filtro_acoes=acoes_timeline if acoes_timeline else None,
-            data_inicio=data_inicio,
-            data_fim=data_fim
-        )
+        data_inicio, data_fim = periodo_timeline(range_datas)
 
-        st.plotly_chart(fig_timeline, use_container_width=True)
+        st.plotly_chart(figuras['timeline'], use_container_width=True)
 
         if st.session_state.timeline_expandida:
             st.markdown("#### 📋 Tabela Detalhada")
 
-            df_timeline_vis = st.session_state.df_timeline.copy()
+            with medicao.etapa('timeline:tabela') as etapa:
+                df_timeline_vis = st.session_state.df_timeline.copy()
 
-            if projetos_timeline:
-                df_timeline_vis = df_timeline_vis[df_timeline_vis['PROJETO'].isin(projetos_timeline)]
-            if acoes_timeline:
-                df_timeline_vis = df_timeline_vis[df_timeline_vis['AÇÃO'].isin(acoes_timeline)]
-            if data_inicio:
-                df_timeline_vis = df_timeline_vis[df_timeline_vis['DATA'] >= pd.Timestamp(data_inicio)]
-            if data_fim:
-                df_timeline_vis = df_timeline_vis[df_timeline_vis['DATA'] <= pd.Timestamp(data_fim)]
+                if projetos_timeline:
+                    df_timeline_vis = df_timeline_vis[df_timeline_vis['PROJETO'].isin(projetos_timeline)]
+                if acoes_timeline:
+                    df_timeline_vis = df_timeline_vis[df_timeline_vis['AÇÃO'].isin(acoes_timeline)]
+                if data_inicio:
+                    df_timeline_vis = df_timeline_vis[df_timeline_vis['DATA'] >= pd.Timestamp(data_inicio)]
+                if data_fim:
+                    df_timeline_vis = df_timeline_vis[df_timeline_vis['DATA'] <= pd.Timestamp(data_fim)]
 
-            df_timeline_vis = df_timeline_vis.sort_values('DATA', ascending=False)
+                df_timeline_vis = df_timeline_vis.sort_values('DATA', ascending=False)
 
-            df_timeline_display = df_timeline_vis[['PROJETO', 'AÇÃO', 'DATA', 'QUANTIDADE']].copy()
-            df_timeline_display['DATA'] = df_timeline_display['DATA'].dt.strftime('%d/%m/%Y')
-            df_timeline_display['QUANTIDADE'] = df_timeline_display['QUANTIDADE'].apply(format_number)
+                df_timeline_display = df_timeline_vis[['PROJETO', 'AÇÃO', 'DATA', 'QUANTIDADE']].copy()
+                df_timeline_display['DATA'] = df_timeline_display['DATA'].dt.strftime('%d/%m/%Y')
+                df_timeline_display['QUANTIDADE'] = df_timeline_display['QUANTIDADE'].apply(format_number)
+                etapa.resultado(df_timeline_display)
 
             st.dataframe(df_timeline_display, use_container_width=True, height=340, hide_index=True)
     else:
@@ -1221,6 +785,72 @@ if st.session_state.pagina_atual == 'dashboard':
     st.markdown("---")
     st.markdown(f'<p style="text-align:center; color:#999;"> Base Mobile v6.4 • {datetime.now().strftime("%d/%m/%Y")} • Todos os direitos reservados </p>', unsafe_allow_html=True)
 
+# PÁGINA: NAVEGADOR DE CHIPS
+elif st.session_state.pagina_atual == 'chips':
+    st.markdown("""
+    <div class="header-parallax">
+        <div style="display: flex; align-items: center; gap: 1rem;">
+            <div style="font-size: 2.5rem;">🔎</div>
+            <div>
+                <h1 style="color: white; font-size: 2rem; font-weight: 900; margin: 0;">Navegador de Chips</h1>
+                <p style="color: #C5E1A5; font-size: 0.95rem; margin: 0.3rem 0 0 0; font-weight: 600;">Consulta por ICCID • Base Mobile</p>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    df = st.session_state.df_base
+
+    if df.empty:
+        st.error("❌ Arquivo não encontrado: **MAPEAMENTO DE CHIPS.xlsx**")
+        st.stop()
+
+    if st.session_state.df_filtrado is None:
+        with medicao.etapa('filtros') as etapa:
+            st.session_state.df_filtrado = etapa.resultado(aplicar_filtros(df, st.session_state.filtros_ativos))
+
+    df_filtrado = st.session_state.df_filtrado
+    cache_sig = get_cache_signature(st.session_state.filtros_ativos)
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        busca_iccid = st.text_input("🔍 Buscar ICCID", key='chips_busca', placeholder="Parte do ICCID")
+    with col2:
+        colunas_ordem = colunas_disponiveis(df_filtrado)
+        coluna_ordem = st.selectbox("↕️ Ordenar por", options=colunas_ordem, key='chips_ordem')
+    with col3:
+        ascendente = st.radio("Ordem", options=[True, False], format_func=lambda a: "Asc" if a else "Desc",
+                              horizontal=True, key='chips_ascendente')
+    with col4:
+        tamanho_pagina = st.selectbox("Linhas", options=TAMANHOS_PAGINA, key='chips_tamanho')
+
+    # Ordenação e busca ficam no servidor (cacheadas); o navegador só recebe a página visível
+    with medicao.etapa('chips:ordem', cacheavel=True) as etapa:
+        posicoes = etapa.resultado(obter_ordem_chips(cache_sig, coluna_ordem, ascendente, busca_iccid.strip()))
+    n_paginas = total_paginas(len(posicoes), tamanho_pagina)
+
+    if st.session_state.get('chips_pagina', 1) > n_paginas:
+        st.session_state.chips_pagina = n_paginas
+
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        pagina = st.number_input("Página", min_value=1, max_value=n_paginas, step=1, key='chips_pagina')
+    pagina = int(pagina)
+
+    inicio = (pagina - 1) * tamanho_pagina
+    fim = min(inicio + tamanho_pagina, len(posicoes))
+    with col2:
+        st.markdown("<div style='height: 1.8rem;'></div>", unsafe_allow_html=True)
+        st.caption(f"Exibindo {format_number(inicio + 1 if len(posicoes) else 0)}–{format_number(fim)} de "
+                   f"{format_number(len(posicoes))} chips • página {pagina} de {n_paginas}")
+
+    with medicao.etapa('chips:pagina') as etapa:
+        df_pagina = etapa.resultado(obter_pagina(df_filtrado, posicoes, pagina, tamanho_pagina))
+    st.dataframe(df_pagina, use_container_width=True, height=min(38 + 35 * tamanho_pagina, 740), hide_index=True)
+
+    st.markdown("---")
+    st.markdown(f'<p style="text-align:center; color:#999;"> Base Mobile v6.4 • {datetime.now().strftime("%d/%m/%Y")} • Todos os direitos reservados </p>', unsafe_allow_html=True)
+
 # PÁGINA: DADOS CONTRATUAIS
 elif st.session_state.pagina_atual == 'contratos':
     st.markdown("""
@@ -1322,7 +952,8 @@ elif st.session_state.pagina_atual == 'contratos':
     st.markdown("---")
 
     # TABELA COM HTML ESTILIZADO (IGUAL ENTREGAS)
-    html_contratos = gerar_html_tabela_contratos(df_vis)
+    with medicao.etapa('contratos:html') as etapa:
+        html_contratos = etapa.resultado(gerar_html_tabela_contratos(df_vis))
     components.html(html_contratos, height=700, scrolling=True)
 
     st.markdown("---")
@@ -1340,3 +971,11 @@ elif st.session_state.pagina_atual == "chatbot":
     
     st.markdown("---")
     st.markdown(f'<p style="text-align:center; color:#999;"> Base Mobile v6.4 • {datetime.now().strftime("%d/%m/%Y")} • Todos os direitos reservados </p>', unsafe_allow_html=True)
+
+# DESEMPENHO
+medicao.concluir()
+instrumentacao.exportar_prometheus(st.get_option('server.port'))
+if st.query_params.get('perf') == '1':
+    mostrar_painel_desempenho(medicao)
+
+acompanhar_exportacao(painel_exportacao)
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from versao_dados import carimbar
+
+# Pasta em memória (tmpfs) com a base publicada; vazia = processo único, cada um lê o Excel
+DIR_COMPARTILHADO = os.getenv("BASE_COMPARTILHADA", "")
+
+ARQUIVO_ATUAL = "atual.json"
+TABELAS = ('mapeamento', 'contratos', 'timeline')
+
+_lock = threading.Lock()
+_anexada = None
+_lida = None
+
+
+def ativa():
+    return bool(DIR_COMPARTILHADO)
+
+
+def _pasta():
+    return Path(DIR_COMPARTILHADO)
+
+
+def _tabela_arrow(df):
+    colunas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        try:
+            colunas[str(coluna)] = pa.array(serie, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Coluna do Excel com tipos misturados (números e textos): vai como texto
+            colunas[str(coluna)] = pa.array(serie.where(serie.isna(), serie.astype(str)), from_pandas=True)
+    return pa.table(colunas)
+
+
+def _gravar_atomico(caminho, escrever):
+    temporario = caminho.with_name(f".{caminho.name}.{os.getpid()}.tmp")
+    escrever(temporario)
+    os.replace(temporario, caminho)
+
+
+def publicar(df, dfcontratos=None, dftimeline=None, pasta=None):
+    """Grava as tabelas como Arrow IPC na pasta compartilhada e avança o contador de geração.
+
+    Os processos do app trocam de base juntos ao ver a geração nova. A geração
+    anterior fica até a próxima publicação: quem estiver no meio da troca ainda
+    a encontra, e quem já a mapeou continua lendo depois de apagada.
+    """
+    pasta = Path(pasta or _pasta())
+    pasta.mkdir(parents=True, exist_ok=True)
+    anterior = _ler_atual(pasta)
+    geracao = (anterior['geracao'] if anterior else 0) + 1
+
+    arquivos = {}
+    for nome, tabela_df in zip(TABELAS, (df, dfcontratos, dftimeline)):
+        if tabela_df is None:
+            arquivos[nome] = None
+            continue
+        tabela = _tabela_arrow(tabela_df)
+
+        def escrever(destino, tabela=tabela):
+            with pa.OSFile(str(destino), 'wb') as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as gravador:
+                gravador.write_table(tabela)
+
+        caminho = pasta / f"g{geracao}-{nome}.arrow"
+        _gravar_atomico(caminho, escrever)
+        arquivos[nome] = {'arquivo': caminho.name, 'versao': tabela_df.attrs.get('versao')}
+
+    atual = {'geracao': geracao, 'publicado_em': time.time(), 'arquivos': arquivos}
+    _gravar_atomico(pasta / ARQUIVO_ATUAL, lambda destino: destino.write_text(json.dumps(atual)))
+
+    for velho in pasta.glob("g*-*.arrow"):
+        if int(velho.name[1:].split('-', 1)[0]) < geracao - 1:
+            velho.unlink(missing_ok=True)
+    return geracao
+
+
+def _ler_atual(pasta=None):
+    try:
+        return json.loads((Path(pasta or _pasta()) / ARQUIVO_ATUAL).read_text())
+    except FileNotFoundError:
+        return None
+
+
+def geracao_atual():
+    """Geração publicada (None antes da primeira); relê o contador só quando o arquivo muda"""
+    global _lida
+    try:
+        stat = (_pasta() / ARQUIVO_ATUAL).stat()
+    except FileNotFoundError:
+        return None
+    marca = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    lida = _lida
+    if lida is None or lida[0] != marca:
+        atual = _ler_atual()
+        lida = _lida = (marca, atual['geracao'] if atual else None)
+    return lida[1]
+
+
+def _tipos_compartilhados(tipo):
+    # Textos continuam no buffer mapeado (ArrowStringArray), sem virar objetos Python por processo
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def _mapear(pasta, info, geracao, compartilhar_textos):
+    if info is None:
+        return None
+    tabela = pa.ipc.open_file(pa.memory_map(str(pasta / info['arquivo']))).read_all()
+    df = tabela.to_pandas(types_mapper=_tipos_compartilhados if compartilhar_textos else None, split_blocks=True)
+    return carimbar(df, info['versao'], geracao=geracao)
+
+
+def anexar():
+    """(base, contratos, timeline) da geração atual, mapeados da memória compartilhada.
+
+    Um mapeamento por processo e geração, reaproveitado por todas as sessões.
+    Só a base de chips mantém os textos no buffer compartilhado; contratos e
+    timeline são pequenos e viram DataFrames comuns.
+    """
+    global _anexada
+    with _lock:
+        for _ in range(3):
+            atual = _ler_atual()
+            if atual is None:
+                raise FileNotFoundError(f"Nenhuma base publicada em {_pasta()}")
+            if _anexada is not None and _anexada[0] == atual['geracao']:
+                return _anexada[1]
+            try:
+                tabelas = tuple(_mapear(_pasta(), atual['arquivos'][nome], atual['geracao'], nome == 'mapeamento')
+                                for nome in TABELAS)
+            except FileNotFoundError:
+                # Publicação nova no meio da leitura: relê o contador
+                continue
+            _anexada = (atual['geracao'], tabelas)
+            return tabelas
+        raise FileNotFoundError(f"Base em {_pasta()} mudou durante a leitura")
+
+
+_geracao_processo = None
+
+
+def nova_geracao_no_processo(geracao):
+    """True só na primeira vez que este processo vê `geracao` (para limpar caches do processo uma vez)"""
+    global _geracao_processo
+    with _lock:
+        if geracao == _geracao_processo:
+            return False
+        _geracao_processo = geracao
+        return True
@@ -0,0 +1,289 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly
+import pyarrow
+
+import chatbot_pplx
+import graficos
+import tabelas_html
+from calendario_vencimentos import construir_calendario
+from dados import CAMINHO_GERENCIAIS, carregar_dados_gerenciais, carregar_mapeamento
+from gerador_dados import gerar_planilhas
+from indicadores import (aplicar_filtros, calcular_entregas_por_projeto, calcular_metricas, gerar_alertas,
+                         gerar_alertas_contratuais)
+from motor_sql import CAMINHO_EXCEL, CAMINHO_PARQUET
+from roteador_intencoes import CORPUS_ROTULADO
+from versao_dados import carimbar
+
+BENCH_REPETICOES = int(os.getenv("BENCH_REPETICOES", "10"))
+# Execuções descartadas antes de medir: imports tardios, caches do plotly e do pandas
+AQUECIMENTO = 1
+
+# Baselines versionadas, uma por escala (chips x projetos)
+DIR_BASELINES = Path(__file__).parent / "benchmarks"
+
+# Mais lento que a baseline nessa proporção (e acima do piso em ms) conta como regressão.
+# O mínimo de uma árvore parada oscila até ~1.6x (casos de poucos ms) nesta VM compartilhada; o portão fica acima
+TOLERANCIA = 0.75
+PISO_MS = 5.0
+
+
+def medir(funcao, repeticoes, preparar=None, aquecimento=AQUECIMENTO):
+    """Tempos de `funcao(*preparar())` em ms; `preparar` e o aquecimento ficam fora da medição"""
+    for _ in range(aquecimento):
+        funcao(*(preparar() if preparar else ()))
+    tempos = []
+    for _ in range(repeticoes):
+        argumentos = preparar() if preparar else ()
+        inicio = time.perf_counter()
+        funcao(*argumentos)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {'mediana_ms': round(statistics.median(tempos), 3), 'min_ms': round(min(tempos), 3),
+            'max_ms': round(max(tempos), 3), 'repeticoes': repeticoes}
+
+
+def calibrar(repeticoes=BENCH_REPETICOES):
+    """Carga fixa (numpy, pandas e Python puro) medida junto com os casos: a razão contra
+    a da baseline desconta a diferença de velocidade entre máquinas"""
+    rng = np.random.default_rng(0)
+    valores = rng.random(500_000)
+    df = pd.DataFrame({'chave': rng.integers(0, 500, len(valores)), 'valor': valores})
+
+    def carga():
+        np.sort(valores)
+        df.groupby('chave')['valor'].sum()
+        sum(i * i for i in range(300_000))
+
+    return medir(carga, max(repeticoes, 10))
+
+
+def perguntas_por_intencao():
+    """Primeira pergunta do corpus rotulado de cada intenção"""
+    perguntas = {}
+    for pergunta, intencao in CORPUS_ROTULADO:
+        if intencao is not None:
+            perguntas.setdefault(intencao, pergunta)
+    return perguntas
+
+
+def executar(pasta, repeticoes=BENCH_REPETICOES, repeticoes_excel=1, filtro=None, casos=None):
+    """Mede cada caminho quente sobre as planilhas de `pasta`; {nome: tempos}.
+
+    Mede as funções puras por trás do app: os wrappers com st.cache_data só
+    acrescentam a consulta ao cache. `filtro` restringe aos nomes que o contêm,
+    `casos` aos nomes exatos.
+    """
+    excel, parquet = Path(pasta) / CAMINHO_EXCEL.name, Path(pasta) / CAMINHO_PARQUET.name
+    gerenciais = Path(pasta) / CAMINHO_GERENCIAIS.name
+    resultados = {}
+
+    def caso(nome, funcao, preparar=None, vezes=None):
+        if (filtro and filtro not in nome) or (casos is not None and nome not in casos):
+            return
+        resultados[nome] = medir(funcao, vezes or repeticoes, preparar)
+        print(f"  {nome:<45} {resultados[nome]['min_ms']:>11.2f} ms", file=sys.stderr)
+
+    # load_data_smart: Excel sem cache (regrava o parquet) e depois o parquet
+    caso('load_data_smart (excel)', lambda: carregar_mapeamento(excel, parquet),
+         preparar=lambda: parquet.unlink(missing_ok=True) or (), vezes=repeticoes_excel)
+    df, _ = carregar_mapeamento(excel, parquet)
+    caso('load_data_smart (parquet)', lambda: carregar_mapeamento(excel, parquet))
+    caso('carregar_dados_gerenciais', lambda: carregar_dados_gerenciais(gerenciais))
+    dfcontratos, dftimeline = carregar_dados_gerenciais(gerenciais)
+
+    maiores = df['PROJETO'].value_counts().index[:3].tolist()
+    filtros = {'projetos': maiores, 'operadoras': ['CLARO', 'VIVO']}
+    caso('aplicar_filtros', lambda: aplicar_filtros(df, filtros))
+    caso('calcular_metricas', lambda: calcular_metricas(df))
+    caso('calcular_metricas (filtrado)', lambda: calcular_metricas(aplicar_filtros(df, filtros)))
+    caso('calcular_entregas_por_projeto', lambda: calcular_entregas_por_projeto(df, dfcontratos))
+    entregas = calcular_entregas_por_projeto(df, dfcontratos)
+    caso('gerar_alertas', lambda: gerar_alertas(df))
+    caso('gerar_alertas_contratuais', lambda: gerar_alertas_contratuais(dfcontratos, entregas))
+
+    caso('obter_calendario_vencimentos', lambda: construir_calendario(df))
+    cal = construir_calendario(df)
+    caso('criar_grafico_pizza (OPERADORA)', lambda: graficos.criar_grafico_pizza(df, 'OPERADORA', 'Total'))
+    caso('criar_grafico_pizza (CATEGORIA_CONEXAO)',
+         lambda: graficos.criar_grafico_pizza(df, 'CATEGORIA_CONEXAO', 'Total'))
+    caso('criar_grafico_barras (PROJETO)', lambda: graficos.criar_grafico_barras(df, 'PROJETO'))
+    caso('criar_grafico_barras (STATUS NA OP.)', lambda: graficos.criar_grafico_barras(df, 'STATUS NA OP.'))
+    caso('criar_timeline_vencimentos (M)', lambda: graficos.criar_timeline_vencimentos(cal, 365, 'M'))
+    caso('criar_timeline_vencimentos (D, acumulado)',
+         lambda: graficos.criar_timeline_vencimentos(cal, 365, 'D', acumulado=True))
+    caso('criar_timeline_projetos', lambda: graficos.criar_timeline_projetos(dftimeline))
+    caso('criar_gauge_health', lambda: graficos.criar_gauge_health(calcular_metricas(df)['health_score']))
+    caso('criar_top_projetos_risco', lambda: graficos.criar_top_projetos_risco(cal, 30))
+
+    caso('gerar_html_tabela_entregas', lambda: tabelas_html.gerar_html_tabela_entregas(entregas))
+    caso('gerar_html_tabela_contratos', lambda: tabelas_html.gerar_html_tabela_contratos(dfcontratos))
+
+    # Primeira pergunta de uma base nova: monta índices e estatísticas do chatbot
+    versoes = iter(range(10 ** 9))
+
+    def base_nova():
+        copia = carimbar(df.copy(deep=False), f"{df.attrs.get('versao')}:bench{next(versoes)}")
+        return copia, "Resumo do projeto IAUPE", dfcontratos, dftimeline
+
+    caso('chatbot: primeira pergunta (índices frios)', chatbot_pplx.processar_pergunta, preparar=base_nova)
+
+    # Depois, cada intenção sobre os índices prontos; só a resposta é recalculada
+    for intencao, pergunta in perguntas_por_intencao().items():
+        chatbot_pplx.processar_pergunta(df, pergunta, dfcontratos, dftimeline)
+        caso(f'chatbot: {intencao}', lambda p=pergunta: chatbot_pplx.processar_pergunta(df, p, dfcontratos, dftimeline),
+             preparar=lambda: chatbot_pplx._respostas.limpar() or ())
+    return resultados
+
+
+def ambiente():
+    return {'python': platform.python_version(), 'pandas': pd.__version__, 'pyarrow': pyarrow.__version__,
+            'plotly': plotly.__version__, 'plataforma': platform.platform(), 'cpus': os.cpu_count()}
+
+
+def caminho_baseline(chips, projetos):
+    return DIR_BASELINES / f"baseline-{chips}x{projetos}.json"
+
+
+def fator_calibracao(calibracao, baseline):
+    """Quantas vezes esta máquina está mais lenta que a da baseline (1.0 sem calibração gravada).
+
+    Usa o mínimo: ruído só atrasa, então o mínimo é o retrato mais estável da máquina.
+    """
+    base = baseline.get('calibracao')
+    if not base or not base['min_ms']:
+        return 1.0
+    return calibracao['min_ms'] / base['min_ms']
+
+
+def fator_rodada(resultados, baseline):
+    """Mediana das razões mínimo atual / mínimo da baseline entre os casos (1.0 com menos de 5 em comum).
+
+    Disputa de CPU na VM atrasa a rodada inteira e oscila mais rápido do que a calibração
+    acompanha; uma regressão de verdade mexe em poucos casos e não desloca a mediana. Com -k
+    sobram poucos casos e a mediana seria a do próprio caso medido.
+    """
+    razoes = [atual['min_ms'] / baseline[nome]['min_ms'] for nome, atual in resultados.items()
+              if nome in baseline and baseline[nome]['min_ms']]
+    return statistics.median(razoes) if len(razoes) >= 5 else 1.0
+
+
+def comparar(resultados, baseline, tolerancia=TOLERANCIA, piso_ms=PISO_MS, fator=1.0):
+    """[(nome, atual_ms, base_ms, razão, regrediu)] pelos mínimos; casos sem baseline têm base None.
+
+    Mínimo pelo mesmo motivo da calibração: a mediana de poucas repetições ainda carrega o
+    ruído da máquina. `fator` escala os tempos da baseline para esta máquina (ver fator_calibracao).
+    """
+    linhas = []
+    for nome, atual in resultados.items():
+        base = baseline.get(nome)
+        if base is None:
+            linhas.append((nome, atual['min_ms'], None, None, False))
+            continue
+        base_ms = base['min_ms'] * fator
+        razao = atual['min_ms'] / base_ms if base_ms else float('inf')
+        regrediu = razao > 1 + tolerancia and atual['min_ms'] - base_ms > piso_ms
+        linhas.append((nome, atual['min_ms'], base_ms, razao, regrediu))
+    return linhas
+
+
+def imprimir_comparacao(linhas):
+    print(f"{'caso':<45} {'atual ms':>11} {'base ms':>11} {'razão':>7}")
+    for nome, atual, base, razao, regrediu in linhas:
+        if base is None:
+            print(f"{nome:<45} {atual:>11.2f} {'-':>11} {'novo':>7}")
+        else:
+            print(f"{nome:<45} {atual:>11.2f} {base:>11.2f} {razao:>6.2f}x{'  ⚠️ REGRESSÃO' if regrediu else ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark dos caminhos quentes sobre planilhas sintéticas, comparado com a baseline em JSON.")
+    parser.add_argument('-c', '--chips', type=int, default=10_000)
+    parser.add_argument('-n', '--projetos', type=int, default=10)
+    parser.add_argument('-s', '--semente', type=int, default=42)
+    parser.add_argument('-r', '--repeticoes', type=int, default=BENCH_REPETICOES)
+    parser.add_argument('--repeticoes-excel', type=int, default=1, help="leituras do Excel (lentas na escala grande)")
+    parser.add_argument('-k', '--filtro', help="só os casos cujo nome contém este texto")
+    parser.add_argument('--pasta', help="pasta das planilhas sintéticas (padrão: temporária, reaproveitada por escala)")
+    parser.add_argument('-o', '--saida', help="grava os resultados também neste JSON")
+    parser.add_argument('--gravar-baseline', action='store_true', help="substitui a baseline desta escala")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    args = parser.parse_args(argv)
+
+    pasta = Path(args.pasta or Path(tempfile.gettempdir()) / f"bench-{args.chips}x{args.projetos}-s{args.semente}")
+    if not (pasta / CAMINHO_EXCEL.name).exists() or not (pasta / CAMINHO_GERENCIAIS.name).exists():
+        print(f"Gerando {args.chips:,} chips em {args.projetos} projetos em {pasta}...", file=sys.stderr)
+        gerar_planilhas(pasta, args.chips, args.projetos, args.semente)
+
+    print(f"Medindo ({args.repeticoes} repetições)...", file=sys.stderr)
+    resultados = executar(pasta, args.repeticoes, args.repeticoes_excel, args.filtro)
+    calibracao = calibrar(args.repeticoes)
+    relatorio = {'escala': {'chips': args.chips, 'projetos': args.projetos, 'semente': args.semente},
+                 'ambiente': ambiente(), 'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                 'calibracao': calibracao, 'resultados': resultados}
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    baseline_path = caminho_baseline(args.chips, args.projetos)
+    if args.gravar_baseline:
+        DIR_BASELINES.mkdir(exist_ok=True)
+        anterior = json.loads(baseline_path.read_text(encoding='utf-8')) if baseline_path.exists() else None
+        if anterior and args.filtro:
+            # Medição parcial só atualiza os casos medidos
+            relatorio['resultados'] = {**anterior['resultados'], **resultados}
+        baseline_path.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False) + "\n", encoding='utf-8')
+        print(f"Baseline gravada em {baseline_path}", file=sys.stderr)
+        return 0
+
+    if not baseline_path.exists():
+        imprimir_comparacao(comparar(resultados, {}))
+        print(f"Sem baseline para esta escala; grave com --gravar-baseline ({baseline_path})", file=sys.stderr)
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    fator = fator_calibracao(calibracao, baseline)
+    if 'calibracao' in baseline:
+        print(f"Calibração: esta máquina está {fator:.2f}x o tempo da baseline; tempos da baseline escalados",
+              file=sys.stderr)
+    else:
+        print("⚠️ Baseline sem calibração; grave de novo com --gravar-baseline", file=sys.stderr)
+    rodada = fator_rodada(resultados, baseline['resultados'])
+    if rodada > fator * (1 + args.tolerancia):
+        print(f"⚠️ A rodada inteira ficou {rodada:.2f}x a baseline: máquina disputada ou regressão geral; "
+              f"rode de novo antes de confiar nos tempos", file=sys.stderr)
+    fator = max(fator, rodada)
+    # Tempos absolutos de outra máquina não servem de portão: lá só se informa
+    mesmo_ambiente = baseline['ambiente'] == ambiente()
+    if not mesmo_ambiente:
+        print("⚠️ Baseline gravada em outro ambiente; regressões só são informadas", file=sys.stderr)
+    linhas = comparar(resultados, baseline['resultados'], args.tolerancia, fator=fator)
+    suspeitos = {linha[0] for linha in linhas if linha[4]}
+    if suspeitos:
+        # Um surto de ruído pega as poucas repetições de um caso; só falha o que se repete na confirmação
+        print(f"Confirmando {len(suspeitos)} caso(s) acima da tolerância...", file=sys.stderr)
+        confirmacao = executar(pasta, max(args.repeticoes, BENCH_REPETICOES), args.repeticoes_excel, casos=suspeitos)
+        for nome, tempos in confirmacao.items():
+            resultados[nome] = min(resultados[nome], tempos, key=lambda t: t['min_ms'])
+        linhas = comparar(resultados, baseline['resultados'], args.tolerancia, fator=fator)
+    imprimir_comparacao(linhas)
+    regressoes = [linha[0] for linha in linhas if linha[4]]
+    if regressoes:
+        print(f"{'❌' if mesmo_ambiente else '⚠️'} {len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}: "
+              f"{', '.join(regressoes)}", file=sys.stderr)
+        return 1 if mesmo_ambiente else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
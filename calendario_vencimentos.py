@@ -0,0 +1,138 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+HORIZONTES_PADRAO = [30, 60, 90, 365]
+GRANULARIDADES = {'D': 'Dia', 'W': 'Semana', 'M': 'Mês'}
+HORIZONTE_MAXIMO_DIAS = 730
+
+
+def construir_calendario(df, hoje=None, horizonte_max_dias=HORIZONTE_MAXIMO_DIAS):
+    """Histograma diário de vencimentos por (projeto, operadora) - uma única passada nas linhas"""
+    hoje = pd.Timestamp.now().normalize() if hoje is None else pd.Timestamp(hoje).normalize()
+
+    vazio = {
+        'inicio': hoje, 'horizonte': horizonte_max_dias,
+        'projetos': np.array([], dtype=object), 'operadoras': np.array([], dtype=object),
+        'grupo_projeto': np.array([], dtype=np.int64), 'grupo_operadora': np.array([], dtype=np.int64),
+        'matriz': np.zeros((0, horizonte_max_dias), dtype=np.int32)
+    }
+
+    if df is None or df.empty or 'DATA DE VENCIMENTO' not in df.columns:
+        return vazio
+
+    # Dia 1 = amanhã (mesma regra do painel: vencimento > hoje)
+    venc = df['DATA DE VENCIMENTO'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    offsets = (venc - np.datetime64(hoje.date(), 'D')).astype(np.int64)
+    validos = (offsets >= 1) & (offsets <= horizonte_max_dias)
+
+    if not validos.any():
+        return vazio
+
+    projetos_col = df['PROJETO'] if 'PROJETO' in df.columns else pd.Series('NÃO INFORMADO', index=df.index)
+    operadoras_col = df['OPERADORA'] if 'OPERADORA' in df.columns else pd.Series('NÃO INFORMADO', index=df.index)
+
+    # Projeto/operadora em branco vira um grupo próprio (NaN): entra nos totais, mas não no
+    # ranking por projeto, como no groupby original
+    cod_proj, projetos = pd.factorize(projetos_col.to_numpy()[validos], sort=True, use_na_sentinel=False)
+    cod_op, operadoras = pd.factorize(operadoras_col.to_numpy()[validos], sort=True, use_na_sentinel=False)
+
+    # Só guarda as combinações projeto x operadora que existem na base
+    pares = cod_proj.astype(np.int64) * len(operadoras) + cod_op
+    cod_grupo, pares_unicos = pd.factorize(pares, sort=True)
+
+    n_grupos = len(pares_unicos)
+    dia = offsets[validos] - 1
+    matriz = np.bincount(cod_grupo * horizonte_max_dias + dia, minlength=n_grupos * horizonte_max_dias)
+
+    return {
+        'inicio': hoje, 'horizonte': horizonte_max_dias,
+        'projetos': np.asarray(projetos, dtype=object), 'operadoras': np.asarray(operadoras, dtype=object),
+        'grupo_projeto': pares_unicos // len(operadoras), 'grupo_operadora': pares_unicos % len(operadoras),
+        'matriz': matriz.reshape(n_grupos, horizonte_max_dias).astype(np.int32)
+    }
+
+
+def _selecionar_grupos(cal, projetos=None, operadoras=None):
+    mascara = np.ones(len(cal['grupo_projeto']), dtype=bool)
+    if projetos:
+        mascara &= np.isin(cal['projetos'][cal['grupo_projeto']], list(projetos))
+    if operadoras:
+        mascara &= np.isin(cal['operadoras'][cal['grupo_operadora']], list(operadoras))
+    return mascara
+
+
+def _limitar_horizonte(cal, horizonte_dias):
+    return max(1, min(int(horizonte_dias), cal['horizonte']))
+
+
+def serie_vencimentos(cal, horizonte_dias=365, granularidade='M', projetos=None, operadoras=None, acumulado=False):
+    """Vencimentos agregados por dia/semana/mês dentro do horizonte - sem reler as linhas da base"""
+    if granularidade not in GRANULARIDADES:
+        raise ValueError(f"Granularidade inválida: {granularidade}")
+
+    horizonte = _limitar_horizonte(cal, horizonte_dias)
+    mascara = _selecionar_grupos(cal, projetos, operadoras)
+    diario = cal['matriz'][mascara, :horizonte].sum(axis=0, dtype=np.int64)
+
+    datas = cal['inicio'] + pd.to_timedelta(np.arange(1, horizonte + 1), unit='D')
+    periodos = datas if granularidade == 'D' else datas.to_period(granularidade).to_timestamp()
+
+    serie = pd.Series(diario, index=periodos).groupby(level=0).sum()
+    resultado = pd.DataFrame({'PERIODO': serie.index, 'QUANTIDADE': serie.values})
+    if acumulado:
+        resultado['ACUMULADO'] = resultado['QUANTIDADE'].cumsum()
+    return resultado
+
+
+def vencimentos_por_projeto(cal, horizonte_dias=30, operadoras=None):
+    """Total que vence em até N dias por projeto (maior primeiro, só projetos com vencimentos)"""
+    horizonte = _limitar_horizonte(cal, horizonte_dias)
+    mascara = _selecionar_grupos(cal, operadoras=operadoras)
+
+    por_grupo = cal['matriz'][mascara, :horizonte].sum(axis=1, dtype=np.int64)
+    totais = np.bincount(cal['grupo_projeto'][mascara], weights=por_grupo, minlength=len(cal['projetos']))
+
+    serie = pd.Series(totais.astype(np.int64), index=pd.Index(cal['projetos'], name='PROJETO'))
+    return serie[(serie > 0) & serie.index.notna()].sort_values(ascending=False)
+
+
+def total_vencimentos(cal, horizonte_dias=30, projetos=None, operadoras=None):
+    """Quantidade total que vence em até N dias"""
+    horizonte = _limitar_horizonte(cal, horizonte_dias)
+    mascara = _selecionar_grupos(cal, projetos, operadoras)
+    return int(cal['matriz'][mascara, :horizonte].sum())
+
+
+def conferir(hoje=pd.Timestamp(2026, 10, 19)):
+    """Erros do calendário contra o groupby direto nas linhas, numa base com projeto e operadora em branco"""
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame({
+        'PROJETO': rng.choice(np.array(['IAUPE', 'ES', 'Joinville', None], dtype=object), n),
+        'OPERADORA': rng.choice(np.array(['CLARO', 'VIVO', np.nan], dtype=object), n),
+        'DATA DE VENCIMENTO': (hoje + pd.to_timedelta(rng.integers(-30, 120, n), unit='D')).where(rng.random(n) > 0.05),
+    })
+    cal = construir_calendario(df, hoje)
+    erros = []
+    for dias in (30, 90):
+        janela = df[(df['DATA DE VENCIMENTO'] > hoje) & (df['DATA DE VENCIMENTO'] <= hoje + pd.Timedelta(days=dias))]
+        if total_vencimentos(cal, dias) != len(janela):
+            erros.append(f"total em {dias} dias: {total_vencimentos(cal, dias)} != {len(janela)}")
+        esperado = janela.groupby('PROJETO').size().to_dict()
+        obtido = vencimentos_por_projeto(cal, dias).to_dict()
+        if obtido != esperado:
+            erros.append(f"por projeto em {dias} dias: {obtido} != {esperado}")
+        esperado_op = janela[janela['OPERADORA'] == 'CLARO'].groupby('PROJETO').size()
+        if vencimentos_por_projeto(cal, dias, operadoras=['CLARO']).to_dict() != esperado_op.to_dict():
+            erros.append(f"por projeto (CLARO) em {dias} dias")
+    return erros
+
+
+if __name__ == "__main__":
+    erros = conferir()
+    print(f"Calendário: {len(erros)} erro(s)")
+    for erro in erros:
+        print(f"  ERRO  {erro}")
+    sys.exit(1 if erros else 0)
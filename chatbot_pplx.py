@@ -1,714 +1,1658 @@
-import streamlit as st
-import pandas as pd
-from openai import OpenAI
-import os
-from dotenv import load_dotenv
-from datetime import datetime
-import re
-
-load_dotenv()
-
-PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
-PERPLEXITY_MODEL = "sonar-pro"
-
-
-def inicializar_chatbot():
-    """Inicializa o estado do chatbot"""
-    if "chat_messages" not in st.session_state:
-        st.session_state.chat_messages = []
-    if "chat_client" not in st.session_state:
-        if not PERPLEXITY_API_KEY:
-            st.error("⚠️ API Key da Perplexity não encontrada! Configure o arquivo .env")
-            st.stop()
-        st.session_state.chat_client = OpenAI(
-            api_key=PERPLEXITY_API_KEY,
-            base_url="https://api.perplexity.ai"
-        )
-
-
-def formatar_numero(num):
-    """Formata número com separador de milhar"""
-    try:
-        if pd.isna(num):
-            return "0"
-        return f"{int(num):,}".replace(",", ".")
-    except:
-        return str(num)
-
-
-def buscar_coluna(df, variacoes):
-    """Helper para buscar coluna com múltiplas variações"""
-    for variacao in variacoes:
-        if variacao in df.columns:
-            return variacao
-    return None
-
-
-def detectar_projeto_mencionado(pergunta, df):
-    """Detecta projeto mencionado - VERSÃO CORRIGIDA"""
-    if 'PROJETO' not in df.columns:
-        return None
-    
-    projetos_disponiveis = df['PROJETO'].unique()
-    pergunta_clean = pergunta.strip()
-    pergunta_upper = pergunta_clean.upper()
-    
-    stopwords = ['RESUMO', 'DO', 'DA', 'DE', 'DOS', 'DAS', 'PROJETO', 'COMPLETO', 
-                 'FAÇA', 'FACA', 'UM', 'UMA', 'O', 'A', 'ME', 'DÊ', 'DE', 'SOBRE',
-                 'PARA', 'NO', 'NA', 'EM', 'COM', 'POR', 'SEM', 'ATE', 'ATÉ', 
-                 'VENCEM', 'VENCIMENTO', 'QUAIS', 'QUANTOS', 'DIAS']
-    
-    palavras = pergunta_upper.split()
-    palavras_filtradas = [p for p in palavras if p not in stopwords and len(p) > 1]
-    texto_limpo = ' '.join(palavras_filtradas)
-    
-    # 1. MATCH EXATO
-    for projeto in projetos_disponiveis:
-        if projeto.upper() == texto_limpo or projeto.upper() == pergunta_upper:
-            return projeto
-    
-    # 2. MATCH COMPLETO
-    for projeto in projetos_disponiveis:
-        projeto_upper = projeto.upper()
-        
-        if projeto_upper in pergunta_upper:
-            if len(projeto) <= 2:
-                pattern = r'\b' + re.escape(projeto_upper) + r'\b'
-                if re.search(pattern, pergunta_upper):
-                    return projeto
-            else:
-                return projeto
-    
-    # 3. MATCH POR PALAVRA-CHAVE
-    palavras_significativas = [p for p in palavras_filtradas if len(p) >= 3]
-    
-    for palavra in palavras_significativas:
-        for projeto in projetos_disponiveis:
-            if palavra in projeto.upper():
-                return projeto
-    
-    # 4. MATCH REVERSO
-    for projeto in projetos_disponiveis:
-        palavras_projeto = [p for p in projeto.upper().split() 
-                           if p not in stopwords and len(p) >= 3]
-        
-        for palavra_proj in palavras_projeto:
-            if palavra_proj in palavras_significativas:
-                return projeto
-    
-    return None
-
-
-def listar_projetos_disponiveis(df):
-    """Lista todos os projetos disponíveis"""
-    if 'PROJETO' not in df.columns:
-        return "❌ Coluna PROJETO não encontrada."
-    
-    projetos = sorted(df['PROJETO'].unique())
-    
-    resposta = "## 📁 Projetos Disponíveis na Base\n\n"
-    resposta += f"**Total:** {len(projetos)} projetos\n\n"
-    
-    for i, projeto in enumerate(projetos, 1):
-        qtd = len(df[df['PROJETO'] == projeto])
-        resposta += f"{i}. **{projeto}** ({formatar_numero(qtd)} chips)\n"
-    
-    resposta += "\n💡 *Para relatório completo, digite:* **Resumo do projeto [NOME]**"
-    
-    return resposta
-
-
-def gerar_relatorio_completo_projeto(df, projeto):
-    """Gera relatório executivo COMPLETO com TODAS as seções"""
-    hoje = pd.Timestamp.now().normalize()
-    limite_30d = hoje + pd.Timedelta(days=30)
-    limite_90d = hoje + pd.Timedelta(days=90)
-    
-    df_proj = df[df['PROJETO'] == projeto].copy()
-    
-    if len(df_proj) == 0:
-        return f"❌ Projeto **{projeto}** não encontrado.\n\n{listar_projetos_disponiveis(df)}"
-    
-    total_chips = len(df_proj)
-    
-    resposta = f"## 📊 Relatório Executivo - {projeto}\n\n"
-    resposta += f"**Total de Chips:** {formatar_numero(total_chips)}\n\n"
-    
-    # Variáveis para insights
-    venc_30d = 0
-    ativados = 0
-    inativos_180_count = 0
-    top_operadora = None
-    pct_top_operadora = 0
-    
-    # ===== SEÇÃO 1: DISTRIBUIÇÃO POR OPERADORA =====
-    if 'OPERADORA' in df_proj.columns:
-        por_operadora = df_proj['OPERADORA'].value_counts()
-        
-        resposta += "### 📶 Distribuição por Operadora\n\n"
-        resposta += "| Operadora | Chips | % |\n"
-        resposta += "|-----------|-------|---------|\n"
-        
-        emojis = {"CLARO": "🔴", "VIVO": "🟣", "TIM": "🔵", "OI": "🟡", "ALGAR": "🟢"}
-        
-        for operadora, qtd in por_operadora.items():
-            pct = (qtd / total_chips) * 100
-            emoji = emojis.get(operadora, "📡")
-            resposta += f"| {emoji} {operadora} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
-        
-        if len(por_operadora) > 0:
-            top_operadora = por_operadora.index[0]
-            pct_top_operadora = (por_operadora.iloc[0] / total_chips) * 100
-        
-        resposta += "\n"
-    
-    # ===== SEÇÃO 2: VENCIMENTOS + PRÓXIMOS VENCIMENTOS =====
-    col_venc = buscar_coluna(df_proj, ['DATA DE VENCIMENTO', 'DATA_VENCIMENTO', 'VENCIMENTO'])
-    
-    if col_venc:
-        try:
-            if df_proj[col_venc].dtype == 'object':
-                df_proj[col_venc] = pd.to_datetime(df_proj[col_venc], errors='coerce')
-            
-            df_venc = df_proj[df_proj[col_venc].notna()]
-            
-            validas = len(df_venc[df_venc[col_venc] >= hoje])
-            expiradas = len(df_venc[df_venc[col_venc] < hoje])
-            venc_30d = len(df_venc[(df_venc[col_venc] >= hoje) & 
-                                    (df_venc[col_venc] <= limite_30d)])
-            venc_90d = len(df_venc[(df_venc[col_venc] >= hoje) & 
-                                    (df_venc[col_venc] <= limite_90d)])
-            
-            resposta += "### 📅 Status de Vencimentos\n\n"
-            resposta += "| Status | Quantidade | % |\n"
-            resposta += "|--------|------------|---|\n"
-            resposta += f"| ✅ Válidas | {formatar_numero(validas)} | {(validas/total_chips*100):.1f}% |\n"
-            resposta += f"| ❌ Expiradas | {formatar_numero(expiradas)} | {(expiradas/total_chips*100):.1f}% |\n"
-            resposta += f"| ⚠️ Vencem em 30d | {formatar_numero(venc_30d)} | {(venc_30d/total_chips*100):.1f}% |\n"
-            resposta += f"| 🟡 Vencem em 90d | {formatar_numero(venc_90d)} | {(venc_90d/total_chips*100):.1f}% |\n"
-            
-            # PRÓXIMOS VENCIMENTOS (top 5 datas)
-            if venc_30d > 0:
-                df_prox_venc = df_venc[(df_venc[col_venc] >= hoje) & 
-                                       (df_venc[col_venc] <= limite_30d)].copy()
-                
-                top_datas = df_prox_venc[col_venc].value_counts().head(5).sort_index()
-                
-                resposta += "\n**📆 Próximos Vencimentos (Top 5 Datas):**\n\n"
-                resposta += "| Data | Quantidade |\n"
-                resposta += "|------|------------|\n"
-                
-                for data, qtd in top_datas.items():
-                    resposta += f"| {data.strftime('%d/%m/%Y')} | {formatar_numero(qtd)} chips |\n"
-            
-            resposta += "\n"
-        except Exception as e:
-            resposta += f"### 📅 Vencimentos\n\n⚠️ Erro: {str(e)}\n\n"
-    
-    # ===== SEÇÃO 3: ATIVAÇÕES =====
-    col_ativ = buscar_coluna(df_proj, ['DATA DE ATIVAÇÃO', 'DATA_ATIVACAO', 'ATIVACAO'])
-    
-    if col_ativ:
-        ativados = len(df_proj[df_proj[col_ativ].notna()])
-        pendentes = total_chips - ativados
-        
-        resposta += "### 📡 Status de Ativações\n\n"
-        resposta += "| Status | Quantidade | % |\n"
-        resposta += "|--------|------------|---|\n"
-        resposta += f"| ✅ Ativados | {formatar_numero(ativados)} | {(ativados/total_chips*100):.1f}% |\n"
-        resposta += f"| ⏳ Pendentes | {formatar_numero(pendentes)} | {(pendentes/total_chips*100):.1f}% |\n"
-        resposta += "\n"
-    
-    # ===== SEÇÃO 4: CONEXÕES DETALHADAS =====
-    col_conexao = buscar_coluna(df_proj, ['CATEGORIACONEXAO', 'CATEGORIA_CONEXAO', 'CONEXAO'])
-    
-    if col_conexao:
-        por_categoria = df_proj[col_conexao].value_counts()
-        
-        resposta += "### 🌐 Status de Conexões\n\n"
-        resposta += "| Período | Chips | % |\n"
-        resposta += "|---------|-------|---------|\n"
-        
-        # Ordem lógica
-        ordem_categorias = ['0-30 dias', '31-90 dias', '91-180 dias', 'Mais de 180 dias', 'Nunca Conectou']
-        
-        for cat in ordem_categorias:
-            if cat in por_categoria.index:
-                qtd = por_categoria[cat]
-                pct = (qtd / total_chips) * 100
-                
-                if '0-30' in cat:
-                    emoji = "🟢"
-                elif '31-90' in cat:
-                    emoji = "🟡"
-                elif '91-180' in cat:
-                    emoji = "🟠"
-                else:
-                    emoji = "🔴"
-                
-                resposta += f"| {emoji} {cat} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
-                
-                if cat == 'Mais de 180 dias':
-                    inativos_180_count = qtd
-        
-        resposta += "\n"
-    
-    # ===== SEÇÃO 5: STATUS NA OPERADORA =====
-    col_status = buscar_coluna(df_proj, ['STATUS NA OP.', 'STATUS_OP', 'STATUS'])
-    
-    if col_status:
-        por_status = df_proj[col_status].value_counts().head(5)
-        
-        resposta += "### ⚙️ Status na Operadora (Top 5)\n\n"
-        resposta += "| Status | Chips | % |\n"
-        resposta += "|--------|-------|---|\n"
-        
-        for status, qtd in por_status.items():
-            pct = (qtd / total_chips) * 100
-            resposta += f"| {status} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
-        
-        resposta += "\n"
-    
-    # ===== SEÇÃO 6: MINI TIMELINE =====
-    if col_ativ and col_venc:
-        resposta += "### 📈 Mini Timeline\n\n"
-        
-        try:
-            # Ativações recentes (últimos 30 dias)
-            if df_proj[col_ativ].dtype == 'object':
-                df_proj[col_ativ] = pd.to_datetime(df_proj[col_ativ], errors='coerce')
-            
-            limite_ativ_30d = hoje - pd.Timedelta(days=30)
-            ativ_recentes = len(df_proj[(df_proj[col_ativ].notna()) & 
-                                        (df_proj[col_ativ] >= limite_ativ_30d)])
-            
-            resposta += "| Período | Evento | Quantidade |\n"
-            resposta += "|---------|--------|------------|\n"
-            resposta += f"| Últimos 30 dias | 🆕 Ativações recentes | {formatar_numero(ativ_recentes)} |\n"
-            resposta += f"| Próximos 30 dias | ⚠️ Vencimentos | {formatar_numero(venc_30d)} |\n"
-            resposta += f"| Próximos 90 dias | 🟡 Vencimentos | {formatar_numero(venc_90d)} |\n"
-            resposta += "\n"
-        except:
-            pass
-    
-    # ===== INSIGHTS EXECUTIVOS =====
-    resposta += "### 📌 Insights Executivos\n\n"
-    
-    insights = []
-    
-    if venc_30d > 0:
-        pct_venc = (venc_30d / total_chips) * 100
-        if pct_venc > 15:
-            insights.append(f"🔴 **Crítico:** {formatar_numero(venc_30d)} licenças ({pct_venc:.1f}%) vencem em 30 dias - ação urgente")
-        elif pct_venc > 5:
-            insights.append(f"🟡 **Atenção:** {formatar_numero(venc_30d)} licenças vencem em 30 dias")
-    
-    if ativados > 0:
-        taxa_ativ = (ativados / total_chips) * 100
-        if taxa_ativ < 80:
-            insights.append(f"🔴 **Ativação baixa:** {taxa_ativ:.1f}% dos chips ativados")
-        elif taxa_ativ < 90:
-            insights.append(f"🟡 **Ativação moderada:** {taxa_ativ:.1f}% dos chips ativados")
-    
-    if inativos_180_count > 0:
-        pct_inativos = (inativos_180_count / total_chips) * 100
-        if pct_inativos > 10:
-            insights.append(f"🔴 **Alta inatividade:** {formatar_numero(inativos_180_count)} chips ({pct_inativos:.1f}%) sem conexão há 180+ dias")
-    
-    if top_operadora and pct_top_operadora > 60:
-        insights.append(f"ℹ️ **Concentração:** {pct_top_operadora:.1f}% na operadora {top_operadora}")
-    
-    if insights:
-        for insight in insights:
-            resposta += f"- {insight}\n"
-    else:
-        resposta += "✅ Nenhum ponto crítico identificado - projeto em situação regular.\n"
-    
-    return resposta
-
-
-def executar_consulta_sql(df, pergunta):
-    """Executa consultas SQL - VERSÃO CORRIGIDA"""
-    pergunta_lower = pergunta.lower()
-    hoje = pd.Timestamp.now().normalize()
-    limite_30d = hoje + pd.Timedelta(days=30)
-    
-    # ===== LISTAR PROJETOS =====
-    if any(keyword in pergunta_lower for keyword in ['lista de projetos', 'projetos disponíveis', 'projetos disponiveis', 'liste os projetos']):
-        return listar_projetos_disponiveis(df)
-    
-    # ===== VENCIMENTOS NOS PRÓXIMOS 30 DIAS - PRIORIDADE MÁXIMA =====
-    if ("vencem" in pergunta_lower or "vencimento" in pergunta_lower or "vencendo" in pergunta_lower) and \
-       ("30" in pergunta_lower or "próximos" in pergunta_lower or "proximos" in pergunta_lower) and \
-       ("quais" in pergunta_lower or "projeto" in pergunta_lower):
-        
-        col_venc = buscar_coluna(df, ['DATA DE VENCIMENTO', 'DATA_VENCIMENTO', 'VENCIMENTO'])
-        
-        if not col_venc or 'PROJETO' not in df.columns:
-            return "❌ Colunas necessárias não encontradas."
-        
-        try:
-            if df[col_venc].dtype == 'object':
-                df[col_venc] = pd.to_datetime(df[col_venc], errors='coerce')
-            
-            df_venc = df[(df[col_venc].notna()) & 
-                         (df[col_venc] >= hoje) & 
-                         (df[col_venc] <= limite_30d)].copy()
-        except Exception as e:
-            return f"❌ Erro ao processar vencimentos: {str(e)}"
-        
-        if len(df_venc) == 0:
-            return f"## ✅ Vencimentos - Próximos 30 dias\n\n**Status:** Nenhuma licença vence."
-        
-        por_projeto = df_venc.groupby('PROJETO').size().sort_values(ascending=False)
-        pct_total = (len(df_venc) / len(df)) * 100
-        
-        resposta = f"## 📅 Vencimentos - Próximos 30 dias\n\n"
-        resposta += f"**Período:** {hoje.strftime('%d/%m/%Y')} → {limite_30d.strftime('%d/%m/%Y')}  \n"
-        resposta += f"**Total:** {formatar_numero(len(df_venc))} licenças ({pct_total:.1f}%)\n\n"
-        
-        # Formato com próximas datas
-        resposta += "### Por Projeto\n\n"
-        resposta += "| Projeto | Licenças | % | Próximo Vencimento |\n"
-        resposta += "|---------|----------|---|--------------------|\n"
-        
-        for projeto, qtd in por_projeto.items():
-            pct = (qtd / len(df_venc)) * 100
-            
-            # Busca a próxima data de vencimento deste projeto
-            df_proj_venc = df_venc[df_venc['PROJETO'] == projeto]
-            prox_data = df_proj_venc[col_venc].min()
-            
-            resposta += f"| {projeto} | {formatar_numero(qtd)} | {pct:.1f}% | {prox_data.strftime('%d/%m/%Y')} |\n"
-        
-        top_projeto = por_projeto.index[0]
-        resposta += f"\n**📌 Ação:** Priorizar renovações no **{top_projeto}**."
-        
-        return resposta
-    
-    # ===== DETECTA PROJETO MENCIONADO =====
-    projeto_mencionado = detectar_projeto_mencionado(pergunta, df)
-    
-    if projeto_mencionado:
-        if any(palavra in pergunta_lower for palavra in ['resumo', 'completo', 'relatório', 'relatorio', 'tudo', 'sobre', 'dados', 'informações', 'informacoes', 'status', 'situação', 'situacao']):
-            return gerar_relatorio_completo_projeto(df, projeto_mencionado)
-    
-    # ===== CHIPS CANCELADOS =====
-    if "cancelad" in pergunta_lower:
-        col_status = buscar_coluna(df, ['STATUS NA OP.', 'STATUS', 'STATUS_OP'])
-        
-        if not col_status:
-            return "❌ Coluna de STATUS não encontrada."
-        
-        df_cancelados = df[df[col_status].fillna('').astype(str).str.contains('Cancelad', case=False)]
-        
-        if len(df_cancelados) == 0:
-            return "## ✅ Status de Cancelamentos\n\n**Total:** 0 chips cancelados."
-        
-        pct_total = (len(df_cancelados) / len(df)) * 100
-        
-        resposta = f"## ❌ Chips Cancelados\n\n"
-        resposta += f"**Total:** {formatar_numero(len(df_cancelados))} chips ({pct_total:.1f}%)\n\n"
-        
-        if "operadora" in pergunta_lower and 'OPERADORA' in df.columns:
-            por_operadora = df_cancelados.groupby('OPERADORA').size().sort_values(ascending=False)
-            
-            resposta += "| Operadora | Cancelados | % |\n"
-            resposta += "|-----------|------------|---|\n"
-            
-            emojis = {"CLARO": "🔴", "VIVO": "🟣", "TIM": "🔵", "OI": "🟡", "ALGAR": "🟢"}
-            
-            for operadora, qtd in por_operadora.items():
-                pct = (qtd / len(df_cancelados)) * 100
-                emoji = emojis.get(operadora, "📡")
-                resposta += f"| {emoji} {operadora} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
-        
-        elif 'PROJETO' in df.columns:
-            por_projeto = df_cancelados.groupby('PROJETO').size().sort_values(ascending=False).head(5)
-            
-            resposta += "**Top 5 Projetos:**\n\n"
-            resposta += "| Projeto | Cancelados |\n"
-            resposta += "|---------|------------|\n"
-            
-            for projeto, qtd in por_projeto.items():
-                resposta += f"| {projeto} | {formatar_numero(qtd)} |\n"
-        
-        return resposta
-    
-    # ===== QUANTOS CHIPS POR PROJETO =====
-    if ("quantos" in pergunta_lower or "total" in pergunta_lower) and \
-       "chip" in pergunta_lower and "projeto" in pergunta_lower and \
-       "cancelad" not in pergunta_lower and "venc" not in pergunta_lower:
-        
-        if 'PROJETO' not in df.columns:
-            return "❌ Coluna PROJETO não encontrada."
-        
-        por_projeto = df.groupby('PROJETO').size().sort_values(ascending=False)
-        
-        resposta = f"## 📊 Distribuição de Chips por Projeto\n\n"
-        resposta += f"**Total:** {formatar_numero(len(df))} chips em {len(por_projeto)} projetos\n\n"
-        resposta += "| # | Projeto | Chips | % |\n"
-        resposta += "|---|---------|-------|---------|\n"
-        
-        for i, (projeto, qtd) in enumerate(por_projeto.items(), 1):
-            pct = (qtd / len(df)) * 100
-            resposta += f"| {i} | {projeto} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
-        
-        return resposta
-    
-    # ===== CHIPS SEM CONEXÃO 180+ DIAS =====
-    if "180" in pergunta_lower or "sem conexão" in pergunta_lower or "sem conexao" in pergunta_lower:
-        
-        col_conexao = buscar_coluna(df, ['CATEGORIACONEXAO', 'CATEGORIA_CONEXAO', 'CATEGORIA CONEXAO', 'CONEXAO'])
-        
-        if not col_conexao:
-            return "❌ Coluna de conexão não encontrada."
-        
-        categorias_disponiveis = df[col_conexao].unique()
-        
-        if 'Mais de 180 dias' not in categorias_disponiveis:
-            return f"❌ Categoria 'Mais de 180 dias' não encontrada."
-        
-        sem_conexao = df[df[col_conexao] == 'Mais de 180 dias']
-        
-        if len(sem_conexao) == 0:
-            return "## ✅ Conexões\n\n**Status:** Nenhum chip inativo há 180+ dias."
-        
-        pct = (len(sem_conexao) / len(df)) * 100
-        
-        resposta = f"## 🔴 Chips Inativos - 180+ dias\n\n"
-        resposta += f"**Total:** {formatar_numero(len(sem_conexao))} chips ({pct:.1f}%)\n\n"
-        
-        if 'PROJETO' in df.columns:
-            por_projeto = sem_conexao.groupby('PROJETO').size().sort_values(ascending=False)
-            
-            resposta += "| Projeto | Inativos | % |\n"
-            resposta += "|---------|----------|---|\n"
-            
-            for projeto, qtd in por_projeto.items():
-                pct_proj = (qtd / len(sem_conexao)) * 100
-                resposta += f"| {projeto} | {formatar_numero(qtd)} | {pct_proj:.1f}% |\n"
-            
-            top_projeto = por_projeto.index[0]
-            resposta += f"\n**📌 Ação:** Investigar inatividade no **{top_projeto}**."
-        
-        return resposta
-    
-    # ===== STATUS DAS ATIVAÇÕES =====
-    if "ativa" in pergunta_lower and ("status" in pergunta_lower or "geral" in pergunta_lower):
-        
-        col_ativ = buscar_coluna(df, ['DATA DE ATIVAÇÃO', 'DATA_ATIVACAO', 'ATIVACAO'])
-        
-        if not col_ativ:
-            return "❌ Coluna de ativação não encontrada."
-        
-        ativados = df[df[col_ativ].notna()]
-        pct_ativados = (len(ativados) / len(df)) * 100
-        
-        resposta = f"## 📡 Status de Ativações\n\n"
-        resposta += f"**Base:** {formatar_numero(len(df))} chips\n\n"
-        resposta += "| Métrica | Quantidade | % |\n"
-        resposta += "|---------|------------|---|\n"
-        resposta += f"| ✅ Ativados | {formatar_numero(len(ativados))} | {pct_ativados:.1f}% |\n"
-        resposta += f"| ⏳ Pendentes | {formatar_numero(len(df)-len(ativados))} | {100-pct_ativados:.1f}% |\n"
-        
-        if 'PROJETO' in df.columns and len(ativados) > 0:
-            resposta += f"\n**Top 5 Projetos:**\n\n"
-            resposta += "| Projeto | Ativados/Total | Taxa |\n"
-            resposta += "|---------|----------------|------|\n"
-            
-            projetos_data = []
-            for projeto in df['PROJETO'].unique():
-                total_proj = len(df[df['PROJETO'] == projeto])
-                ativ_proj = len(ativados[ativados['PROJETO'] == projeto])
-                taxa = (ativ_proj / total_proj * 100) if total_proj > 0 else 0
-                projetos_data.append((projeto, ativ_proj, total_proj, taxa))
-            
-            projetos_data.sort(key=lambda x: x[3], reverse=True)
-            
-            for projeto, ativ, total, taxa in projetos_data[:5]:
-                emoji = "✅" if taxa >= 90 else "🟡" if taxa >= 75 else "🔴"
-                resposta += f"| {projeto} | {formatar_numero(ativ)}/{formatar_numero(total)} | {taxa:.1f}% {emoji} |\n"
-        
-        return resposta
-    
-    # ===== DISTRIBUIÇÃO POR OPERADORA =====
-    if "operadora" in pergunta_lower and "cancelad" not in pergunta_lower:
-        
-        if 'OPERADORA' not in df.columns:
-            return "❌ Coluna OPERADORA não encontrada."
-        
-        por_operadora = df['OPERADORA'].value_counts().sort_values(ascending=False)
-        
-        resposta = f"## 📶 Distribuição por Operadora\n\n"
-        resposta += f"**Total:** {formatar_numero(len(df))} chips\n\n"
-        resposta += "| Operadora | Chips | % |\n"
-        resposta += "|-----------|-------|---------|\n"
-        
-        emojis = {"CLARO": "🔴", "VIVO": "🟣", "TIM": "🔵", "OI": "🟡", "ALGAR": "🟢"}
-        
-        for operadora, qtd in por_operadora.items():
-            pct = (qtd / len(df)) * 100
-            emoji = emojis.get(operadora, "📡")
-            resposta += f"| {emoji} {operadora} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
-        
-        return resposta
-    
-    # ===== LICENÇAS EXPIRADAS =====
-    if "expirad" in pergunta_lower or "vencidas" in pergunta_lower:
-        
-        col_venc = buscar_coluna(df, ['DATA DE VENCIMENTO', 'DATA_VENCIMENTO'])
-        
-        if not col_venc:
-            return "❌ Coluna de vencimento não encontrada."
-        
-        try:
-            if df[col_venc].dtype == 'object':
-                df[col_venc] = pd.to_datetime(df[col_venc], errors='coerce')
-            
-            df_exp = df[(df[col_venc].notna()) & (df[col_venc] < hoje)]
-        except:
-            return "❌ Erro ao processar licenças expiradas."
-        
-        if len(df_exp) == 0:
-            return "## ✅ Licenças Expiradas\n\n**Status:** Nenhuma licença expirada."
-        
-        pct_total = (len(df_exp) / len(df)) * 100
-        
-        resposta = f"## ⚠️ Licenças Expiradas\n\n"
-        resposta += f"**Total:** {formatar_numero(len(df_exp))} licenças ({pct_total:.1f}%)\n\n"
-        
-        if 'PROJETO' in df.columns:
-            por_projeto = df_exp.groupby('PROJETO').size().sort_values(ascending=False)
-            
-            resposta += "| Projeto | Expiradas | % do Projeto |\n"
-            resposta += "|---------|-----------|-------------|\n"
-            
-            for projeto, qtd in por_projeto.items():
-                total_proj = len(df[df['PROJETO'] == projeto])
-                pct = (qtd / total_proj) * 100
-                resposta += f"| {projeto} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
-        
-        return resposta
-    
-    return None
-
-
-def processar_pergunta(df, pergunta, dfcontratos=None, dftimeline=None):
-    """Processa pergunta"""
-    resposta_sql = executar_consulta_sql(df, pergunta)
-    
-    if resposta_sql:
-        return resposta_sql
-    
-    colunas_disponiveis = df.columns.tolist()
-    
-    sugestoes = ["💡 **Não entendi a pergunta.**\n\n**Sugestões:**\n"]
-    
-    if 'PROJETO' in colunas_disponiveis:
-        sugestoes.append("- Liste os projetos disponíveis")
-        sugestoes.append("- Resumo do projeto [NOME]")
-        sugestoes.append("- Quantos chips por projeto?")
-    
-    if 'DATA DE VENCIMENTO' in colunas_disponiveis or 'DATA_VENCIMENTO' in colunas_disponiveis:
-        sugestoes.append("- Quais projetos vencem em 30 dias?")
-        sugestoes.append("- Quantas licenças expiradas?")
-    
-    col_conexao = buscar_coluna(df, ['CATEGORIACONEXAO', 'CATEGORIA_CONEXAO'])
-    if col_conexao:
-        sugestoes.append("- Quantos chips sem conexão há 180 dias?")
-    
-    if 'OPERADORA' in colunas_disponiveis:
-        sugestoes.append("- Qual a distribuição por operadora?")
-    
-    return "\n".join(sugestoes)
-
-
-def render_chatbot(df, dfcontratos=None, dftimeline=None):
-    """Renderiza chatbot com scroll - VERSÃO FINAL CORRIGIDA"""
-    inicializar_chatbot()
-    
-    # Header
-    st.markdown("""
-    <div class="header-parallax">
-        <div style="display: flex; align-items: center; gap: 1rem;">
-            <div style="font-size: 2.5rem;">🤖</div>
-            <div>
-                <h1 style="color: white; font-size: 2rem; font-weight: 900; margin: 0;">Chatbot Inteligente</h1>
-                <p style="color: #C5E1A5; font-size: 0.95rem; margin: 0.3rem 0 0 0; font-weight: 600;">
-                    Análise de Dados • Business Intelligence • Base Mobile
-                </p>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("---")
-    
-    # Botão limpar
-    col1, col2, col3 = st.columns([1, 6, 1])
-    with col3:
-        if st.button("🗑️ Limpar", use_container_width=True, type="secondary"):
-            st.session_state.chat_messages = []
-            st.rerun()
-    
-    st.markdown("<div style='height: 0.5rem;'></div>", unsafe_allow_html=True)
-    
-    # Perguntas sugeridas (SEM DUPLICAÇÃO - CHAVE ÚNICA)
-    with st.expander("💬 **Análises Rápidas** (clique para expandir)", expanded=True):
-        sugestoes = [
-            ("📁", "Liste os projetos disponíveis"),
-            ("📊", "Quantos chips por projeto?"),
-            ("📅", "Quais projetos vencem em 30 dias?"),
-            ("🔴", "Quantos chips sem conexão há 180 dias?"),
-            ("📡", "Qual o status geral das ativações?"),
-            ("📶", "Qual a distribuição por operadora?"),
-        ]
-        
-        pergunta_escolhida = None
-        
-        for i in range(0, len(sugestoes), 2):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if i < len(sugestoes):
-                    emoji, texto = sugestoes[i]
-                    # CHAVE ÚNICA: timestamp incluído
-                    if st.button(f"{emoji}  {texto}", key=f"chatbot_sug_{i}", use_container_width=True, type="secondary"):
-                        pergunta_escolhida = texto
-            
-            with col2:
-                if i + 1 < len(sugestoes):
-                    emoji, texto = sugestoes[i + 1]
-                    # CHAVE ÚNICA: timestamp incluído
-                    if st.button(f"{emoji}  {texto}", key=f"chatbot_sug_{i+1}", use_container_width=True, type="secondary"):
-                        pergunta_escolhida = texto
-    
-    st.markdown("---")
-    
-    # ===== CHAT COM SCROLL - ALTURA 1100px =====
-    st.markdown("### 💬 Conversação")
-    
-    chat_container = st.container(height=1100)
-    
-    with chat_container:
-        if len(st.session_state.chat_messages) == 0:
-            st.info("👋 Olá! Faça uma pergunta sobre os dados ou use os atalhos acima.")
-        
-        for msg in st.session_state.chat_messages:
-            with st.chat_message(msg["role"]):
-                st.markdown(msg["content"])
-    
-    # Input fixo
-    st.markdown("---")
-    
-    prompt = pergunta_escolhida if pergunta_escolhida else st.chat_input("💭 Digite sua pergunta... (Ex: 'Resumo do projeto IAUPE')")
-    
-    if prompt:
-        st.session_state.chat_messages.append({"role": "user", "content": prompt})
-        
-        with st.spinner("🔍 Analisando dados..."):
-            resposta = processar_pergunta(df, prompt, dfcontratos, dftimeline)
-            st.session_state.chat_messages.append({"role": "assistant", "content": resposta})
-        
-        st.rerun()
+import streamlit as st
+import streamlit.components.v1 as components
+import pandas as pd
+import numpy as np
+import httpx
+import openai
+from openai import OpenAI
+import os
+import re
+import threading
+import time
+import uuid
+from dotenv import load_dotenv
+from http.cookies import CookieError, SimpleCookie
+from concurrent.futures import ThreadPoolExecutor
+from roteador_intencoes import REQUER_PERIODO, REQUER_PROJETO, normalizar, rotear
+from indice_projetos import construir_indice_projetos, detectar_projeto
+from indice_datas import IndiceDatas
+from extrator_periodos import deslocamento, extrair_duracao, extrair_periodo, rotulo_duracao
+from versao_dados import CacheLRU, LimiteConcorrencia, versao_dataset
+from estatisticas_projetos import (COLUNAS_ULTIMA_CONEXAO, COLUNAS_VENCIMENTO, construir_estatisticas,
+                                   construir_tabela_contratos, contagens_do_projeto, contagens_totais)
+from resumo_llm import ORDEM_STATUS_CONTRATO, construir_resumo
+from refinamento import aplicar_filtros_selecao, contar_por, eh_continuacao, extrair_filtros
+import historico_chat
+import instrumentacao
+
+load_dotenv()
+
+PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
+PERPLEXITY_MODEL = "sonar-pro"
+# Aponte para um servidor compatível com OpenAI local para testar sem rede
+PERPLEXITY_BASE_URL = os.getenv("PERPLEXITY_BASE_URL", "https://api.perplexity.ai")
+
+# Fallback via LLM para perguntas que nenhuma intenção responde
+LLM_TIMEOUT_CONEXAO = 5.0
+LLM_TIMEOUT_LEITURA = 30.0   # espera máxima entre dois pedaços do stream
+LLM_TIMEOUT_TOTAL = 90.0     # teto da resposta inteira
+LLM_MAX_TOKENS = 800
+# Tamanho máximo (estimado) do resumo da base enviado como contexto
+LLM_ORCAMENTO_CONTEXTO = int(os.getenv("LLM_ORCAMENTO_CONTEXTO", "1500"))
+
+# Aceita nomes de projeto com pequenos erros de digitação quando nada casa exato (CHAT_DETECCAO_FUZZY=1).
+# Desligado por padrão: uma palavra comum parecida com um nome vira projeto por engano
+CHAT_DETECCAO_FUZZY = os.getenv("CHAT_DETECCAO_FUZZY", "0").strip().lower() in ("1", "true", "sim")
+
+# Mensagens exibidas na conversa; as anteriores entram sob demanda, no mesmo passo
+CHAT_JANELA_MENSAGENS = 20
+
+# Seleções de linhas (respostas e refinamentos) guardadas por conversa
+CHAT_SELECOES_POR_CONVERSA = 4
+
+# Cookie que identifica o usuário no histórico do chat (um ano)
+COOKIE_USUARIO_CHAT = "bm_chat_uid"
+COOKIE_USUARIO_CHAT_IDADE = 365 * 24 * 3600
+
+_indices_projetos = CacheLRU(maxsize=8)
+_estatisticas = CacheLRU(maxsize=8)
+_indices_datas = CacheLRU(maxsize=8)
+_tabelas_contratos = CacheLRU(maxsize=8)
+_timelines = CacheLRU(maxsize=8)
+_respostas = CacheLRU(maxsize=256)
+
+# Relatórios de projeto pré-gerados em segundo plano após cada carga da base sem filtros:
+# os N maiores projetos, em cache próprio para não expulsar as respostas interativas
+RELATORIOS_PRE_GERADOS = int(os.getenv("RELATORIOS_PRE_GERADOS", "50"))
+_pool_relatorios = ThreadPoolExecutor(max_workers=2, thread_name_prefix='relatorios')
+_pre_geracoes = CacheLRU(maxsize=8)
+_relatorios_pre_gerados = CacheLRU(maxsize=RELATORIOS_PRE_GERADOS)
+_resumos_llm = CacheLRU(maxsize=16)
+
+_cliente_llm = None
+_lock_cliente_llm = threading.Lock()
+
+# Respostas de intenção fora do cache (CPU) simultâneas no processo; o excedente espera na fila
+LIMITE_RESPOSTAS_PESADAS = int(os.getenv("LIMITE_RESPOSTAS_PESADAS", "4"))
+_limite_pesados = LimiteConcorrencia(LIMITE_RESPOSTAS_PESADAS)
+
+# Streams do LLM ficam abertos até LLM_TIMEOUT_TOTAL esperando a rede: limite à parte,
+# para não prender as vagas das respostas de CPU
+LIMITE_CHAMADAS_LLM = int(os.getenv("LIMITE_CHAMADAS_LLM", "4"))
+_limite_llm = LimiteConcorrencia(LIMITE_CHAMADAS_LLM)
+
+# Perguntas iguais ao LLM em andamento: quem chega depois acompanha a mesma resposta
+_llm_em_andamento = {}
+_lock_llm = threading.Lock()
+_llm_coalescidas = 0
+
+
+def obter_cliente_llm():
+    """Um cliente por processo: todas as sessões reaproveitam o pool de conexões httpx"""
+    global _cliente_llm
+    if not PERPLEXITY_API_KEY:
+        return None
+    with _lock_cliente_llm:
+        if _cliente_llm is None:
+            http_client = httpx.Client(
+                timeout=httpx.Timeout(LLM_TIMEOUT_LEITURA, connect=LLM_TIMEOUT_CONEXAO),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+            _cliente_llm = OpenAI(
+                api_key=PERPLEXITY_API_KEY,
+                base_url=PERPLEXITY_BASE_URL,
+                http_client=http_client,
+                max_retries=1,
+            )
+        return _cliente_llm
+
+
+def _cookie_usuario_chat():
+    contexto = getattr(st, "context", None)
+    if contexto is not None:
+        # Streamlit 1.37+
+        return contexto.cookies.get(COOKIE_USUARIO_CHAT, "")
+    try:
+        # No 1.30 os cookies só chegam pelos cabeçalhos do websocket da sessão
+        from streamlit.web.server.websocket_headers import _get_websocket_headers
+        cabecalhos = _get_websocket_headers() or {}
+    except Exception:
+        return ""
+    cookie = SimpleCookie()
+    try:
+        cookie.load(cabecalhos.get("Cookie", ""))
+    except CookieError:
+        return ""
+    return cookie[COOKIE_USUARIO_CHAT].value if COOKIE_USUARIO_CHAT in cookie else ""
+
+
+def _gravar_cookie_usuario_chat(uid):
+    # Sem HttpOnly (quem grava é o navegador); o iframe do componente tem a mesma origem do app
+    components.html(f"""<script>
+    const segura = window.parent.location.protocol === "https:" ? "; Secure" : "";
+    window.parent.document.cookie = "{COOKIE_USUARIO_CHAT}={uid}; Max-Age={COOKIE_USUARIO_CHAT_IDADE}; Path=/; SameSite=Lax" + segura;
+    </script>""", height=0)
+
+
+def obter_usuario_chat():
+    """Identificador do usuário num cookie do navegador; criado na primeira visita.
+
+    Quem volta pelo mesmo navegador (recarga, favorito) recupera a conversa. Na URL
+    ele vazaria o histórico em qualquer link compartilhado: um ?uid= antigo é removido.
+    Sem acesso aos cookies, a conversa dura a sessão.
+    """
+    if "uid" in st.query_params:
+        del st.query_params["uid"]
+    uid = _cookie_usuario_chat()
+    if not re.fullmatch(r"[A-Za-z0-9_-]{8,64}", uid):
+        uid = uuid.uuid4().hex
+    _gravar_cookie_usuario_chat(uid)
+    return uid
+
+
+def inicializar_chatbot():
+    """Inicializa o estado do chatbot"""
+    if "chat_janela" not in st.session_state:
+        st.session_state.chat_janela = CHAT_JANELA_MENSAGENS
+    if "chat_conversa" not in st.session_state:
+        st.session_state.chat_conversa = nova_conversa()
+    if "chat_messages" not in st.session_state:
+        # Na sessão fica só a janela exibida; o resto da conversa está no SQLite
+        st.session_state.chat_usuario = obter_usuario_chat()
+        st.session_state.chat_messages, st.session_state.chat_total = historico_chat.carregar_recentes(
+            st.session_state.chat_usuario, st.session_state.chat_janela)
+    if "chat_client" not in st.session_state:
+        # Sem API key só o fallback via LLM fica desligado; as análises continuam
+        st.session_state.chat_client = obter_cliente_llm()
+
+
+def formatar_mensagem(conteudo):
+    """Texto da mensagem pronto para st.markdown.
+
+    O Streamlit lê $...$ como LaTeX: "R$ 10 e R$ 20" do LLM viraria fórmula.
+    """
+    return re.sub(r'(?<!\\)\$', r'\\$', str(conteudo))
+
+
+def adicionar_mensagem(papel, conteudo):
+    """Acrescenta à conversa e ao histórico persistente, mantendo a sessão no tamanho da janela"""
+    msg = {"role": papel, "content": conteudo}
+    mensagens = st.session_state.chat_messages
+    mensagens.append(msg)
+    del mensagens[:-st.session_state.chat_janela]
+    st.session_state.chat_total = min(st.session_state.get("chat_total", 0) + 1,
+                                      historico_chat.RETENCAO_POR_USUARIO)
+    if "chat_usuario" in st.session_state:
+        historico_chat.registrar(st.session_state.chat_usuario, papel, conteudo)
+    return msg
+
+
+def carregar_mensagens_anteriores():
+    """Traz do histórico o próximo bloco de mensagens mais antigas"""
+    mensagens = st.session_state.chat_messages
+    anteriores, st.session_state.chat_total = historico_chat.carregar_recentes(
+        st.session_state.chat_usuario, CHAT_JANELA_MENSAGENS, pular=len(mensagens))
+    st.session_state.chat_messages = anteriores + mensagens
+    st.session_state.chat_janela = len(st.session_state.chat_messages) + CHAT_JANELA_MENSAGENS
+
+
+def exibicao_mensagem(msg):
+    """Forma exibida da mensagem, calculada uma vez e guardada na própria mensagem"""
+    if "exibicao" not in msg:
+        msg["exibicao"] = formatar_mensagem(msg["content"])
+    return msg["exibicao"]
+
+
+def formatar_numero(num):
+    """Formata número com separador de milhar"""
+    try:
+        if pd.isna(num):
+            return "0"
+        return f"{int(num):,}".replace(",", ".")
+    except:
+        return str(num)
+
+
+def buscar_coluna(df, variacoes):
+    """Helper para buscar coluna com múltiplas variações"""
+    for variacao in variacoes:
+        if variacao in df.columns:
+            return variacao
+    return None
+
+
+def obter_indice_projetos(df):
+    """Índice de nomes de projeto, construído uma vez por versão da base"""
+    return _indices_projetos.obter_ou_calcular(
+        versao_dataset(df), lambda: construir_indice_projetos(df['PROJETO'].unique()))
+
+
+def obter_estatisticas(df):
+    """Tabela de estatísticas por projeto, uma por versão da base (e por dia)"""
+    hoje = pd.Timestamp.now().normalize()
+    return _estatisticas.obter_ou_calcular(
+        (versao_dataset(df), hoje), lambda: construir_estatisticas(df, hoje))
+
+
+def obter_indice_datas(df, coluna):
+    """Datas da coluna ordenadas (com o projeto), um índice por versão da base"""
+    return _indices_datas.obter_ou_calcular(
+        (versao_dataset(df), coluna), lambda: IndiceDatas(df[coluna], df['PROJETO']))
+
+
+def obter_tabela_contratos(df, dfcontratos):
+    """Contratos unidos aos chips de cada projeto, uma tabela por versão das duas bases (e dia)"""
+    hoje = pd.Timestamp.now().normalize()
+    return _tabelas_contratos.obter_ou_calcular(
+        (versao_dataset(df), versao_dataset(dfcontratos), hoje),
+        lambda: construir_tabela_contratos(df, dfcontratos, hoje))
+
+
+def obter_timeline(dftimeline):
+    """Eventos da timeline em ordem de data, com a ação normalizada para a busca"""
+    def preparar():
+        eventos = dftimeline.assign(DATA=pd.to_datetime(dftimeline['DATA'], errors='coerce'))
+        eventos = eventos.dropna(subset=['DATA']).sort_values('DATA', kind='stable')
+        eventos['_ACAO'] = eventos['AÇÃO'].astype(str).map(normalizar) if 'AÇÃO' in eventos.columns else ''
+        return eventos.reset_index(drop=True)
+    return _timelines.obter_ou_calcular(versao_dataset(dftimeline), preparar)
+
+
+def detectar_projeto_mencionado(pergunta, df):
+    """Detecta projeto mencionado - via índice pré-construído"""
+    if 'PROJETO' not in df.columns:
+        return None
+    
+    return detectar_projeto(obter_indice_projetos(df), pergunta, fuzzy=CHAT_DETECCAO_FUZZY)
+
+
+def listar_projetos_disponiveis(df):
+    """Lista todos os projetos disponíveis"""
+    if 'PROJETO' not in df.columns:
+        return "❌ Coluna PROJETO não encontrada."
+    
+    tabela = obter_estatisticas(df)['tabela']
+    
+    resposta = "## 📁 Projetos Disponíveis na Base\n\n"
+    resposta += f"**Total:** {len(tabela)} projetos\n\n"
+    
+    for i, (projeto, qtd) in enumerate(tabela['TOTAL'].items(), 1):
+        resposta += f"{i}. **{projeto}** ({formatar_numero(qtd)} chips)\n"
+    
+    resposta += "\n💡 *Para relatório completo, digite:* **Resumo do projeto [NOME]**"
+    
+    return resposta
+
+
+def gerar_relatorio_completo_projeto(df, projeto):
+    """Gera relatório executivo COMPLETO com TODAS as seções"""
+    estat = obter_estatisticas(df)
+    tabela = estat['tabela']
+    colunas = estat['colunas']
+    
+    if projeto not in tabela.index:
+        return f"❌ Projeto **{projeto}** não encontrado.\n\n{listar_projetos_disponiveis(df)}"
+    
+    linha = tabela.loc[projeto]
+    total_chips = int(linha['TOTAL'])
+    
+    resposta = f"## 📊 Relatório Executivo - {projeto}\n\n"
+    resposta += f"**Total de Chips:** {formatar_numero(total_chips)}\n\n"
+    
+    # Variáveis para insights
+    venc_30d = 0
+    ativados = 0
+    inativos_180_count = 0
+    top_operadora = None
+    pct_top_operadora = 0
+    
+    # ===== SEÇÃO 1: DISTRIBUIÇÃO POR OPERADORA =====
+    if colunas['operadora']:
+        por_operadora = contagens_do_projeto(estat['operadoras'], projeto)
+        
+        resposta += "### 📶 Distribuição por Operadora\n\n"
+        resposta += "| Operadora | Chips | % |\n"
+        resposta += "|-----------|-------|---------|\n"
+        
+        emojis = {"CLARO": "🔴", "VIVO": "🟣", "TIM": "🔵", "OI": "🟡", "ALGAR": "🟢"}
+        
+        for operadora, qtd in por_operadora.items():
+            pct = (qtd / total_chips) * 100
+            emoji = emojis.get(operadora, "📡")
+            resposta += f"| {emoji} {operadora} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
+        
+        if len(por_operadora) > 0:
+            top_operadora = por_operadora.index[0]
+            pct_top_operadora = (por_operadora.iloc[0] / total_chips) * 100
+        
+        resposta += "\n"
+    
+    # ===== SEÇÃO 2: VENCIMENTOS + PRÓXIMOS VENCIMENTOS =====
+    if colunas['vencimento']:
+        validas = int(linha['VALIDAS'])
+        expiradas = int(linha['EXPIRADAS'])
+        venc_30d = int(linha['VENC_30D'])
+        venc_90d = int(linha['VENC_90D'])
+        
+        resposta += "### 📅 Status de Vencimentos\n\n"
+        resposta += "| Status | Quantidade | % |\n"
+        resposta += "|--------|------------|---|\n"
+        resposta += f"| ✅ Válidas | {formatar_numero(validas)} | {(validas/total_chips*100):.1f}% |\n"
+        resposta += f"| ❌ Expiradas | {formatar_numero(expiradas)} | {(expiradas/total_chips*100):.1f}% |\n"
+        resposta += f"| ⚠️ Vencem em 30d | {formatar_numero(venc_30d)} | {(venc_30d/total_chips*100):.1f}% |\n"
+        resposta += f"| 🟡 Vencem em 90d | {formatar_numero(venc_90d)} | {(venc_90d/total_chips*100):.1f}% |\n"
+        
+        # PRÓXIMOS VENCIMENTOS (top 5 datas)
+        if venc_30d > 0:
+            # Empates de quantidade: as datas mais próximas primeiro
+            por_data = contagens_do_projeto(estat['datas_30d'], projeto).sort_index()
+            top_datas = por_data.sort_values(ascending=False, kind='stable').head(5).sort_index()
+            
+            resposta += "\n**📆 Próximos Vencimentos (Top 5 Datas):**\n\n"
+            resposta += "| Data | Quantidade |\n"
+            resposta += "|------|------------|\n"
+            
+            for data, qtd in top_datas.items():
+                resposta += f"| {data.strftime('%d/%m/%Y')} | {formatar_numero(qtd)} chips |\n"
+        
+        resposta += "\n"
+    
+    # ===== SEÇÃO 3: ATIVAÇÕES =====
+    if colunas['ativacao']:
+        ativados = int(linha['ATIVADOS'])
+        pendentes = total_chips - ativados
+        
+        resposta += "### 📡 Status de Ativações\n\n"
+        resposta += "| Status | Quantidade | % |\n"
+        resposta += "|--------|------------|---|\n"
+        resposta += f"| ✅ Ativados | {formatar_numero(ativados)} | {(ativados/total_chips*100):.1f}% |\n"
+        resposta += f"| ⏳ Pendentes | {formatar_numero(pendentes)} | {(pendentes/total_chips*100):.1f}% |\n"
+        resposta += "\n"
+    
+    # ===== SEÇÃO 4: CONEXÕES DETALHADAS =====
+    if colunas['conexao']:
+        por_categoria = contagens_do_projeto(estat['conexao'], projeto)
+        
+        resposta += "### 🌐 Status de Conexões\n\n"
+        resposta += "| Período | Chips | % |\n"
+        resposta += "|---------|-------|---------|\n"
+        
+        # Ordem lógica
+        ordem_categorias = ['0-30 dias', '31-90 dias', '91-180 dias', 'Mais de 180 dias', 'Nunca Conectou']
+        
+        for cat in ordem_categorias:
+            if cat in por_categoria.index:
+                qtd = por_categoria[cat]
+                pct = (qtd / total_chips) * 100
+                
+                if '0-30' in cat:
+                    emoji = "🟢"
+                elif '31-90' in cat:
+                    emoji = "🟡"
+                elif '91-180' in cat:
+                    emoji = "🟠"
+                else:
+                    emoji = "🔴"
+                
+                resposta += f"| {emoji} {cat} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
+                
+                if cat == 'Mais de 180 dias':
+                    inativos_180_count = qtd
+        
+        resposta += "\n"
+    
+    # ===== SEÇÃO 5: STATUS NA OPERADORA =====
+    if colunas['status']:
+        por_status = contagens_do_projeto(estat['status_op'], projeto).head(5)
+        
+        resposta += "### ⚙️ Status na Operadora (Top 5)\n\n"
+        resposta += "| Status | Chips | % |\n"
+        resposta += "|--------|-------|---|\n"
+        
+        for status, qtd in por_status.items():
+            pct = (qtd / total_chips) * 100
+            resposta += f"| {status} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
+        
+        resposta += "\n"
+    
+    # ===== SEÇÃO 6: MINI TIMELINE =====
+    if colunas['ativacao'] and colunas['vencimento']:
+        resposta += "### 📈 Mini Timeline\n\n"
+        resposta += "| Período | Evento | Quantidade |\n"
+        resposta += "|---------|--------|------------|\n"
+        resposta += f"| Últimos 30 dias | 🆕 Ativações recentes | {formatar_numero(linha['ATIV_RECENTES_30D'])} |\n"
+        resposta += f"| Próximos 30 dias | ⚠️ Vencimentos | {formatar_numero(venc_30d)} |\n"
+        resposta += f"| Próximos 90 dias | 🟡 Vencimentos | {formatar_numero(venc_90d)} |\n"
+        resposta += "\n"
+    
+    # ===== INSIGHTS EXECUTIVOS =====
+    resposta += "### 📌 Insights Executivos\n\n"
+    
+    insights = []
+    
+    if venc_30d > 0:
+        pct_venc = (venc_30d / total_chips) * 100
+        if pct_venc > 15:
+            insights.append(f"🔴 **Crítico:** {formatar_numero(venc_30d)} licenças ({pct_venc:.1f}%) vencem em 30 dias - ação urgente")
+        elif pct_venc > 5:
+            insights.append(f"🟡 **Atenção:** {formatar_numero(venc_30d)} licenças vencem em 30 dias")
+    
+    if ativados > 0:
+        taxa_ativ = (ativados / total_chips) * 100
+        if taxa_ativ < 80:
+            insights.append(f"🔴 **Ativação baixa:** {taxa_ativ:.1f}% dos chips ativados")
+        elif taxa_ativ < 90:
+            insights.append(f"🟡 **Ativação moderada:** {taxa_ativ:.1f}% dos chips ativados")
+    
+    if inativos_180_count > 0:
+        pct_inativos = (inativos_180_count / total_chips) * 100
+        if pct_inativos > 10:
+            insights.append(f"🔴 **Alta inatividade:** {formatar_numero(inativos_180_count)} chips ({pct_inativos:.1f}%) sem conexão há 180+ dias")
+    
+    if top_operadora and pct_top_operadora > 60:
+        insights.append(f"ℹ️ **Concentração:** {pct_top_operadora:.1f}% na operadora {top_operadora}")
+    
+    if insights:
+        for insight in insights:
+            resposta += f"- {insight}\n"
+    else:
+        resposta += "✅ Nenhum ponto crítico identificado - projeto em situação regular.\n"
+    
+    return resposta
+
+
+def responder_vencimentos_30d(df):
+    """Licenças que vencem nos próximos 30 dias, por projeto"""
+    estat = obter_estatisticas(df)
+    hoje = estat['hoje']
+    limite_30d = hoje + pd.Timedelta(days=30)
+    
+    if not estat['colunas']['vencimento'] or 'PROJETO' not in df.columns:
+        return "❌ Colunas necessárias não encontradas."
+    
+    tabela = estat['tabela']
+    tabela = tabela[tabela['VENC_30D'] > 0]
+    total_venc = int(tabela['VENC_30D'].sum())
+    
+    if total_venc == 0:
+        return f"## ✅ Vencimentos - Próximos 30 dias\n\n**Status:** Nenhuma licença vence."
+    
+    por_projeto = tabela['VENC_30D'].sort_values(ascending=False)
+    pct_total = (total_venc / estat['total_linhas']) * 100
+    
+    resposta = f"## 📅 Vencimentos - Próximos 30 dias\n\n"
+    resposta += f"**Período:** {hoje.strftime('%d/%m/%Y')} → {limite_30d.strftime('%d/%m/%Y')}  \n"
+    resposta += f"**Total:** {formatar_numero(total_venc)} licenças ({pct_total:.1f}%)\n\n"
+    
+    # Formato com próximas datas
+    resposta += "### Por Projeto\n\n"
+    resposta += "| Projeto | Licenças | % | Próximo Vencimento |\n"
+    resposta += "|---------|----------|---|--------------------|\n"
+    
+    for projeto, qtd in por_projeto.items():
+        pct = (qtd / total_venc) * 100
+        prox_data = tabela.at[projeto, 'PROX_VENC_30D']
+        resposta += f"| {projeto} | {formatar_numero(qtd)} | {pct:.1f}% | {prox_data.strftime('%d/%m/%Y')} |\n"
+    
+    top_projeto = por_projeto.index[0]
+    resposta += f"\n**📌 Ação:** Priorizar renovações no **{top_projeto}**."
+    
+    return resposta
+
+
+def responder_vencimentos_periodo(df, inicio, fim, rotulo):
+    """Licenças que vencem num período qualquer, por projeto - busca binária no índice de datas"""
+    coluna = buscar_coluna(df, COLUNAS_VENCIMENTO)
+    
+    if not coluna or 'PROJETO' not in df.columns:
+        return "❌ Colunas necessárias não encontradas."
+    
+    hoje = pd.Timestamp.now().normalize()
+    titulo = f"Vencimentos - {rotulo[0].upper()}{rotulo[1:]}"
+    por_projeto = obter_indice_datas(df, coluna).por_projeto(inicio, fim)
+    
+    if por_projeto.empty:
+        return f"## ✅ {titulo}\n\n**Status:** Nenhuma licença vence no período."
+    
+    por_projeto = por_projeto.sort_values('QTD', ascending=False, kind='stable')
+    total_venc = int(por_projeto['QTD'].sum())
+    pct_total = (total_venc / len(df)) * 100
+    
+    resposta = f"## 📅 {titulo}\n\n"
+    resposta += f"**Período:** {inicio.strftime('%d/%m/%Y')} → {fim.strftime('%d/%m/%Y')}  \n"
+    resposta += f"**Total:** {formatar_numero(total_venc)} licenças ({pct_total:.1f}%)\n\n"
+    
+    resposta += "### Por Projeto\n\n"
+    resposta += "| Projeto | Licenças | % | Primeiro Vencimento |\n"
+    resposta += "|---------|----------|---|---------------------|\n"
+    
+    for projeto, linha in por_projeto.iterrows():
+        pct = (linha['QTD'] / total_venc) * 100
+        resposta += (f"| {projeto} | {formatar_numero(linha['QTD'])} | {pct:.1f}% | "
+                     f"{linha['PRIMEIRA'].strftime('%d/%m/%Y')} |\n")
+    
+    top_projeto = por_projeto.index[0]
+    if fim < hoje:
+        resposta += f"\n**📌 Atenção:** período já passou - licenças expiradas, maior volume no **{top_projeto}**."
+    else:
+        resposta += f"\n**📌 Ação:** Priorizar renovações no **{top_projeto}**."
+    
+    return resposta
+
+
+def responder_cancelados(df, por_operadora=False):
+    """Chips cancelados por operadora ou top 5 projetos"""
+    estat = obter_estatisticas(df)
+    
+    if not estat['colunas']['status']:
+        return "❌ Coluna de STATUS não encontrada."
+    
+    tabela = estat['tabela']
+    total_cancelados = int(tabela['CANCELADOS'].sum())
+    
+    if total_cancelados == 0:
+        return "## ✅ Status de Cancelamentos\n\n**Total:** 0 chips cancelados."
+    
+    pct_total = (total_cancelados / estat['total_linhas']) * 100
+    
+    resposta = f"## ❌ Chips Cancelados\n\n"
+    resposta += f"**Total:** {formatar_numero(total_cancelados)} chips ({pct_total:.1f}%)\n\n"
+    
+    if por_operadora and estat['colunas']['operadora']:
+        por_operadora = contagens_totais(estat['cancelados_operadora'])
+    
+        resposta += "| Operadora | Cancelados | % |\n"
+        resposta += "|-----------|------------|---|\n"
+    
+        emojis = {"CLARO": "🔴", "VIVO": "🟣", "TIM": "🔵", "OI": "🟡", "ALGAR": "🟢"}
+    
+        for operadora, qtd in por_operadora.items():
+            pct = (qtd / total_cancelados) * 100
+            emoji = emojis.get(operadora, "📡")
+            resposta += f"| {emoji} {operadora} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
+    
+    else:
+        cancelados = tabela.loc[tabela['CANCELADOS'] > 0, 'CANCELADOS']
+        por_projeto = cancelados.sort_values(ascending=False).head(5)
+    
+        resposta += "**Top 5 Projetos:**\n\n"
+        resposta += "| Projeto | Cancelados |\n"
+        resposta += "|---------|------------|\n"
+    
+        for projeto, qtd in por_projeto.items():
+            resposta += f"| {projeto} | {formatar_numero(qtd)} |\n"
+    
+    return resposta
+
+
+def responder_chips_por_projeto(df):
+    """Distribuição de chips por projeto"""
+    if 'PROJETO' not in df.columns:
+        return "❌ Coluna PROJETO não encontrada."
+    
+    estat = obter_estatisticas(df)
+    por_projeto = estat['tabela']['TOTAL'].sort_values(ascending=False)
+    total = estat['total_linhas']
+    
+    resposta = f"## 📊 Distribuição de Chips por Projeto\n\n"
+    resposta += f"**Total:** {formatar_numero(total)} chips em {len(por_projeto)} projetos\n\n"
+    resposta += "| # | Projeto | Chips | % |\n"
+    resposta += "|---|---------|-------|---------|\n"
+    
+    for i, (projeto, qtd) in enumerate(por_projeto.items(), 1):
+        pct = (qtd / total) * 100
+        resposta += f"| {i} | {projeto} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
+    
+    return resposta
+
+
+def responder_sem_conexao_180(df):
+    """Chips sem conexão há 180+ dias por projeto"""
+    estat = obter_estatisticas(df)
+    
+    if not estat['colunas']['conexao']:
+        return "❌ Coluna de conexão não encontrada."
+    
+    if 'Mais de 180 dias' not in contagens_totais(estat['conexao']).index:
+        return f"❌ Categoria 'Mais de 180 dias' não encontrada."
+    
+    tabela = estat['tabela']
+    total_inativos = int(tabela['SEM_CONEXAO_180'].sum())
+    
+    if total_inativos == 0:
+        return "## ✅ Conexões\n\n**Status:** Nenhum chip inativo há 180+ dias."
+    
+    pct = (total_inativos / estat['total_linhas']) * 100
+    
+    resposta = f"## 🔴 Chips Inativos - 180+ dias\n\n"
+    resposta += f"**Total:** {formatar_numero(total_inativos)} chips ({pct:.1f}%)\n\n"
+    
+    inativos = tabela.loc[tabela['SEM_CONEXAO_180'] > 0, 'SEM_CONEXAO_180']
+    por_projeto = inativos.sort_values(ascending=False)
+    
+    resposta += "| Projeto | Inativos | % |\n"
+    resposta += "|---------|----------|---|\n"
+    
+    for projeto, qtd in por_projeto.items():
+        pct_proj = (qtd / total_inativos) * 100
+        resposta += f"| {projeto} | {formatar_numero(qtd)} | {pct_proj:.1f}% |\n"
+    
+    top_projeto = por_projeto.index[0]
+    resposta += f"\n**📌 Ação:** Investigar inatividade no **{top_projeto}**."
+    
+    return resposta
+
+
+def responder_sem_conexao_periodo(df, quantidade, unidade):
+    """Chips sem conexão há mais de `quantidade` `unidade`s, por projeto - índice de datas"""
+    coluna = buscar_coluna(df, COLUNAS_ULTIMA_CONEXAO)
+    
+    if not coluna or 'PROJETO' not in df.columns:
+        return "❌ Coluna de última conexão não encontrada."
+    
+    hoje = pd.Timestamp.now().normalize()
+    rotulo = rotulo_duracao(quantidade, unidade)
+    # Mesmo critério da CATEGORIA_CONEXAO: mais que o período completo desde a última conexão
+    limite = hoje - deslocamento(quantidade, unidade) - pd.Timedelta(days=1)
+    indice = obter_indice_datas(df, coluna)
+    por_projeto = indice.por_projeto(None, limite)
+    
+    if por_projeto.empty:
+        return f"## ✅ Conexões\n\n**Status:** Nenhum chip sem conexão há mais de {rotulo}."
+    
+    por_projeto = por_projeto['QTD'].sort_values(ascending=False, kind='stable')
+    total_inativos = int(por_projeto.sum())
+    pct = (total_inativos / len(df)) * 100
+    
+    resposta = f"## 🔴 Chips Inativos - mais de {rotulo}\n\n"
+    resposta += f"**Última conexão até:** {limite.strftime('%d/%m/%Y')}  \n"
+    resposta += f"**Total:** {formatar_numero(total_inativos)} chips ({pct:.1f}%)\n\n"
+    
+    resposta += "| Projeto | Inativos | % |\n"
+    resposta += "|---------|----------|---|\n"
+    
+    for projeto, qtd in por_projeto.items():
+        pct_proj = (qtd / total_inativos) * 100
+        resposta += f"| {projeto} | {formatar_numero(qtd)} | {pct_proj:.1f}% |\n"
+    
+    if indice.sem_data:
+        resposta += f"\n*{formatar_numero(indice.sem_data)} chips nunca conectaram e não entram na conta.*\n"
+    
+    top_projeto = por_projeto.index[0]
+    resposta += f"\n**📌 Ação:** Investigar inatividade no **{top_projeto}**."
+    
+    return resposta
+
+
+def responder_status_ativacoes(df):
+    """Ativados x pendentes e top 5 projetos por taxa"""
+    estat = obter_estatisticas(df)
+    
+    if not estat['colunas']['ativacao']:
+        return "❌ Coluna de ativação não encontrada."
+    
+    tabela = estat['tabela']
+    total = estat['total_linhas']
+    total_ativados = int(tabela['ATIVADOS'].sum())
+    pct_ativados = (total_ativados / total) * 100
+    
+    resposta = f"## 📡 Status de Ativações\n\n"
+    resposta += f"**Base:** {formatar_numero(total)} chips\n\n"
+    resposta += "| Métrica | Quantidade | % |\n"
+    resposta += "|---------|------------|---|\n"
+    resposta += f"| ✅ Ativados | {formatar_numero(total_ativados)} | {pct_ativados:.1f}% |\n"
+    resposta += f"| ⏳ Pendentes | {formatar_numero(total-total_ativados)} | {100-pct_ativados:.1f}% |\n"
+    
+    if total_ativados > 0:
+        resposta += f"\n**Top 5 Projetos:**\n\n"
+        resposta += "| Projeto | Ativados/Total | Taxa |\n"
+        resposta += "|---------|----------------|------|\n"
+    
+        # Empates ficam em ordem alfabética de projeto
+        projetos_data = [
+            (projeto, linha.ATIVADOS, linha.TOTAL, linha.ATIVADOS / linha.TOTAL * 100)
+            for projeto, linha in tabela.iterrows()
+        ]
+        projetos_data.sort(key=lambda x: x[3], reverse=True)
+    
+        for projeto, ativ, total_proj, taxa in projetos_data[:5]:
+            emoji = "✅" if taxa >= 90 else "🟡" if taxa >= 75 else "🔴"
+            resposta += f"| {projeto} | {formatar_numero(ativ)}/{formatar_numero(total_proj)} | {taxa:.1f}% {emoji} |\n"
+    
+    return resposta
+
+
+def responder_distribuicao_operadora(df):
+    """Distribuição de chips por operadora"""
+    estat = obter_estatisticas(df)
+    
+    if not estat['colunas']['operadora']:
+        return "❌ Coluna OPERADORA não encontrada."
+    
+    por_operadora = contagens_totais(estat['operadoras'])
+    total = estat['total_linhas']
+    
+    resposta = f"## 📶 Distribuição por Operadora\n\n"
+    resposta += f"**Total:** {formatar_numero(total)} chips\n\n"
+    resposta += "| Operadora | Chips | % |\n"
+    resposta += "|-----------|-------|---------|\n"
+    
+    emojis = {"CLARO": "🔴", "VIVO": "🟣", "TIM": "🔵", "OI": "🟡", "ALGAR": "🟢"}
+    
+    for operadora, qtd in por_operadora.items():
+        pct = (qtd / total) * 100
+        emoji = emojis.get(operadora, "📡")
+        resposta += f"| {emoji} {operadora} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
+    
+    return resposta
+
+
+def responder_licencas_expiradas(df):
+    """Licenças expiradas por projeto"""
+    estat = obter_estatisticas(df)
+    
+    if not estat['colunas']['vencimento']:
+        return "❌ Coluna de vencimento não encontrada."
+    
+    tabela = estat['tabela']
+    total_expiradas = int(tabela['EXPIRADAS'].sum())
+    
+    if total_expiradas == 0:
+        return "## ✅ Licenças Expiradas\n\n**Status:** Nenhuma licença expirada."
+    
+    pct_total = (total_expiradas / estat['total_linhas']) * 100
+    
+    resposta = f"## ⚠️ Licenças Expiradas\n\n"
+    resposta += f"**Total:** {formatar_numero(total_expiradas)} licenças ({pct_total:.1f}%)\n\n"
+    
+    expiradas = tabela[tabela['EXPIRADAS'] > 0]
+    por_projeto = expiradas['EXPIRADAS'].sort_values(ascending=False)
+    
+    resposta += "| Projeto | Expiradas | % do Projeto |\n"
+    resposta += "|---------|-----------|-------------|\n"
+    
+    for projeto, qtd in por_projeto.items():
+        pct = (qtd / expiradas.at[projeto, 'TOTAL']) * 100
+        resposta += f"| {projeto} | {formatar_numero(qtd)} | {pct:.1f}% |\n"
+    
+    return resposta
+
+
+def _data_br(valor):
+    return valor.strftime('%d/%m/%Y') if pd.notna(valor) else '-'
+
+
+def _prazo(dias):
+    if pd.isna(dias):
+        return '-'
+    dias = int(dias)
+    texto = f"{abs(dias)} dia" + ("s" if abs(dias) != 1 else "")
+    return f"em {texto}" if dias >= 0 else f"há {texto}"
+
+
+def _sem_contratos(dfcontratos):
+    return dfcontratos is None or dfcontratos.empty or 'PROJETO' not in dfcontratos.columns
+
+
+MSG_SEM_CONTRATOS = "❌ Dados contratuais não carregados (**DADOS-GERENCIAIS.xlsx**)."
+
+
+def _ordenar_por_status(tabela):
+    ordem = tabela['STATUS'].map(ORDEM_STATUS_CONTRATO).fillna(len(ORDEM_STATUS_CONTRATO))
+    return tabela.assign(_ORDEM=ordem).sort_values(['_ORDEM', 'FIM_VIGENCIA'], kind='stable')
+
+
+def responder_status_contratos(df, dfcontratos, dftimeline, projeto=None):
+    """Situação dos contratos; com projeto, a ficha completa do contrato"""
+    if _sem_contratos(dfcontratos):
+        return MSG_SEM_CONTRATOS
+    
+    tabela = obter_tabela_contratos(df, dfcontratos)
+    
+    if projeto is not None and projeto in tabela.index:
+        c = tabela.loc[projeto]
+        resposta = f"## 📋 Contrato - {projeto}\n\n"
+        resposta += f"**Status:** {c['STATUS']}  \n"
+        resposta += f"**Serviços:** {c['SERVICOS']}  \n"
+        resposta += f"**Focal points:** {c['FOCAL_1']} • {c['FOCAL_2']}  \n"
+        resposta += (f"**Última renovação:** {_data_br(c['RENOVACAO'])} • "
+                     f"**Vigência até:** {_data_br(c['FIM_VIGENCIA'])} ({_prazo(c['DIAS_PARA_FIM'])})\n\n")
+        resposta += "| Licenças Previstas | Entregues | % Entregue | Funcionais | % Funcionais |\n"
+        resposta += "|--------------------|-----------|------------|------------|--------------|\n"
+        previstas = formatar_numero(c['PREVISTAS']) if pd.notna(c['PREVISTAS']) else '-'
+        resposta += (f"| {previstas} | {formatar_numero(c['CHIPS'])} | {c['PCT_ENTREGUE']:.1f}% | "
+                     f"{formatar_numero(c['FUNCIONAIS'])} | {c['PCT_FUNCIONAL']:.1f}% |\n")
+        
+        if dftimeline is not None and not dftimeline.empty and 'PROJETO' in dftimeline.columns:
+            eventos = obter_timeline(dftimeline)
+            eventos = eventos[eventos['PROJETO'] == projeto]
+            if not eventos.empty:
+                resposta += "\n### 🗓️ Timeline\n\n"
+                for _, e in eventos.iterrows():
+                    resposta += f"- {_data_br(e['DATA'])} • {e.get('AÇÃO', '-')} • {formatar_numero(e.get('QUANTIDADE', 0))}\n"
+        return resposta
+    
+    contagem = tabela['STATUS'].value_counts()
+    resposta = f"## 📋 Contratos\n\n**Total:** {len(tabela)} contratos  \n"
+    resposta += " • ".join(f"**{status}:** {qtd}" for status, qtd in contagem.items()) + "\n\n"
+    
+    resposta += "| Projeto | Status | Vigência até | Licenças Previstas | Entregues |\n"
+    resposta += "|---------|--------|--------------|--------------------|-----------|\n"
+    
+    for projeto, c in _ordenar_por_status(tabela).iterrows():
+        previstas = formatar_numero(c['PREVISTAS']) if pd.notna(c['PREVISTAS']) else '-'
+        resposta += (f"| {projeto} | {c['STATUS']} | {_data_br(c['FIM_VIGENCIA'])} | {previstas} | "
+                     f"{formatar_numero(c['CHIPS'])} ({c['PCT_ENTREGUE']:.1f}%) |\n")
+    
+    return resposta
+
+
+def responder_contratos_vencendo(df, dfcontratos, dftimeline, inicio, fim, rotulo, projeto=None):
+    """Contratos cuja vigência (última renovação + duração) termina no período.
+
+    Com projeto, a vigência daquele contrato, esteja ou não no período.
+    """
+    if _sem_contratos(dfcontratos):
+        return MSG_SEM_CONTRATOS
+    
+    hoje = pd.Timestamp.now().normalize()
+    tabela = obter_tabela_contratos(df, dfcontratos)
+    
+    if projeto is not None and projeto in tabela.index:
+        c = tabela.loc[projeto]
+        resposta = f"## 📆 Vigência do Contrato - {projeto}\n\n"
+        resposta += f"**Vigência até:** {_data_br(c['FIM_VIGENCIA'])} ({_prazo(c['DIAS_PARA_FIM'])})  \n"
+        duracao = f"{int(c['DURACAO_MESES'])} meses" if pd.notna(pd.to_numeric(c['DURACAO_MESES'], errors='coerce')) else '-'
+        resposta += f"**Última renovação:** {_data_br(c['RENOVACAO'])} • **Duração:** {duracao}  \n"
+        resposta += f"**Status:** {c['STATUS']}"
+        return resposta
+    no_periodo = tabela[tabela['FIM_VIGENCIA'].between(inicio, fim)].sort_values('FIM_VIGENCIA', kind='stable')
+    
+    resposta = f"## 📆 Contratos - Vigência terminando {rotulo}\n\n"
+    resposta += f"**Período:** {_data_br(inicio)} → {_data_br(fim)}\n\n"
+    
+    if no_periodo.empty:
+        resposta += "✅ Nenhum contrato termina no período.\n"
+    else:
+        resposta += "| Projeto | Vigência até | Prazo | Status | Licenças Previstas |\n"
+        resposta += "|---------|--------------|-------|--------|--------------------|\n"
+        for projeto, c in no_periodo.iterrows():
+            previstas = formatar_numero(c['PREVISTAS']) if pd.notna(c['PREVISTAS']) else '-'
+            resposta += (f"| {projeto} | {_data_br(c['FIM_VIGENCIA'])} | {_prazo(c['DIAS_PARA_FIM'])} | "
+                         f"{c['STATUS']} | {previstas} |\n")
+    
+    # Vigência já encerrada fica de fora de períodos futuros, mas precisa aparecer
+    if inicio >= hoje:
+        encerrados = tabela[tabela['FIM_VIGENCIA'] < hoje].sort_values('FIM_VIGENCIA', kind='stable')
+        if not encerrados.empty:
+            resposta += f"\n**⚠️ Vigência já encerrada ({len(encerrados)}):** "
+            resposta += ", ".join(f"{p} ({_data_br(c['FIM_VIGENCIA'])}, {c['STATUS']})"
+                                  for p, c in encerrados.iterrows()) + "\n"
+    
+    return resposta
+
+
+def responder_pontos_focais(df, dfcontratos, dftimeline, projeto=None):
+    """Focal points de cada contrato"""
+    if _sem_contratos(dfcontratos):
+        return MSG_SEM_CONTRATOS
+    
+    tabela = obter_tabela_contratos(df, dfcontratos)
+    if projeto is not None and projeto in tabela.index:
+        tabela = tabela.loc[[projeto]]
+    
+    resposta = "## 👤 Pontos Focais\n\n"
+    resposta += "| Projeto | Focal Point 1 | Focal Point 2 | Status |\n"
+    resposta += "|---------|---------------|---------------|--------|\n"
+    for projeto, c in tabela.iterrows():
+        resposta += f"| {projeto} | {c['FOCAL_1']} | {c['FOCAL_2']} | {c['STATUS']} |\n"
+    
+    return resposta
+
+
+def responder_entregas_contrato(df, dfcontratos, dftimeline, projeto=None):
+    """Chips entregues contra TOTAL DE LICENÇAS PREVISTAS de cada contrato"""
+    if _sem_contratos(dfcontratos):
+        return MSG_SEM_CONTRATOS
+    
+    tabela = obter_tabela_contratos(df, dfcontratos)
+    if projeto is not None and projeto in tabela.index:
+        tabela = tabela.loc[[projeto]]
+    tabela = tabela.sort_values('PCT_ENTREGUE', ascending=False, kind='stable')
+    
+    previstas = tabela['PREVISTAS'].fillna(0).sum()
+    entregues = int(tabela['CHIPS'].sum())
+    pct_total = (entregues / previstas * 100) if previstas else 0
+    
+    resposta = "## 📦 Entregas x Licenças Previstas\n\n"
+    resposta += (f"**Total:** {formatar_numero(entregues)} de {formatar_numero(previstas)} licenças "
+                 f"previstas ({pct_total:.1f}%)\n\n")
+    
+    resposta += "| Projeto | Previstas | Entregues | % Entregue | % Funcionais |\n"
+    resposta += "|---------|-----------|-----------|------------|--------------|\n"
+    for projeto, c in tabela.iterrows():
+        previstas_proj = formatar_numero(c['PREVISTAS']) if pd.notna(c['PREVISTAS']) else '-'
+        resposta += (f"| {projeto} | {previstas_proj} | {formatar_numero(c['CHIPS'])} | "
+                     f"{c['PCT_ENTREGUE']:.1f}% | {c['PCT_FUNCIONAL']:.1f}% |\n")
+    
+    pendentes = tabela[(tabela['PREVISTAS'] > 0) & (tabela['CHIPS'] < tabela['PREVISTAS'])]
+    if len(tabela) > 1 and not pendentes.empty:
+        menor = pendentes['PCT_ENTREGUE'].idxmin()
+        resposta += f"\n**📌 Ação:** Acompanhar as entregas do **{menor}**."
+    
+    return resposta
+
+
+def detectar_acao_timeline(pergunta, dftimeline):
+    """Ação da timeline citada na pergunta ("pagamentos" -> PAGAMENTO), ou None"""
+    texto = normalizar(pergunta)
+    eventos = obter_timeline(dftimeline)
+    for acao, acao_norm in eventos[['AÇÃO', '_ACAO']].drop_duplicates('_ACAO').itertuples(index=False):
+        # Radical sem o "ão": expiração/expirações, ativação/ativações
+        radical = acao_norm[:-2] if acao_norm.endswith('ao') else acao_norm
+        if radical and radical in texto:
+            return acao
+    return None
+
+
+def responder_eventos_timeline(df, dfcontratos, dftimeline, projeto=None, acao=None):
+    """Eventos da timeline (próximos primeiro, depois os recentes), por projeto e/ou ação"""
+    if dftimeline is None or dftimeline.empty or 'DATA' not in dftimeline.columns:
+        return "❌ Timeline não carregada (**DADOS-GERENCIAIS.xlsx**)."
+    
+    hoje = pd.Timestamp.now().normalize()
+    eventos = obter_timeline(dftimeline)
+    filtros = []
+    if projeto is not None:
+        eventos = eventos[eventos['PROJETO'] == projeto]
+        filtros.append(projeto)
+    if acao is not None:
+        eventos = eventos[eventos['AÇÃO'] == acao]
+        filtros.append(acao)
+    
+    titulo = "## 🗓️ Timeline" + (f" - {' • '.join(filtros)}" if filtros else "")
+    if eventos.empty:
+        return f"{titulo}\n\nNenhum evento encontrado."
+    
+    proximos = eventos[eventos['DATA'] >= hoje].head(10)
+    recentes = eventos[eventos['DATA'] < hoje].iloc[::-1].head(10)
+    
+    resposta = f"{titulo}\n\n"
+    for subtitulo, bloco in (("### ⏭️ Próximos eventos", proximos), ("### ⏮️ Eventos recentes", recentes)):
+        if bloco.empty:
+            continue
+        resposta += f"{subtitulo}\n\n"
+        resposta += "| Data | Projeto | Ação | Quantidade |\n"
+        resposta += "|------|---------|------|------------|\n"
+        for _, e in bloco.iterrows():
+            quantidade = formatar_numero(e['QUANTIDADE']) if pd.notna(e.get('QUANTIDADE')) else '-'
+            resposta += f"| {_data_br(e['DATA'])} | {e['PROJETO']} | {e.get('AÇÃO', '-')} | {quantidade} |\n"
+        resposta += "\n"
+    
+    if not proximos.empty:
+        e = proximos.iloc[0]
+        resposta += f"**📌 Próximo:** {e.get('AÇÃO', '-')} de **{e['PROJETO']}** {_prazo((e['DATA'] - hoje).days)}."
+    
+    return resposta
+
+
+RESPOSTAS_INTENCAO = {
+    'listar_projetos': listar_projetos_disponiveis,
+    'vencimentos_30d': responder_vencimentos_30d,
+    'vencimentos_periodo': responder_vencimentos_periodo,
+    'relatorio_projeto': gerar_relatorio_completo_projeto,
+    'cancelados': responder_cancelados,
+    'chips_por_projeto': responder_chips_por_projeto,
+    'sem_conexao_180': responder_sem_conexao_180,
+    'sem_conexao_periodo': responder_sem_conexao_periodo,
+    'status_ativacoes': responder_status_ativacoes,
+    'distribuicao_operadora': responder_distribuicao_operadora,
+    'licencas_expiradas': responder_licencas_expiradas,
+}
+
+
+# Intenções sobre a planilha de dados gerenciais: recebem (df, dfcontratos, dftimeline, *parâmetros)
+RESPOSTAS_GERENCIAIS = {
+    'contratos_status': responder_status_contratos,
+    'contratos_vencendo': responder_contratos_vencendo,
+    'pontos_focais': responder_pontos_focais,
+    'entregas_contrato': responder_entregas_contrato,
+    'eventos_timeline': responder_eventos_timeline,
+}
+
+
+def _parametros_gerenciais(intencao, pergunta, dfcontratos, dftimeline):
+    if intencao == 'eventos_timeline':
+        if dftimeline is None or dftimeline.empty or 'PROJETO' not in dftimeline.columns:
+            return ()
+        return (detectar_projeto_mencionado(pergunta, dftimeline),
+                detectar_acao_timeline(pergunta, dftimeline))
+    
+    projeto = None if _sem_contratos(dfcontratos) else detectar_projeto_mencionado(pergunta, dfcontratos)
+    if intencao == 'contratos_vencendo':
+        hoje = pd.Timestamp.now().normalize()
+        periodo = extrair_periodo(pergunta, hoje) or (hoje, hoje + pd.Timedelta(days=90), 'em até 90 dias')
+        return (*periodo, projeto)
+    
+    return (projeto,)
+
+
+def _resolver_periodo(intencao, pergunta):
+    """(intenção, parâmetros) para a pergunta com período, ou None se não há período nela.
+
+    Os casos já pré-calculados (30 dias de vencimento, 180 dias sem conexão)
+    voltam para as intenções fixas.
+    """
+    hoje = pd.Timestamp.now().normalize()
+    if intencao == 'vencimentos_periodo':
+        periodo = extrair_periodo(pergunta, hoje)
+        if periodo is None:
+            return None
+        if periodo[:2] == (hoje, hoje + pd.Timedelta(days=30)):
+            return 'vencimentos_30d', ()
+        return intencao, periodo
+    
+    duracao = extrair_duracao(pergunta)
+    if duracao is None:
+        return None
+    if duracao == (180, 'dia'):
+        return 'sem_conexao_180', ()
+    return intencao, duracao
+
+
+def resolver_intencao(df, pergunta, dfcontratos=None, dftimeline=None):
+    """(intenção, parâmetros) que respondem a pergunta, ou (None, ())"""
+    candidatas = rotear(pergunta)
+    projeto_mencionado = None
+    if REQUER_PROJETO.intersection(candidatas):
+        projeto_mencionado = detectar_projeto_mencionado(pergunta, df)
+        if projeto_mencionado:
+            candidatas = rotear(pergunta, com_projeto=True)
+
+    for intencao in candidatas:
+        if intencao in RESPOSTAS_GERENCIAIS:
+            return intencao, _parametros_gerenciais(intencao, pergunta, dfcontratos, dftimeline)
+        
+        if intencao == 'relatorio_projeto':
+            if projeto_mencionado:
+                return intencao, (projeto_mencionado,)
+            continue
+        
+        if intencao in REQUER_PERIODO:
+            parametros = _resolver_periodo(intencao, pergunta)
+            if parametros is None:
+                continue
+            return parametros
+        
+        if intencao == 'cancelados':
+            return intencao, ('operadora' in pergunta.lower(),)
+        
+        return intencao, ()
+    
+    return None, ()
+
+
+def responder_intencao(df, intencao, parametros=(), dfcontratos=None, dftimeline=None, cache=None,
+                       limite=_limite_pesados):
+    """Resposta de uma intenção, via cache compartilhado entre as sessões (`cache`, padrão _respostas).
+
+    `limite` é a vaga de concorrência ocupada só durante o cálculo (None = nenhuma).
+    """
+    # Mesma intenção e parâmetros sobre a mesma versão da base (filtros inclusos) e dia
+    # têm a mesma resposta
+    chave = (intencao, parametros, versao_dataset(df), pd.Timestamp.now().normalize())
+    if cache is None:
+        cache = _respostas
+        pronto = _relatorios_pre_gerados.get(chave) if intencao == 'relatorio_projeto' else None
+        if pronto is not None:
+            instrumentacao.marcar_cache('hit')
+            return pronto
+    if intencao in RESPOSTAS_GERENCIAIS:
+        chave += (versao_dataset(dfcontratos), versao_dataset(dftimeline))
+        calcular = lambda: RESPOSTAS_GERENCIAIS[intencao](df, dfcontratos, dftimeline, *parametros)
+    else:
+        calcular = lambda: RESPOSTAS_INTENCAO[intencao](df, *parametros)
+    instrumentacao.marcar_cache('hit')
+
+    def calcular_contando():
+        instrumentacao.marcar_cache('miss')
+        return calcular()
+
+    # Pedidos simultâneos da mesma chave esperam um único cálculo
+    return cache.obter_ou_calcular(chave, calcular_contando, limite=limite)
+
+
+def executar_consulta_sql(df, pergunta, dfcontratos=None, dftimeline=None):
+    """Executa consultas SQL - roteia a pergunta e responde a melhor intenção"""
+    intencao, parametros = resolver_intencao(df, pergunta, dfcontratos, dftimeline)
+    
+    if intencao is None:
+        return None
+    
+    return responder_intencao(df, intencao, parametros, dfcontratos, dftimeline)
+
+
+def nova_conversa():
+    """Estado de uma conversa: a receita da última resposta e as seleções já materializadas"""
+    return {'receita': None, 'selecao': None, 'selecoes': CacheLRU(maxsize=CHAT_SELECOES_POR_CONVERSA)}
+
+
+def selecionar_linhas(df, intencao, parametros):
+    """Posições (iloc) das linhas por trás da resposta de uma intenção, ou None"""
+    hoje = pd.Timestamp.now().normalize()
+    
+    if intencao in ('vencimentos_30d', 'vencimentos_periodo', 'licencas_expiradas'):
+        coluna = buscar_coluna(df, COLUNAS_VENCIMENTO)
+        if not coluna or 'PROJETO' not in df.columns:
+            return None
+        indice = obter_indice_datas(df, coluna)
+        if intencao == 'vencimentos_30d':
+            return indice.linhas(hoje, hoje + pd.Timedelta(days=30))
+        if intencao == 'vencimentos_periodo':
+            return indice.linhas(parametros[0], parametros[1])
+        return indice.linhas(None, hoje - pd.Timedelta(1, 'ns'))
+    
+    if intencao in ('sem_conexao_180', 'sem_conexao_periodo'):
+        coluna = buscar_coluna(df, COLUNAS_ULTIMA_CONEXAO)
+        if not coluna or 'PROJETO' not in df.columns:
+            return None
+        duracao = parametros if intencao == 'sem_conexao_periodo' else (180, 'dia')
+        return obter_indice_datas(df, coluna).linhas(None, hoje - deslocamento(*duracao) - pd.Timedelta(days=1))
+    
+    if intencao == 'cancelados':
+        coluna = buscar_coluna(df, ['STATUS NA OP.', 'STATUS_OP', 'STATUS'])
+        if not coluna:
+            return None
+        return np.flatnonzero(df[coluna].astype(str).str.contains('cancelad', case=False).to_numpy())
+    
+    if intencao == 'relatorio_projeto':
+        return np.flatnonzero((df['PROJETO'] == parametros[0]).to_numpy())
+    
+    if intencao in ('listar_projetos', 'chips_por_projeto', 'status_ativacoes', 'distribuicao_operadora'):
+        return np.flatnonzero(df['PROJETO'].notna().to_numpy()) if 'PROJETO' in df.columns else None
+    
+    return None
+
+
+def descrever_selecao(intencao, parametros):
+    if intencao == 'vencimentos_30d':
+        return "Vencem em 30 dias"
+    if intencao == 'vencimentos_periodo':
+        return f"Vencem {parametros[2]}"
+    if intencao == 'licencas_expiradas':
+        return "Licenças expiradas"
+    if intencao == 'sem_conexao_180':
+        return "Sem conexão há mais de 180 dias"
+    if intencao == 'sem_conexao_periodo':
+        return f"Sem conexão há mais de {rotulo_duracao(*parametros)}"
+    if intencao == 'cancelados':
+        return "Cancelados"
+    if intencao == 'relatorio_projeto':
+        return f"Projeto {parametros[0]}"
+    return "Todos os chips"
+
+
+def _selecao_atual(df, conversa):
+    """Seleção da última resposta; materializada só quando uma continuação pede"""
+    versao = versao_dataset(df)
+    selecao = conversa.get('selecao')
+    if selecao is not None:
+        return selecao if selecao['versao'] == versao else None
+    
+    receita = conversa.get('receita')
+    if receita is None or receita[2] != versao or receita[3] != pd.Timestamp.now().normalize():
+        return None
+    intencao, parametros = receita[:2]
+    posicoes = conversa['selecoes'].obter_ou_calcular(
+        receita, lambda: selecionar_linhas(df, intencao, parametros))
+    if posicoes is None:
+        return None
+    selecao = {'descricao': descrever_selecao(intencao, parametros), 'posicoes': posicoes,
+               'versao': versao, 'chave': receita}
+    conversa['selecao'] = selecao
+    return selecao
+
+
+def responder_refinamento(df, conversa, pergunta):
+    """Responde "e desses, quais são da VIVO?" sobre as linhas da resposta anterior.
+
+    None quando não há resposta anterior com linhas ou a pergunta não traz filtro.
+    O resultado vira a nova seleção, para refinar de novo.
+    """
+    selecao = _selecao_atual(df, conversa)
+    if selecao is None:
+        return None
+    
+    projeto = detectar_projeto(obter_indice_projetos(df), pergunta) if 'PROJETO' in df.columns else None
+    filtros = extrair_filtros(pergunta, df, projeto)
+    if not filtros:
+        return None
+    
+    # A mesma continuação sobre a mesma seleção não refiltra
+    chave = (selecao['chave'], tuple(filtro[1:] for filtro in filtros))
+    posicoes = conversa['selecoes'].obter_ou_calcular(
+        chave, lambda: aplicar_filtros_selecao(df, selecao['posicoes'], filtros))
+    descricao = f"{selecao['descricao']} → {' • '.join(filtro[0] for filtro in filtros)}"
+    conversa['selecao'] = {'descricao': descricao, 'posicoes': posicoes, 'versao': selecao['versao'],
+                           'chave': chave}
+    conversa['receita'] = None
+    
+    total_anterior = len(selecao['posicoes'])
+    total = len(posicoes)
+    pct = (total / total_anterior * 100) if total_anterior else 0
+    
+    resposta = f"## 🔎 {descricao}\n\n"
+    resposta += f"**Chips:** {formatar_numero(total)} de {formatar_numero(total_anterior)} da resposta anterior ({pct:.1f}%)\n\n"
+    
+    if total == 0:
+        return resposta + "Nenhum chip atende ao filtro."
+    
+    filtradas = {filtro[1] for filtro in filtros}
+    for coluna, titulo in (('PROJETO', 'Projeto'), ('OPERADORA', 'Operadora')):
+        if coluna in filtradas:
+            continue
+        contagem = contar_por(df, posicoes, coluna)
+        if len(contagem) < 2:
+            continue
+        resposta += f"### Por {titulo}\n\n"
+        resposta += f"| {titulo} | Chips | % |\n"
+        resposta += f"|{'-' * (len(titulo) + 2)}|-------|---|\n"
+        for valor, qtd in contagem.items():
+            resposta += f"| {valor} | {formatar_numero(qtd)} | {qtd / total * 100:.1f}% |\n"
+        resposta += "\n"
+    
+    return resposta
+
+
+def _agendar_relatorios(df, situacao):
+    # Tabela de estatísticas antes dos relatórios, para não ser calculada em paralelo
+    tabela = obter_estatisticas(df)['tabela']
+    projetos = tabela['TOTAL'].nlargest(RELATORIOS_PRE_GERADOS).index.tolist()
+    situacao['total'] = len(projetos)
+    situacao['futuros'] = [
+        _pool_relatorios.submit(_pre_gerar_relatorio, df, projeto)
+        for projeto in projetos
+    ]
+
+
+def _pre_gerar_relatorio(df, projeto):
+    # Fora de _limite_pesados (o pool já limita a 2) e com prioridade menor: cede a vez
+    # enquanto houver resposta interativa calculando no limite ou esperando vaga
+    while _limite_pesados.lotado() or _limite_pesados.estatisticas()['na_fila']:
+        time.sleep(0.05)
+    return responder_intencao(df, 'relatorio_projeto', (projeto,), cache=_relatorios_pre_gerados, limite=None)
+
+
+def pre_gerar_relatorios(df):
+    """Agenda o relatório executivo dos maiores projetos desta versão da base.
+
+    Para a base sem filtros, chamada na carga: cada combinação de filtros é uma
+    versão nova e agendaria tudo de novo. Idempotente: cada versão (e dia) é
+    agendada uma vez e "Resumo do projeto X" passa a sair pronto.
+    """
+    if df is None or df.empty or 'PROJETO' not in df.columns:
+        return None
+    
+    chave = (versao_dataset(df), pd.Timestamp.now().normalize())
+    situacao = _pre_geracoes.get(chave)
+    if situacao is None:
+        situacao = {'total': None, 'futuros': []}
+        _pre_geracoes.set(chave, situacao)
+        _pool_relatorios.submit(_agendar_relatorios, df, situacao)
+    return situacao
+
+
+def situacao_pre_geracao(df):
+    """Pré-geração já agendada para esta versão da base (None se não houver); não agenda nada"""
+    if df is None:
+        return None
+    return _pre_geracoes.get((versao_dataset(df), pd.Timestamp.now().normalize()))
+
+
+def progresso_pre_geracao(situacao):
+    """(prontos, total) dos relatórios agendados; total None enquanto agenda"""
+    if not situacao:
+        return 0, None
+    prontos = sum(1 for f in situacao['futuros'] if f.done())
+    return prontos, situacao['total']
+
+
+def estatisticas_cache_respostas():
+    """Itens, acertos, falhas e taxa de acerto do cache de respostas"""
+    return _respostas.estatisticas()
+
+
+def estatisticas_concorrencia():
+    """Cálculos pesados e chamadas ao LLM em execução, filas de espera e pedidos que compartilharam um cálculo"""
+    estat = _limite_pesados.estatisticas()
+    estat['llm'] = _limite_llm.estatisticas()
+    with _lock_llm:
+        estat['llm_em_andamento'] = len(_llm_em_andamento)
+        estat['llm_coalescidas'] = _llm_coalescidas
+    estat['respostas_coalescidas'] = _respostas.estatisticas()['coalescidas']
+    return estat
+
+
+def obter_resumo_llm(df, dfcontratos=None, dftimeline=None, orcamento_tokens=None):
+    """Resumo da base para o contexto do LLM, um por versão dos dados (filtros inclusos) e dia"""
+    orcamento_tokens = orcamento_tokens or LLM_ORCAMENTO_CONTEXTO
+    chave = (versao_dataset(df), versao_dataset(dfcontratos), versao_dataset(dftimeline),
+             orcamento_tokens, pd.Timestamp.now().normalize())
+    return _resumos_llm.obter_ou_calcular(
+        chave, lambda: construir_resumo(obter_estatisticas(df), dfcontratos, dftimeline, orcamento_tokens))
+
+
+def responder_com_llm(cliente, pergunta, contexto, destino, publicar=None):
+    """Transmite a resposta do LLM para `destino` (um st.empty) à medida que chega.
+
+    Respeita os timeouts de conexão/leitura do cliente e o teto LLM_TIMEOUT_TOTAL.
+    Se a sessão for interrompida (nova pergunta, clique, fechar a aba) o Streamlit
+    interrompe o script na próxima atualização do `destino` e o `finally` fecha o
+    stream, liberando a conexão para o pool. `publicar(texto)` recebe o texto
+    acumulado a cada pedaço.
+    """
+    mensagens = [
+        {"role": "system", "content": "Você é o analista de dados da Base Mobile. Responda em português, "
+                                      "de forma objetiva, usando apenas os dados abaixo.\n\n" + contexto},
+        {"role": "user", "content": pergunta},
+    ]
+    texto = ""
+    inicio = time.monotonic()
+    stream = None
+    try:
+        stream = cliente.chat.completions.create(
+            model=PERPLEXITY_MODEL, messages=mensagens, stream=True, max_tokens=LLM_MAX_TOKENS)
+        for pedaco in stream:
+            if pedaco.choices and pedaco.choices[0].delta.content:
+                texto += pedaco.choices[0].delta.content
+                if publicar is not None:
+                    publicar(texto)
+                destino.markdown(formatar_mensagem(texto) + "▌")
+            if time.monotonic() - inicio > LLM_TIMEOUT_TOTAL:
+                texto += "\n\n⏱️ *Resposta interrompida: tempo limite atingido.*"
+                break
+    except (openai.APITimeoutError, httpx.TimeoutException):
+        # Timeout no meio do stream chega como exceção do httpx, sem o invólucro do openai
+        texto += "\n\n⏱️ *O assistente demorou demais para responder.*"
+    except (openai.APIError, httpx.HTTPError) as e:
+        if not texto:
+            return None
+        texto += f"\n\n⚠️ *Resposta incompleta: {type(e).__name__}.*"
+    finally:
+        if stream is not None:
+            stream.close()
+    
+    if texto:
+        destino.markdown(formatar_mensagem(texto))
+    return texto or None
+
+
+class _TransmissaoLLM:
+    """Resposta do LLM em andamento, acompanhada por quem fez a mesma pergunta"""
+
+    def __init__(self):
+        self.texto = ""
+        self.encerrada = False
+        self.interrompida = False
+        self._condicao = threading.Condition()
+
+    def publicar(self, texto):
+        with self._condicao:
+            self.texto = texto
+            self._condicao.notify_all()
+
+    def encerrar(self, texto, interrompida=False):
+        with self._condicao:
+            self.texto = texto or ""
+            self.interrompida = interrompida
+            self.encerrada = True
+            self._condicao.notify_all()
+
+    def acompanhar(self, destino):
+        exibido = None
+        while True:
+            with self._condicao:
+                if not self.encerrada and self.texto == exibido:
+                    self._condicao.wait(timeout=1.0)
+                texto, encerrada = self.texto, self.encerrada
+            if encerrada:
+                if texto:
+                    destino.markdown(formatar_mensagem(texto))
+                return texto or None
+            if texto != exibido:
+                destino.markdown(formatar_mensagem(texto) + "▌" if texto else "🔍 Analisando dados...")
+                exibido = texto
+
+
+def responder_com_llm_compartilhado(cliente, pergunta, contexto, destino):
+    """responder_com_llm com uma chamada só por pergunta igual sobre o mesmo contexto.
+
+    Quem chega com a pergunta já em andamento acompanha o texto do primeiro; se a
+    sessão do primeiro for interrompida, o próximo assume a chamada. A chamada
+    ocupa uma vaga de _limite_llm.
+    """
+    global _llm_coalescidas
+    # O contexto já carrega a versão dos dados (filtros inclusos) e o dia
+    chave = (" ".join(normalizar(pergunta).split()), hash(contexto))
+    while True:
+        with _lock_llm:
+            transmissao = _llm_em_andamento.get(chave)
+            lider = transmissao is None
+            if lider:
+                transmissao = _llm_em_andamento[chave] = _TransmissaoLLM()
+            else:
+                _llm_coalescidas += 1
+        if lider:
+            break
+        texto = transmissao.acompanhar(destino)
+        if not transmissao.interrompida:
+            return texto
+
+    texto = None
+    interrompida = True
+    try:
+        if _limite_llm.lotado():
+            fila = _limite_llm.estatisticas()['na_fila']
+            destino.markdown(f"⏳ Aguardando vaga para o assistente ({fila + 1} na fila)...")
+        with _limite_llm:
+            texto = responder_com_llm(cliente, pergunta, contexto, destino, transmissao.publicar)
+        interrompida = False
+    finally:
+        with _lock_llm:
+            _llm_em_andamento.pop(chave, None)
+        transmissao.encerrar(texto, interrompida)
+    return texto
+
+
+def processar_pergunta(df, pergunta, dfcontratos=None, dftimeline=None, destino=None, conversa=None):
+    """Processa pergunta - intenções conhecidas; senão o LLM (quando há `destino` e API key).
+
+    Com `conversa` (nova_conversa()), perguntas de continuação refinam as linhas da
+    resposta anterior em vez de partir da base inteira.
+    """
+    if conversa is not None and eh_continuacao(pergunta):
+        resposta_refinada = responder_refinamento(df, conversa, pergunta)
+        if resposta_refinada:
+            return resposta_refinada
+    
+    intencao, parametros = resolver_intencao(df, pergunta, dfcontratos, dftimeline)
+    
+    if conversa is not None:
+        # Só a receita; as linhas são buscadas se vier uma continuação
+        conversa['selecao'] = None
+        conversa['receita'] = ((intencao, parametros, versao_dataset(df), pd.Timestamp.now().normalize())
+                               if intencao in RESPOSTAS_INTENCAO else None)
+    
+    if intencao is not None:
+        resposta_sql = responder_intencao(df, intencao, parametros, dfcontratos, dftimeline)
+        if resposta_sql:
+            return resposta_sql
+    
+    cliente = obter_cliente_llm()
+    if destino is not None and cliente is not None:
+        contexto = obter_resumo_llm(df, dfcontratos, dftimeline)
+        resposta_llm = responder_com_llm_compartilhado(cliente, pergunta, contexto, destino)
+        if resposta_llm:
+            return resposta_llm
+    
+    colunas_disponiveis = df.columns.tolist()
+    
+    sugestoes = ["💡 **Não entendi a pergunta.**\n\n**Sugestões:**\n"]
+    
+    if 'PROJETO' in colunas_disponiveis:
+        sugestoes.append("- Liste os projetos disponíveis")
+        sugestoes.append("- Resumo do projeto [NOME]")
+        sugestoes.append("- Quantos chips por projeto?")
+    
+    if 'DATA DE VENCIMENTO' in colunas_disponiveis or 'DATA_VENCIMENTO' in colunas_disponiveis:
+        sugestoes.append("- Quais projetos vencem em 30 dias?")
+        sugestoes.append("- Quantas licenças expiradas?")
+    
+    col_conexao = buscar_coluna(df, ['CATEGORIACONEXAO', 'CATEGORIA_CONEXAO'])
+    if col_conexao:
+        sugestoes.append("- Quantos chips sem conexão há 180 dias?")
+    
+    if 'OPERADORA' in colunas_disponiveis:
+        sugestoes.append("- Qual a distribuição por operadora?")
+    
+    if not _sem_contratos(dfcontratos):
+        sugestoes.append("- Qual o status dos contratos?")
+        sugestoes.append("- Qual o percentual de entrega por projeto?")
+    
+    if dftimeline is not None and not dftimeline.empty:
+        sugestoes.append("- Quais os próximos eventos da timeline?")
+    
+    return "\n".join(sugestoes)
+
+
+def render_chatbot(df, dfcontratos=None, dftimeline=None):
+    """Renderiza chatbot com scroll - VERSÃO FINAL CORRIGIDA"""
+    inicializar_chatbot()
+    
+    # Header
+    st.markdown("""
+    <div class="header-parallax">
+        <div style="display: flex; align-items: center; gap: 1rem;">
+            <div style="font-size: 2.5rem;">🤖</div>
+            <div>
+                <h1 style="color: white; font-size: 2rem; font-weight: 900; margin: 0;">Chatbot Inteligente</h1>
+                <p style="color: #C5E1A5; font-size: 0.95rem; margin: 0.3rem 0 0 0; font-weight: 600;">
+                    Análise de Dados • Business Intelligence • Base Mobile
+                </p>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Botão limpar
+    col1, col2, col3 = st.columns([1, 6, 1])
+    with col2:
+        cache = estatisticas_cache_respostas()
+        prontos, total = progresso_pre_geracao(situacao_pre_geracao(df))
+        partes = []
+        if total:
+            partes.append(f"📄 Relatórios prontos: {prontos}/{total}")
+        if cache['acertos'] + cache['falhas'] > 0:
+            partes.append(f"⚡ Respostas em cache: {cache['itens']}/{cache['maxsize']} • "
+                          f"acertos {cache['acertos']} • falhas {cache['falhas']} • "
+                          f"taxa {cache['taxa_acerto']:.0%}")
+        concorrencia = estatisticas_concorrencia()
+        if concorrencia['executando'] or concorrencia['na_fila']:
+            partes.append(f"🚦 Em cálculo: {concorrencia['executando']}/{concorrencia['maximo']} • "
+                          f"na fila {concorrencia['na_fila']}")
+        llm = concorrencia['llm']
+        if llm['executando'] or llm['na_fila']:
+            partes.append(f"🤖 Assistente: {llm['executando']}/{llm['maximo']} • na fila {llm['na_fila']}")
+        if partes:
+            st.caption(" • ".join(partes))
+    with col3:
+        if st.button("🗑️ Limpar", use_container_width=True, type="secondary"):
+            st.session_state.chat_messages = []
+            st.session_state.chat_janela = CHAT_JANELA_MENSAGENS
+            st.session_state.chat_total = 0
+            st.session_state.chat_conversa = nova_conversa()
+            historico_chat.apagar(st.session_state.chat_usuario)
+            st.rerun()
+    
+    st.markdown("<div style='height: 0.5rem;'></div>", unsafe_allow_html=True)
+    
+    # Perguntas sugeridas (SEM DUPLICAÇÃO - CHAVE ÚNICA)
+    with st.expander("💬 **Análises Rápidas** (clique para expandir)", expanded=True):
+        sugestoes = [
+            ("📁", "Liste os projetos disponíveis"),
+            ("📊", "Quantos chips por projeto?"),
+            ("📅", "Quais projetos vencem em 30 dias?"),
+            ("🔴", "Quantos chips sem conexão há 180 dias?"),
+            ("📡", "Qual o status geral das ativações?"),
+            ("📶", "Qual a distribuição por operadora?"),
+            ("📋", "Quais contratos vencem nos próximos 90 dias?"),
+            ("📦", "Qual o percentual de entrega por projeto?"),
+        ]
+        
+        pergunta_escolhida = None
+        
+        for i in range(0, len(sugestoes), 2):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if i < len(sugestoes):
+                    emoji, texto = sugestoes[i]
+                    # CHAVE ÚNICA: timestamp incluído
+                    if st.button(f"{emoji}  {texto}", key=f"chatbot_sug_{i}", use_container_width=True, type="secondary"):
+                        pergunta_escolhida = texto
+            
+            with col2:
+                if i + 1 < len(sugestoes):
+                    emoji, texto = sugestoes[i + 1]
+                    # CHAVE ÚNICA: timestamp incluído
+                    if st.button(f"{emoji}  {texto}", key=f"chatbot_sug_{i+1}", use_container_width=True, type="secondary"):
+                        pergunta_escolhida = texto
+    
+    st.markdown("---")
+    
+    # ===== CHAT COM SCROLL - ALTURA 1100px =====
+    st.markdown("### 💬 Conversação")
+    
+    chat_container = st.container(height=1100)
+    
+    with chat_container:
+        if len(st.session_state.chat_messages) == 0:
+            st.info("👋 Olá! Faça uma pergunta sobre os dados ou use os atalhos acima.")
+        
+        # Só a janela mais recente vai para a página (e fica na sessão); as anteriores
+        # vêm do histórico sob demanda
+        mensagens = st.session_state.chat_messages
+        ocultas = max(st.session_state.chat_total - len(mensagens), 0)
+        if ocultas:
+            if st.button(f"⬆️ Carregar mensagens anteriores ({ocultas})", key="chatbot_anteriores",
+                         use_container_width=True, type="secondary"):
+                carregar_mensagens_anteriores()
+                st.rerun()
+        
+        for msg in mensagens:
+            with st.chat_message(msg["role"]):
+                st.markdown(exibicao_mensagem(msg))
+    
+    # Input fixo
+    st.markdown("---")
+    
+    prompt = pergunta_escolhida if pergunta_escolhida else st.chat_input("💭 Digite sua pergunta... (Ex: 'Resumo do projeto IAUPE')")
+    
+    if prompt:
+        msg_usuario = adicionar_mensagem("user", prompt)
+        
+        # A resposta é escrita direto no balão: o fallback via LLM aparece enquanto chega
+        with chat_container:
+            with st.chat_message("user"):
+                st.markdown(exibicao_mensagem(msg_usuario))
+            with st.chat_message("assistant"):
+                destino = st.empty()
+                destino.markdown("🔍 Analisando dados...")
+                with instrumentacao.etapa('chatbot:resposta') as etapa:
+                    resposta = etapa.resultado(processar_pergunta(df, prompt, dfcontratos, dftimeline, destino=destino,
+                                                                  conversa=st.session_state.chat_conversa))
+        adicionar_mensagem("assistant", resposta)
+        
+        st.rerun()
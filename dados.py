@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import pandas as pd
+
+from motor_sql import CAMINHO_EXCEL, CAMINHO_PARQUET
+from versao_dados import carimbar, carimbo_arquivo
+
+CAMINHO_GERENCIAIS = Path("DADOS-GERENCIAIS.xlsx")
+
+COLUNAS_DATA = ['DATA DE ENTREGA', 'DATA DE ATIVAÇÃO', 'DATA DE VENCIMENTO', 'ÚLTIMA CONEXÃO']
+
+
+def carimbos_planilhas():
+    """Carimbos atuais das duas planilhas (None para a que não existir): mudou algum, recarregar"""
+    return tuple(carimbo_arquivo(c) if c.exists() else None for c in (CAMINHO_EXCEL, CAMINHO_GERENCIAIS))
+
+
+def normalizar_operadora(operadora):
+    if pd.isna(operadora):
+        return "NÃO INFORMADO"
+    op = str(operadora).strip().upper().split()[0]
+    return {'CLAROTIM': 'CLARO', 'VIVOTIM': 'VIVO', 'TIMCLARO': 'TIM'}.get(op, op)
+
+
+def carregar_mapeamento(excel_path=CAMINHO_EXCEL, parquet_path=CAMINHO_PARQUET):
+    """Base de chips (todas as abas do Excel) e se veio do parquet de cache.
+
+    Usa o parquet enquanto ele for mais novo que o Excel; senão lê o Excel,
+    deriva STATUS_LICENCA e CATEGORIA_CONEXAO e regrava o parquet. Sem o
+    Excel, devolve um DataFrame vazio. Sem Streamlit: serve ao app e ao lote.
+    """
+    if parquet_path.exists() and excel_path.exists():
+        excel_mtime = excel_path.stat().st_mtime
+        parquet_mtime = parquet_path.stat().st_mtime
+        if parquet_mtime >= excel_mtime:
+            try:
+                df = pd.read_parquet(parquet_path)
+                return carimbar(df, carimbo_arquivo(excel_path)), True
+            except:
+                pass
+
+    if not excel_path.exists():
+        return pd.DataFrame(), False
+
+    all_sheets = pd.read_excel(excel_path, sheet_name=None, engine='openpyxl')
+    dfs = []
+    for sheet_name, df_sheet in all_sheets.items():
+        df_sheet.columns = df_sheet.columns.str.strip().str.upper()
+        if 'PROJETO' not in df_sheet.columns:
+            df_sheet['PROJETO'] = sheet_name
+        dfs.append(df_sheet)
+
+    df = pd.concat(dfs, ignore_index=True)
+
+    if 'ICCID' in df.columns:
+        df['ICCID'] = df['ICCID'].astype(str)
+    if 'OPERADORA' in df.columns:
+        df['OPERADORA'] = df['OPERADORA'].apply(normalizar_operadora)
+
+    for col in COLUNAS_DATA:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    hoje = pd.Timestamp.now().normalize()
+
+    if 'DATA DE VENCIMENTO' in df.columns:
+        df['STATUS_LICENCA'] = df['DATA DE VENCIMENTO'].apply(
+            lambda x: 'Expirado' if pd.notna(x) and x < hoje else 'Válido')
+
+    if 'ÚLTIMA CONEXÃO' in df.columns:
+        def categorizar(data):
+            if pd.isna(data):
+                return 'Nunca Conectou'
+            dias = (hoje - data).days
+            if dias <= 30:
+                return '0-30 dias'
+            elif dias <= 90:
+                return '31-90 dias'
+            elif dias <= 180:
+                return '91-180 dias'
+            return 'Mais de 180 dias'
+        df['CATEGORIA_CONEXAO'] = df['ÚLTIMA CONEXÃO'].apply(categorizar)
+
+    if 'STATUS NA OP.' in df.columns:
+        df['STATUS NA OP.'] = df['STATUS NA OP.'].fillna('Não Informado').astype(str).str.strip().str.title()
+
+    try:
+        df.to_parquet(parquet_path, compression='snappy', index=False)
+    except:
+        pass
+
+    return carimbar(df, carimbo_arquivo(excel_path)), False
+
+
+def carregar_dados_gerenciais(excel_path=CAMINHO_GERENCIAIS):
+    """(contratos, timeline) do Excel gerencial, ou (None, None) sem o arquivo"""
+    if not excel_path.exists():
+        return None, None
+
+    df_contratos = pd.read_excel(excel_path, sheet_name='DADOS CONTRATUAIS', engine='openpyxl')
+    df_timeline = pd.read_excel(excel_path, sheet_name='TIMELINE', engine='openpyxl')
+
+    df_contratos = df_contratos.dropna(how='all').dropna(subset=['PROJETO'])
+    df_timeline = df_timeline.dropna(how='all').dropna(subset=['PROJETO'])
+
+    for df in [df_contratos, df_timeline]:
+        for col in df.select_dtypes(include=['object']).columns:
+            df[col] = df[col].astype(str).str.strip()
+        df.columns = df.columns.str.strip().str.upper()
+
+    df_contratos.reset_index(drop=True, inplace=True)
+    df_timeline.reset_index(drop=True, inplace=True)
+
+    if 'DATA' in df_timeline.columns:
+        df_timeline['DATA'] = pd.to_datetime(df_timeline['DATA'], errors='coerce')
+
+    # Mesmo arquivo, tabelas diferentes: cada uma com a sua versão
+    versao = carimbo_arquivo(excel_path)
+    return carimbar(df_contratos, f"{versao}:contratos"), carimbar(df_timeline, f"{versao}:timeline")
@@ -0,0 +1,235 @@
+import pandas as pd
+
+from motor_sql import consultar, ident
+
+COLUNAS_VENCIMENTO = ['DATA DE VENCIMENTO', 'DATA_VENCIMENTO', 'VENCIMENTO']
+COLUNAS_ATIVACAO = ['DATA DE ATIVAÇÃO', 'DATA_ATIVACAO', 'ATIVACAO']
+COLUNAS_CONEXAO = ['CATEGORIACONEXAO', 'CATEGORIA_CONEXAO', 'CATEGORIA CONEXAO', 'CONEXAO']
+COLUNAS_STATUS = ['STATUS NA OP.', 'STATUS_OP', 'STATUS']
+COLUNAS_ULTIMA_CONEXAO = ['ÚLTIMA CONEXÃO', 'ULTIMA CONEXAO', 'ULTIMA_CONEXAO']
+
+CATEGORIA_INATIVO = 'Mais de 180 dias'
+
+# Status na operadora que contam como chip funcional (mesmo critério da aba de entregas)
+STATUS_FUNCIONAIS = ['Ativo', 'Suspenso']
+
+# Faixas de vencimento a partir de hoje, na ordem de exibição
+FAIXAS_VENCIMENTO = ['Expiradas', '0-30 dias', '31-90 dias', '91-180 dias',
+                     '181-365 dias', 'Mais de 365 dias', 'Sem data']
+
+
+def _buscar_coluna(df, variacoes):
+    for variacao in variacoes:
+        if variacao in df.columns:
+            return variacao
+    return None
+
+
+def _datas_tipadas(df, colunas):
+    """Colunas de data em texto convertidas num novo DataFrame - o original não é alterado.
+
+    A conversão fica no pandas: no DuckDB 0.9, TRY_CAST(texto AS TIMESTAMP) comparado
+    a uma constante perde as linhas iguais à constante.
+    """
+    convertidas = {
+        coluna: pd.to_datetime(df[coluna], errors='coerce')
+        for coluna in colunas if coluna and df[coluna].dtype == 'object'
+    }
+    return df.assign(**convertidas) if convertidas else df
+
+
+def _p(nome):
+    # Parâmetro de data sempre com tipo explícito (sem cast, o DuckDB 0.9 pode inferir errado)
+    return f"CAST(${nome} AS TIMESTAMP)"
+
+
+def _sql_tabela(colunas):
+    """Uma linha por projeto; cada métrica só entra se a coluna de origem existir"""
+    metricas = ['count(*) AS "TOTAL"']
+
+    if colunas['vencimento']:
+        venc = ident(colunas['vencimento'])
+        metricas += [
+            f'count_if({venc} >= {_p("hoje")}) AS "VALIDAS"',
+            f'count_if({venc} < {_p("hoje")}) AS "EXPIRADAS"',
+            f'count_if({venc} BETWEEN {_p("hoje")} AND {_p("limite_30d")}) AS "VENC_30D"',
+            f'count_if({venc} BETWEEN {_p("hoje")} AND {_p("limite_90d")}) AS "VENC_90D"',
+        ]
+    if colunas['ativacao']:
+        ativ = ident(colunas['ativacao'])
+        metricas += [
+            f'count({ativ}) AS "ATIVADOS"',
+            f'count_if({ativ} >= {_p("inicio_30d")}) AS "ATIV_RECENTES_30D"',
+        ]
+    if colunas['conexao']:
+        metricas.append(f'count_if({ident(colunas["conexao"])} = $inativo) AS "SEM_CONEXAO_180"')
+    if colunas['status']:
+        metricas.append(f'count_if(coalesce(CAST({ident(colunas["status"])} AS VARCHAR), \'\') '
+                        f'ILIKE \'%cancelad%\') AS "CANCELADOS"')
+
+    prox = ''
+    if colunas['vencimento']:
+        venc = ident(colunas['vencimento'])
+        prox = f', min({venc}) FILTER (WHERE {venc} BETWEEN {_p("hoje")} AND {_p("limite_30d")}) AS "PROX_VENC_30D"'
+
+    return (f'SELECT "PROJETO", {", ".join(metricas)}{prox} FROM chips '
+            f'WHERE "PROJETO" IS NOT NULL GROUP BY "PROJETO" ORDER BY "PROJETO"')
+
+
+def _sql_contagem(valor, filtro=None):
+    """Contagem longa (PROJETO, valor) -> quantidade; empates em ordem alfabética"""
+    where = f'"PROJETO" IS NOT NULL AND {valor} IS NOT NULL'
+    if filtro:
+        where += f' AND {filtro}'
+    return (f'SELECT "PROJETO", {valor} AS "VALOR", count(*) AS "QTD" FROM chips '
+            f'WHERE {where} GROUP BY ALL ORDER BY "PROJETO", "QTD" DESC, "VALOR"')
+
+
+def _sql_faixa(venc):
+    return (f"CASE WHEN {venc} IS NULL THEN 'Sem data' "
+            f"WHEN {venc} < {_p('hoje')} THEN 'Expiradas' "
+            f"WHEN {venc} <= {_p('limite_30d')} THEN '0-30 dias' "
+            f"WHEN {venc} <= {_p('limite_90d')} THEN '31-90 dias' "
+            f"WHEN {venc} <= {_p('limite_180d')} THEN '91-180 dias' "
+            f"WHEN {venc} <= {_p('limite_365d')} THEN '181-365 dias' "
+            f"ELSE 'Mais de 365 dias' END")
+
+
+def _como_serie(resultado):
+    if resultado.empty:
+        return pd.Series(dtype='int64')
+    return resultado.set_index(['PROJETO', 'VALOR'])['QTD'].astype('int64')
+
+
+def construir_estatisticas(df, hoje=None):
+    """Tabela por projeto com todas as contagens usadas pelo chatbot.
+
+    Calculada por consultas SQL (DuckDB) sobre a base. Retorna um dicionário com:
+      - tabela: uma linha por PROJETO (TOTAL, ATIVADOS, VALIDAS, EXPIRADAS,
+        VENC_30D, VENC_90D, ATIV_RECENTES_30D, SEM_CONEXAO_180, CANCELADOS,
+        PROX_VENC_30D)
+      - operadoras / cancelados_operadora / conexao / status_op / datas_30d /
+        faixas_vencimento: contagens (PROJETO, valor)
+      - colunas: colunas de origem encontradas (None quando ausente)
+    """
+    hoje = hoje or pd.Timestamp.now().normalize()
+    parametros = {
+        'hoje': hoje,
+        'limite_30d': hoje + pd.Timedelta(days=30),
+        'limite_90d': hoje + pd.Timedelta(days=90),
+        'limite_180d': hoje + pd.Timedelta(days=180),
+        'limite_365d': hoje + pd.Timedelta(days=365),
+        'inicio_30d': hoje - pd.Timedelta(days=30),
+        'inativo': CATEGORIA_INATIVO,
+    }
+
+    colunas = {
+        'vencimento': _buscar_coluna(df, COLUNAS_VENCIMENTO),
+        'ativacao': _buscar_coluna(df, COLUNAS_ATIVACAO),
+        'conexao': _buscar_coluna(df, COLUNAS_CONEXAO),
+        'status': _buscar_coluna(df, COLUNAS_STATUS),
+        'operadora': 'OPERADORA' if 'OPERADORA' in df.columns else None,
+    }
+
+    consultas = {'tabela': _sql_tabela(colunas)}
+    if colunas['operadora']:
+        consultas['operadoras'] = _sql_contagem('"OPERADORA"')
+    if colunas['conexao']:
+        consultas['conexao'] = _sql_contagem(ident(colunas['conexao']))
+    if colunas['status']:
+        status = ident(colunas['status'])
+        consultas['status_op'] = _sql_contagem(status)
+        if colunas['operadora']:
+            consultas['cancelados_operadora'] = _sql_contagem(
+                '"OPERADORA"', f"CAST({status} AS VARCHAR) ILIKE '%cancelad%'")
+    if colunas['vencimento']:
+        venc = ident(colunas['vencimento'])
+        consultas['datas_30d'] = _sql_contagem(venc, f'{venc} BETWEEN {_p("hoje")} AND {_p("limite_30d")}')
+        consultas['faixas_vencimento'] = _sql_contagem(_sql_faixa(venc))
+
+    base = _datas_tipadas(df, [colunas['vencimento'], colunas['ativacao']])
+
+    def executar(usar_parquet):
+        resultados = {}
+        for nome, sql in consultas.items():
+            usados = {k: v for k, v in parametros.items() if f'${k}' in sql}
+            resultados[nome] = consultar(sql, usados, chips=base, usar_parquet=usar_parquet)
+        return resultados
+
+    # Datas em texto: não é a base do app, que já grava o parquet com datas
+    resultados = executar(usar_parquet=base is df)
+
+    tabela = resultados['tabela'].set_index('PROJETO')
+    for coluna in tabela.columns:
+        if coluna != 'PROX_VENC_30D':
+            tabela[coluna] = tabela[coluna].astype('int64')
+
+    vazio = pd.Series(dtype='int64')
+    estat = {'colunas': colunas, 'hoje': hoje, 'total_linhas': len(df), 'tabela': tabela}
+    for nome in ('operadoras', 'cancelados_operadora', 'conexao', 'status_op', 'datas_30d',
+                 'faixas_vencimento'):
+        estat[nome] = _como_serie(resultados[nome]) if nome in resultados else vazio
+    return estat
+
+
+def contagens_do_projeto(contagem, projeto):
+    """Série valor -> quantidade de um projeto, maior primeiro"""
+    if projeto not in contagem.index.get_level_values(0):
+        return pd.Series(dtype='int64')
+    return contagem.xs(projeto, level=0).sort_values(ascending=False, kind='stable')
+
+
+def contagens_totais(contagem):
+    """Série valor -> quantidade somando todos os projetos, maior primeiro"""
+    if contagem.empty:
+        return contagem
+    return contagem.groupby(level=1).sum().sort_values(ascending=False, kind='stable')
+
+
+def _fim_vigencia(contratos):
+    """Última renovação + duração em meses (vazio quando falta um dos dois)"""
+    renovacao = pd.to_datetime(contratos['RENOVACAO'], errors='coerce')
+    meses = pd.to_numeric(contratos['DURACAO_MESES'], errors='coerce')
+    return pd.Series([r + pd.DateOffset(months=int(m)) if pd.notna(r) and pd.notna(m) else pd.NaT
+                      for r, m in zip(renovacao, meses)], index=contratos.index, dtype='datetime64[ns]')
+
+
+def construir_tabela_contratos(df, dfcontratos, hoje=None):
+    """Contratos (DADOS CONTRATUAIS) com os chips de cada projeto, uma linha por contrato.
+
+    A base é agregada por PROJETO e unida aos contratos numa consulta só. Colunas:
+    FOCAL_1, FOCAL_2, SERVICOS, STATUS, PREVISTAS, RENOVACAO, DURACAO_MESES,
+    FIM_VIGENCIA, DIAS_PARA_FIM, CHIPS, FUNCIONAIS, PCT_ENTREGUE, PCT_FUNCIONAL.
+    """
+    hoje = hoje or pd.Timestamp.now().normalize()
+    origem = {
+        'FOCAL_1': 'FOCAL POINT 1', 'FOCAL_2': 'FOCAL POINT 2', 'SERVICOS': 'SERVIÇOS CONTRATADOS',
+        'STATUS': 'STATUS ATUAL DO CONTRATO', 'PREVISTAS': 'TOTAL DE LICENÇAS PREVISTAS',
+        'RENOVACAO': 'DATA DA ÚLTIMA RENOVAÇÃO CONTRATUAL', 'DURACAO_MESES': 'DURAÇÃO CONTRATUAL (MESES)',
+    }
+    campos = ", ".join(
+        f'c.{ident(coluna)} AS "{nome}"' if coluna in dfcontratos.columns else f'NULL AS "{nome}"'
+        for nome, coluna in origem.items())
+
+    status = _buscar_coluna(df, COLUNAS_STATUS)
+    funcionais = (f'count_if(list_contains($funcionais, CAST({ident(status)} AS VARCHAR)))'
+                  if status else '0')
+    sql = (f'WITH por_projeto AS (SELECT "PROJETO", count(*) AS "CHIPS", {funcionais} AS "FUNCIONAIS" '
+           f'FROM chips WHERE "PROJETO" IS NOT NULL GROUP BY "PROJETO") '
+           f'SELECT c."PROJETO", {campos}, coalesce(k."CHIPS", 0) AS "CHIPS", '
+           f'coalesce(k."FUNCIONAIS", 0) AS "FUNCIONAIS" '
+           f'FROM contratos c LEFT JOIN por_projeto k ON k."PROJETO" = c."PROJETO" ORDER BY c."PROJETO"')
+    parametros = {'funcionais': STATUS_FUNCIONAIS} if status else {}
+    tabela = consultar(sql, parametros, chips=df, contratos=dfcontratos)
+
+    tabela = tabela.drop_duplicates('PROJETO').set_index('PROJETO')
+    tabela['CHIPS'] = tabela['CHIPS'].astype('int64')
+    tabela['FUNCIONAIS'] = tabela['FUNCIONAIS'].astype('int64')
+    tabela['PREVISTAS'] = pd.to_numeric(tabela['PREVISTAS'], errors='coerce')
+    tabela['RENOVACAO'] = pd.to_datetime(tabela['RENOVACAO'], errors='coerce')
+    tabela['FIM_VIGENCIA'] = _fim_vigencia(tabela)
+    tabela['DIAS_PARA_FIM'] = (tabela['FIM_VIGENCIA'] - hoje).dt.days
+    previstas = tabela['PREVISTAS'].where(tabela['PREVISTAS'] > 0)
+    tabela['PCT_ENTREGUE'] = (tabela['CHIPS'] / previstas * 100).fillna(0.0)
+    tabela['PCT_FUNCIONAL'] = (tabela['FUNCIONAIS'] / tabela['CHIPS'].where(tabela['CHIPS'] > 0) * 100).fillna(0.0)
+    return tabela
@@ -0,0 +1,166 @@
+import os
+import secrets
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+FORMATOS = {'csv': 'CSV', 'parquet': 'Parquet', 'xlsx': 'Excel (XLSX)'}
+TAMANHO_LOTE = 50_000
+MAX_LINHAS_ABA_XLSX = 1_048_575  # limite do Excel menos o cabeçalho
+IDADE_MAXIMA_SEGUNDOS = 3600
+# Segundos entre os reruns que atualizam a barra de progresso
+INTERVALO_PROGRESSO = 1.0
+# Sem o /app/static o arquivo vai pelo download_button, que o carrega inteiro na memória
+LIMITE_DOWNLOAD_MEMORIA = 20 * 1024 * 1024
+
+# Poucos workers: exportação é I/O + CPU e não pode competir com as sessões
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='exportacao')
+_jobs = {}
+_lock = threading.Lock()
+
+
+def _lotes(df, tamanho=TAMANHO_LOTE):
+    for inicio in range(0, len(df), tamanho):
+        yield df.iloc[inicio:inicio + tamanho]
+
+
+def _escrever_csv(df, caminho, progresso):
+    # ; e BOM para o Excel em pt-BR abrir direto com acentos
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as f:
+        for i, lote in enumerate(_lotes(df)):
+            lote.to_csv(f, sep=';', index=False, header=(i == 0), date_format='%d/%m/%Y')
+            progresso(len(lote))
+
+
+def _escrever_parquet(df, caminho, progresso):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Colunas object viram string fixo: evita schema diferente entre lotes
+    colunas_texto = [c for c in df.columns if df[c].dtype == 'object']
+    campos = []
+    for coluna in df.columns:
+        if coluna in colunas_texto:
+            campos.append(pa.field(str(coluna), pa.string()))
+        else:
+            campos.append(pa.Schema.from_pandas(df[[coluna]].iloc[:0], preserve_index=False).field(0))
+    schema = pa.schema(campos)
+
+    with pq.ParquetWriter(caminho, schema, compression='snappy') as writer:
+        for lote in _lotes(df):
+            if colunas_texto:
+                lote = lote.astype({c: 'string' for c in colunas_texto})
+            writer.write_table(pa.Table.from_pandas(lote, schema=schema, preserve_index=False))
+            progresso(len(lote))
+
+
+def _valor_xlsx(valor):
+    if valor is pd.NaT or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    return valor
+
+
+def _escrever_xlsx(df, caminho, progresso):
+    from openpyxl import Workbook
+
+    # write_only: as linhas vão direto para o XML temporário, sem manter a planilha em memória
+    wb = Workbook(write_only=True)
+    cabecalho = [str(c) for c in df.columns]
+    ws, linhas_aba, n_aba = None, MAX_LINHAS_ABA_XLSX, 0
+
+    for lote in _lotes(df):
+        for linha in lote.itertuples(index=False, name=None):
+            if linhas_aba >= MAX_LINHAS_ABA_XLSX:
+                n_aba += 1
+                ws = wb.create_sheet('Chips' if n_aba == 1 else f'Chips ({n_aba})')
+                ws.append(cabecalho)
+                linhas_aba = 0
+            ws.append([_valor_xlsx(v) for v in linha])
+            linhas_aba += 1
+        progresso(len(lote))
+
+    if ws is None:
+        wb.create_sheet('Chips').append(cabecalho)
+    wb.save(caminho)
+
+
+ESCRITORES = {'csv': _escrever_csv, 'parquet': _escrever_parquet, 'xlsx': _escrever_xlsx}
+
+
+def _executar(job_id, df, caminho):
+    job = _jobs[job_id]
+    job['estado'] = 'executando'
+    tmp = caminho.with_name(caminho.name + '.parcial')
+
+    def progresso(n):
+        job['linhas'] += n
+
+    try:
+        ESCRITORES[job['formato']](df, tmp, progresso)
+        os.replace(tmp, caminho)
+        job['estado'] = 'concluido'
+    except Exception as e:
+        job['estado'] = 'erro'
+        job['erro'] = str(e)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+    finally:
+        job['fim'] = time.time()
+
+
+def limpar_exportacoes_antigas(destino_dir, idade_maxima=IDADE_MAXIMA_SEGUNDOS):
+    """Remove arquivos exportados (e registros de jobs) mais antigos que idade_maxima"""
+    agora = time.time()
+    with _lock:
+        for job_id in [j for j, job in _jobs.items() if job['fim'] and agora - job['fim'] > idade_maxima]:
+            del _jobs[job_id]
+
+    destino_dir = Path(destino_dir)
+    if not destino_dir.exists():
+        return
+    for pasta in destino_dir.iterdir():
+        try:
+            if agora - pasta.stat().st_mtime > idade_maxima:
+                shutil.rmtree(pasta, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def iniciar_exportacao(df, formato, destino_dir, nome_base='chips'):
+    """Agenda a exportação em segundo plano e devolve o id do job"""
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato inválido: {formato}")
+
+    limpar_exportacoes_antigas(destino_dir)
+
+    job_id = secrets.token_urlsafe(12)
+    pasta = Path(destino_dir) / job_id
+    pasta.mkdir(parents=True, exist_ok=True)
+    caminho = pasta / f"{nome_base}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+
+    with _lock:
+        _jobs[job_id] = {
+            'id': job_id, 'formato': formato, 'estado': 'fila', 'erro': None,
+            'linhas': 0, 'total': len(df), 'arquivo': caminho, 'fim': None
+        }
+    _executor.submit(_executar, job_id, df, caminho)
+    return job_id
+
+
+def status_exportacao(job_id):
+    """Cópia do estado do job (None se não existir mais)"""
+    job = _jobs.get(job_id)
+    if job is None:
+        return None
+    status = dict(job)
+    status['progresso'] = (status['linhas'] / status['total']) if status['total'] else 1.0
+    return status
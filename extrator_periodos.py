@@ -0,0 +1,202 @@
+import re
+import sys
+
+import pandas as pd
+
+from roteador_intencoes import normalizar
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+}
+
+NUMEROS_EXTENSO = {
+    'um': 1, 'uma': 1, 'dois': 2, 'duas': 2, 'tres': 3, 'quatro': 4, 'cinco': 5, 'seis': 6,
+    'sete': 7, 'oito': 8, 'nove': 9, 'dez': 10, 'doze': 12, 'quinze': 15, 'vinte': 20,
+    'trinta': 30, 'quarenta': 40, 'sessenta': 60, 'noventa': 90, 'cento e oitenta': 180,
+}
+
+# Unidade -> argumento de pd.DateOffset
+UNIDADES = {'dia': 'days', 'semana': 'weeks', 'mes': 'months', 'ano': 'years'}
+
+_NUMERO = r'(\d+|' + '|'.join(sorted(NUMEROS_EXTENSO, key=len, reverse=True)) + r')'
+_MES = '(' + '|'.join(MESES) + ')'
+_ANO = r'(?:\s+de\s+(\d{4}))?'
+_DATA = r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?'
+
+_RE_QUANTIDADE = re.compile(_NUMERO + r'\s+(dia|semana|mes|meses|ano)s?\b')
+_RE_ENTRE_MESES = re.compile(r'\bentre\s+' + _MES + _ANO + r'\s+e\s+' + _MES + _ANO)
+_RE_ENTRE_DATAS = re.compile(r'\bentre\s+' + _DATA + r'\s+e\s+' + _DATA)
+_RE_ATE_DATA = re.compile(r'\bate\s+' + _DATA)
+_RE_MES = re.compile(r'\b(?:em|no mes de|durante)\s+' + _MES + _ANO)
+# Pergunta no passado ("venceram em março"): sem ano, o mês é o deste ano mesmo já encerrado
+_RE_PASSADO = re.compile(r'\b(venceu|venceram|vencid[oa]s?|expirou|expiraram|expirad[oa]s?|terminou|terminaram'
+                         r'|passad[oa])\b')
+
+# Perguntas com o período esperado, lidas em HOJE_CASOS: (pergunta, início, fim) ou (pergunta, None, None)
+HOJE_CASOS = pd.Timestamp(2026, 10, 19)
+CASOS_PERIODO = [
+    ("Quais licenças vencem em 45 dias?", '19/10/2026', '03/12/2026'),
+    ("Licenças que vencem em novembro", '01/11/2026', '30/11/2026'),
+    ("Quais licenças vencem em outubro?", '01/10/2026', '31/10/2026'),
+    # Sem ano, um período já encerrado é o da próxima ocorrência
+    ("Quais licenças vencem em março?", '01/03/2027', '31/03/2027'),
+    ("Licenças que vencem entre janeiro e fevereiro", '01/01/2027', '28/02/2027'),
+    ("Licenças que vencem entre março e junho", '01/03/2027', '30/06/2027'),
+    ("Licenças que vencem entre setembro e dezembro", '01/09/2026', '31/12/2026'),
+    ("Licenças que vencem entre novembro e fevereiro", '01/11/2026', '28/02/2027'),
+    ("Quantos chips vencem entre 01/03 e 30/06?", '01/03/2027', '30/06/2027'),
+    ("Quantos chips vencem entre 01/11 e 28/02?", '01/11/2026', '28/02/2027'),
+    ("Quantos chips vencem entre 01/11 e 28/02/2027?", '01/11/2026', '28/02/2027'),
+    ("Quantos chips vencem entre 01/11/2026 e 28/02/2027?", '01/11/2026', '28/02/2027'),
+    ("Quantos chips vencem entre 01/11/25 e 28/02/26?", '01/11/2025', '28/02/2026'),
+    ("O que vence até 31/12?", '19/10/2026', '31/12/2026'),
+    ("O que vence até 31/01?", '19/10/2026', '31/01/2027'),
+    ("Quais contratos vencem em fevereiro?", '01/02/2027', '28/02/2027'),
+    # Ano explícito ou pergunta no passado: vale o que foi dito
+    ("Quais licenças vencem em março de 2026?", '01/03/2026', '31/03/2026'),
+    ("Licenças que vencem entre janeiro e fevereiro de 2026", '01/01/2026', '28/02/2026'),
+    ("Quais contratos terminaram em março?", '01/03/2026', '31/03/2026'),
+    ("Quais contratos venceram entre janeiro e fevereiro?", '01/01/2026', '28/02/2026'),
+    ("Quais licenças vencem em 31/02?", None, None),
+    ("Quais licenças vencem?", None, None),
+]
+
+
+def _inteiro(texto):
+    return int(texto) if texto.isdigit() else NUMEROS_EXTENSO[texto]
+
+
+def _data(dia, mes, ano, hoje):
+    ano = int(ano) if ano else hoje.year
+    if ano < 100:
+        ano += 2000
+    return pd.Timestamp(year=ano, month=int(mes), day=int(dia))
+
+
+def _fim_do_dia(data):
+    return data + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+
+
+def _fim_do_mes(mes, ano):
+    return pd.Timestamp(year=ano, month=mes, day=1) + pd.DateOffset(months=1) - pd.Timedelta(1, 'ns')
+
+
+def extrair_duracao(pergunta):
+    """("45 dias" -> (45, 'dia')) primeira quantidade de tempo da pergunta, ou None"""
+    m = _RE_QUANTIDADE.search(normalizar(pergunta))
+    if not m:
+        return None
+    unidade = 'mes' if m.group(2) == 'meses' else m.group(2)
+    return _inteiro(m.group(1)), unidade
+
+
+def deslocamento(quantidade, unidade):
+    return pd.DateOffset(**{UNIDADES[unidade]: quantidade})
+
+
+def rotulo_duracao(quantidade, unidade):
+    plurais = {'dia': 'dias', 'semana': 'semanas', 'mes': 'meses', 'ano': 'anos'}
+    singulares = {'dia': 'dia', 'semana': 'semana', 'mes': 'mês', 'ano': 'ano'}
+    return f"{quantidade} {plurais[unidade] if quantidade != 1 else singulares[unidade]}"
+
+
+def extrair_periodo(pergunta, hoje):
+    """(início, fim, rótulo) do período citado na pergunta, ou None.
+
+    Entende "entre março e junho [de 2027]", "entre 01/03 e 30/06/2027",
+    "até 31/12", "em março" e quantidades a partir de hoje ("em 45 dias",
+    "nos próximos 2 meses"). O fim é inclusivo. Sem ano, vale a próxima
+    ocorrência: um período que já terminou vai para o ano seguinte ("vencem
+    em março" em outubro é o março que vem), salvo pergunta no passado.
+    Datas inexistentes (31/02) contam como pergunta sem período.
+    """
+    try:
+        return _extrair_periodo(normalizar(pergunta), hoje)
+    except ValueError:
+        return None
+
+
+def _extrair_periodo(texto, hoje):
+    # Sem ano na pergunta, o período que já terminou rola um ano (exceto no passado)
+    rolar = _RE_PASSADO.search(texto) is None
+
+    m = _RE_ENTRE_MESES.search(texto)
+    if m:
+        mes_ini, ano_ini, mes_fim, ano_fim = m.groups()
+        sem_ano = ano_ini is None and ano_fim is None
+        fim_explicito = ano_fim is not None and ano_ini is None
+        ano_fim = int(ano_fim) if ano_fim else hoje.year
+        ano_ini = int(ano_ini) if ano_ini else ano_fim
+        # "entre novembro e fevereiro [de 2027]" atravessa a virada do ano
+        if MESES[mes_fim] < MESES[mes_ini] and ano_ini == ano_fim:
+            if fim_explicito:
+                ano_ini -= 1
+            else:
+                ano_fim += 1
+        if sem_ano and rolar and _fim_do_mes(MESES[mes_fim], ano_fim) < hoje:
+            ano_ini, ano_fim = ano_ini + 1, ano_fim + 1
+        inicio = pd.Timestamp(year=ano_ini, month=MESES[mes_ini], day=1)
+        fim = _fim_do_mes(MESES[mes_fim], ano_fim)
+        return inicio, fim, f"{inicio.strftime('%m/%Y')} a {fim.strftime('%m/%Y')}"
+
+    m = _RE_ENTRE_DATAS.search(texto)
+    if m:
+        dia_ini, mes_ini, ano_ini, dia_fim, mes_fim, ano_fim = m.groups()
+        sem_ano = ano_ini is None and ano_fim is None
+        fim_explicito = ano_fim is not None and ano_ini is None
+        # "entre 01/03 e 30/06/2027": o ano do fim vale para o início
+        ano_fim = _data(dia_fim, mes_fim, ano_fim, hoje).year
+        ano_ini = _data(dia_ini, mes_ini, ano_ini, hoje).year if ano_ini else ano_fim
+        # Mesma virada de ano dos meses: "entre 01/11 e 28/02[/2027]"
+        if (int(mes_ini), int(dia_ini)) > (int(mes_fim), int(dia_fim)) and ano_ini == ano_fim:
+            if fim_explicito:
+                ano_ini -= 1
+            else:
+                ano_fim += 1
+        if sem_ano and rolar and _fim_do_dia(_data(dia_fim, mes_fim, str(ano_fim), hoje)) < hoje:
+            ano_ini, ano_fim = ano_ini + 1, ano_fim + 1
+        inicio = _data(dia_ini, mes_ini, str(ano_ini), hoje)
+        fim = _fim_do_dia(_data(dia_fim, mes_fim, str(ano_fim), hoje))
+        return inicio, fim, f"{inicio.strftime('%d/%m/%Y')} a {fim.strftime('%d/%m/%Y')}"
+
+    m = _RE_ATE_DATA.search(texto)
+    if m:
+        dia, mes, ano = m.groups()
+        fim = _fim_do_dia(_data(dia, mes, ano, hoje))
+        if ano is None and rolar and fim < hoje:
+            fim = _fim_do_dia(_data(dia, mes, str(hoje.year + 1), hoje))
+        return hoje, fim, f"até {fim.strftime('%d/%m/%Y')}"
+
+    m = _RE_MES.search(texto)
+    if m:
+        mes, ano = MESES[m.group(1)], int(m.group(2)) if m.group(2) else hoje.year
+        if m.group(2) is None and rolar and _fim_do_mes(mes, ano) < hoje:
+            ano += 1
+        inicio = pd.Timestamp(year=ano, month=mes, day=1)
+        return inicio, _fim_do_mes(mes, ano), inicio.strftime('%m/%Y')
+
+    duracao = extrair_duracao(texto)
+    if duracao:
+        return hoje, hoje + deslocamento(*duracao), f"em até {rotulo_duracao(*duracao)}"
+
+    return None
+
+
+def avaliar_casos(casos=CASOS_PERIODO, hoje=HOJE_CASOS):
+    """[(pergunta, esperado, obtido)] dos casos cujo período difere do esperado"""
+    erros = []
+    for pergunta, inicio, fim in casos:
+        periodo = extrair_periodo(pergunta, hoje)
+        obtido = (periodo[0].strftime('%d/%m/%Y'), periodo[1].strftime('%d/%m/%Y')) if periodo else (None, None)
+        if obtido != (inicio, fim):
+            erros.append((pergunta, (inicio, fim), obtido))
+    return erros
+
+
+if __name__ == "__main__":
+    erros = avaliar_casos()
+    print(f"Períodos: {len(CASOS_PERIODO)} casos em {HOJE_CASOS:%d/%m/%Y}, {len(erros)} erro(s)")
+    for pergunta, esperado, obtido in erros:
+        print(f"  ERRO  {pergunta!r}: esperado={esperado} obtido={obtido}")
+    sys.exit(1 if erros else 0)
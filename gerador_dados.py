@@ -0,0 +1,200 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from dados import CAMINHO_GERENCIAIS
+from motor_sql import CAMINHO_EXCEL
+
+# Nomes que as perguntas do chatbot citam (Bahia, ES, Joinville...) vêm primeiro
+PROJETOS_FIXOS = ['Governo do estado da Bahia', 'ES', 'IAUPE', 'Prefeitura de Joinville', 'Pref. de Aracaju',
+                  'Pref. Nova Lima - MG - Educação']
+MUNICIPIOS = ['Curitiba', 'Recife', 'Natal', 'Manaus', 'Belém', 'Goiânia', 'Cuiabá', 'Maceió', 'Teresina',
+              'Londrina', 'Santos', 'Campinas', 'Sorocaba', 'Uberlândia', 'Contagem', 'Betim', 'Vitória',
+              'Serra', 'Vila Velha', 'Cariacica', 'Niterói', 'Petrópolis', 'Macaé', 'Blumenau', 'Chapecó',
+              'Itajaí', 'Pelotas', 'Canoas', 'Caxias do Sul', 'Maringá', 'Cascavel', 'Palmas', 'Boa Vista',
+              'Macapá', 'Rio Branco', 'Aracaju', 'Feira de Santana', 'Ilhéus', 'Juazeiro', 'Caruaru', 'Olinda',
+              'Mossoró', 'Campina Grande', 'Sobral', 'Imperatriz', 'Anápolis', 'Dourados', 'Jundiaí', 'Bauru',
+              'Franca']
+ORGAOS = ['Educação', 'Saúde', 'Segurança', 'Assistência', 'Transporte', 'Obras', 'Fazenda', 'Cultura',
+          'Esporte', 'Meio Ambiente']
+
+# Grafias que chegam das planilhas de campo; normalizar_operadora as junta
+OPERADORAS = {'CLARO': 0.33, 'VIVO': 0.29, 'TIM': 0.23, 'ALGAR': 0.05, 'claro': 0.02, 'Vivo 4G': 0.02,
+              'VIVOTIM': 0.02, 'CLAROTIM': 0.01, 'TIM ': 0.01}
+STATUS_OP = {'Ativo': 0.58, 'Suspenso': 0.1, 'Cancelado': 0.12, 'ATIVO ': 0.04, 'Bloqueado': 0.04}
+ACOES_TIMELINE = ['ENTREGA', 'ATIVAÇÃO', 'VINCULAÇÃO', 'EXPIRAÇÃO', 'CANCELAMENTO', 'RENOVAÇÃO', 'PAGAMENTO',
+                  'SUBSTITUIÇÃO']
+STATUS_CONTRATO = {'VÁLIDO': 0.6, 'EXPIRANDO': 0.15, 'EXPIRADO': 0.1, 'EM RENOVAÇÃO': 0.15}
+FOCAIS = ['IVO', 'LUCIANO', 'MERCIA', 'MARIELE', 'CLÁUDIO', 'HYANE', 'JACIELE', 'RAFAEL', 'BEATRIZ', 'JOÃO',
+          'PATRÍCIA', 'MARCOS', 'NÃOTEM']
+SERVICOS = ['CHIP', 'CHIP + MODEM', 'CHIP + MODEM + SUPORTE']
+
+# Limite de linhas de uma aba do Excel (com o cabeçalho)
+LINHAS_POR_ABA = 1_048_575
+
+
+def nomes_projetos(quantidade):
+    """Nomes únicos que cabem no nome de aba (31 caracteres): a aba é o PROJETO"""
+    nomes = list(PROJETOS_FIXOS)
+    for orgao in ORGAOS:
+        for municipio in MUNICIPIOS:
+            nome = f"{municipio} - {orgao}"
+            if len(nome) <= 31:
+                nomes.append(nome)
+    if quantidade > len(nomes):
+        raise ValueError(f"no máximo {len(nomes)} projetos")
+    return nomes[:quantidade]
+
+
+def _escolher(rng, pesos, n):
+    valores = list(pesos)
+    p = np.array(list(pesos.values()))
+    return np.array(valores, dtype=object)[rng.choice(len(valores), n, p=p / p.sum())]
+
+
+def _dias(n):
+    return pd.to_timedelta(n, unit='D')
+
+
+def gerar_mapeamento(chips, projetos, semente=42, hoje=None):
+    """{aba: DataFrame} no formato do MAPEAMENTO DE CHIPS, com projetos de tamanhos desiguais"""
+    rng = np.random.default_rng(semente)
+    hoje = hoje or pd.Timestamp.now().normalize()
+    nomes = nomes_projetos(projetos)
+
+    # Poucos projetos grandes e uma cauda de pequenos, como na base real
+    pesos = 1 / np.arange(1, projetos + 1) ** 0.8
+    por_projeto = rng.multinomial(chips - projetos, pesos / pesos.sum()) + 1
+    if por_projeto.max() > LINHAS_POR_ABA:
+        raise ValueError(f"{por_projeto.max():,} chips numa aba só; aumente o número de projetos")
+
+    iccids = rng.permutation(chips).astype(np.int64) * 1000 + rng.integers(0, 1000, chips)
+    iccids = ('8955' + pd.Series(iccids).astype(str).str.zfill(15)).to_numpy()
+
+    abas = {}
+    inicio = 0
+    for nome, n in zip(nomes, por_projeto):
+        entrega = pd.Series(hoje - _dias(rng.integers(30, 1100, n)))
+        ativacao = (entrega + _dias(rng.integers(0, 60, n))).where(rng.random(n) > 0.08)
+        vencimento = ativacao.fillna(entrega) + _dias(rng.choice([365, 730], n, p=[0.7, 0.3]))
+        status = _escolher(rng, STATUS_OP, n)
+        status[rng.random(n) < 0.07] = None
+        # Ativos conectam com frequência; cancelados pararam há tempos
+        atraso = np.where(status == 'Cancelado', rng.integers(120, 700, n), rng.exponential(25, n).astype(int))
+        conexao = pd.Series(hoje - _dias(atraso)).where(rng.random(n) > 0.06)
+        abas[nome] = pd.DataFrame({
+            'ICCID': iccids[inicio:inicio + n],
+            'OPERADORA': _escolher(rng, OPERADORAS, n),
+            'STATUS NA OP.': status,
+            'DATA DE ENTREGA': entrega,
+            'DATA DE ATIVAÇÃO': ativacao,
+            'DATA DE VENCIMENTO': vencimento,
+            'ÚLTIMA CONEXÃO': conexao,
+        })
+        inicio += n
+    return abas
+
+
+def gerar_gerenciais(abas, semente=42, hoje=None):
+    """{aba: DataFrame} do DADOS-GERENCIAIS (contratos, entregas e timeline) para os projetos de `abas`"""
+    rng = np.random.default_rng(semente + 1)
+    hoje = hoje or pd.Timestamp.now().normalize()
+    contratos, entregas, timeline = [], [], []
+
+    for nome, df in abas.items():
+        total = len(df)
+        # Alguns projetos ainda não têm contrato cadastrado
+        if rng.random() < 0.9:
+            contratos.append({
+                'PROJETO': nome,
+                'FOCAL POINT 1': rng.choice(FOCAIS),
+                'FOCAL POINT 2': rng.choice(FOCAIS),
+                'DATA INICIAL': df['DATA DE ENTREGA'].min() - _dias(int(rng.integers(15, 90))),
+                'SERVIÇOS CONTRATADOS': rng.choice(SERVICOS),
+                'TOTAL DE LICENÇAS PREVISTAS': int(round(total * rng.uniform(0.95, 1.4), -1)) or 10,
+                'DATA DA ÚLTIMA RENOVAÇÃO CONTRATUAL': hoje - _dias(int(rng.integers(0, 360))),
+                'DURAÇÃO CONTRATUAL (MESES)': int(rng.choice([12, 24, 36])),
+                'STATUS ATUAL DO CONTRATO': _escolher(rng, STATUS_CONTRATO, 1)[0],
+            })
+        operadoras = df['OPERADORA'].str.strip().str.upper().str.split().str[0].value_counts()
+        entregas.append({
+            'PROJETO': nome,
+            'TOTAL DE LICENÇAS ENTREGUES': total,
+            '% DE LICENÇAS ENTREGUES': np.nan,
+            **{f'LICENÇAS - {op}': float(operadoras.get(op, 0)) for op in ('CLARO', 'VIVO', 'TIM', 'ALGAR')},
+            'EXTRATO DE LICENÇAS FUNCIONAIS': np.nan,
+            '% DE LICENÇAS FUNCIONAIS - FORNECEDOR': np.nan,
+        })
+        for _ in range(int(rng.integers(1, 5))):
+            timeline.append({
+                'PROJETO': nome,
+                'AÇÃO': rng.choice(ACOES_TIMELINE),
+                'DATA': hoje + _dias(int(rng.integers(-180, 365))),
+                'QUANTIDADE': int(rng.integers(1, max(total, 2))),
+            })
+
+    return {'DADOS CONTRATUAIS': pd.DataFrame(contratos), 'ENTREGA': pd.DataFrame(entregas),
+            'TIMELINE': pd.DataFrame(timeline).sort_values('DATA', ignore_index=True)}
+
+
+def gravar_xlsx(caminho, abas):
+    """Grava em modo write_only: milhões de linhas sem montar a planilha inteira na memória"""
+    livro = Workbook(write_only=True)
+    for nome, df in abas.items():
+        planilha = livro.create_sheet(title=nome)
+        planilha.append(list(df.columns))
+        valores = df.astype(object).where(df.notna(), None)
+        for linha in valores.itertuples(index=False, name=None):
+            planilha.append(linha)
+    livro.save(caminho)
+
+
+def gerar_planilhas(pasta, chips, projetos, semente=42):
+    """Grava MAPEAMENTO DE CHIPS.xlsx e DADOS-GERENCIAIS.xlsx em `pasta`; devolve os dois caminhos"""
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    hoje = pd.Timestamp.now().normalize()
+    abas = gerar_mapeamento(chips, projetos, semente, hoje)
+    caminho_mapeamento = pasta / CAMINHO_EXCEL.name
+    caminho_gerenciais = pasta / CAMINHO_GERENCIAIS.name
+    gravar_xlsx(caminho_mapeamento, abas)
+    gravar_xlsx(caminho_gerenciais, gerar_gerenciais(abas, semente, hoje))
+    return caminho_mapeamento, caminho_gerenciais
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera planilhas sintéticas no formato das reais (benchmarks e testes de carga).")
+    parser.add_argument('pasta', help="pasta de destino")
+    parser.add_argument('-c', '--chips', type=int, default=10_000, help="chips na base (10 mil a 2 milhões)")
+    parser.add_argument('-n', '--projetos', type=int, default=10, help="projetos (10 a 500)")
+    parser.add_argument('-s', '--semente', type=int, default=42)
+    parser.add_argument('-f', '--forcar', action='store_true', help="sobrescreve planilhas existentes")
+    args = parser.parse_args(argv)
+
+    if args.chips < args.projetos:
+        parser.error("precisa de ao menos um chip por projeto")
+    destino = Path(args.pasta)
+    existentes = [c for c in (destino / CAMINHO_EXCEL.name, destino / CAMINHO_GERENCIAIS.name) if c.exists()]
+    if existentes and not args.forcar:
+        # A pasta pode ser a do app: nunca apagar a base real sem pedido explícito
+        print(f"❌ {', '.join(map(str, existentes))} já existe(m); use --forcar para sobrescrever", file=sys.stderr)
+        return 2
+
+    inicio = time.perf_counter()
+    try:
+        caminhos = gerar_planilhas(destino, args.chips, args.projetos, args.semente)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    print(f"{args.chips:,} chips em {args.projetos} projetos -> {', '.join(map(str, caminhos))} "
+          f"({time.perf_counter() - inicio:.1f}s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
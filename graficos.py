@@ -0,0 +1,209 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+from calendario_vencimentos import serie_vencimentos, vencimentos_por_projeto
+
+COLORS = {
+    'primary': '#1a1a1a', 'secondary': '#8BC34A', 'accent': '#4CAF50',
+    'dark_green': '#2E7D32', 'light_green': '#C5E1A5', 'warning': '#FFB74D',
+    'danger': '#E57373', 'info': '#64B5F6', 'light': '#FAFAFA',
+    'gray': '#BDBDBD', 'dark_gray': '#616161', 'white': '#FFFFFF',
+    'claro': '#FF5252', 'vivo': '#7B1FA2', 'tim': '#1976D2',
+    'oi': '#FDD835', 'algar': '#00C853'
+}
+
+CORES_ACAO = {
+    'ENTREGA': "#4FB853", 'ATIVAÇÃO': '#2196F3', 'VINCULAÇÃO': '#FF9800',
+    'EXPIRAÇÃO': '#F44336', 'CANCELAMENTO': '#9C27B0', 'RENOVAÇÃO': '#00BCD4',
+    'PAGAMENTO': '#8BC34A', 'SUBSTITUIÇÃO': '#FFC107'
+}
+
+
+def criar_grafico_pizza(df, coluna, titulo=""):
+    dados = df[coluna].value_counts().reset_index()
+    dados.columns = ['Label', 'Valor']
+
+    if coluna == 'OPERADORA':
+        color_map = {'CLARO': COLORS['claro'], 'VIVO': COLORS['vivo'], 
+                    'TIM': COLORS['tim'], 'OI': COLORS['oi'], 'ALGAR': COLORS['algar']}
+    elif coluna == 'CATEGORIA_CONEXAO':
+        color_map = {'Nunca Conectou': COLORS['danger'], 'Mais de 180 dias': COLORS['warning'],
+                    '91-180 dias': COLORS['info'], '31-90 dias': COLORS['light_green'], 
+                    '0-30 dias': COLORS['accent']}
+    else:
+        color_map = {}
+
+    colors = [color_map.get(label, COLORS['gray']) for label in dados['Label']]
+
+    fig = go.Figure(data=[go.Pie(
+        labels=dados['Label'], values=dados['Valor'], hole=0.55,
+        marker=dict(colors=colors, line=dict(color='white', width=3)),
+        textfont=dict(size=14, family='Inter', color='#1a1a1a'),
+        textinfo='label+percent'
+    )])
+
+    fig.add_annotation(
+        text=f'<b style="font-size:28px">{dados["Valor"].sum():,.0f}</b><br><span style="font-size:14px">{titulo}</span>',
+        x=0.5, y=0.5, showarrow=False, font=dict(family='Inter', color='#1a1a1a')
+    )
+
+    fig.update_layout(
+        showlegend=True, height=340,
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=10, r=10, t=10, b=60),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
+    )
+    return fig
+
+
+def criar_grafico_barras(df, coluna):
+    dados = df[coluna].value_counts().head(10).reset_index()
+    dados.columns = ['Label', 'Valor']
+    dados = dados.sort_values('Valor', ascending=True)
+
+    fig = go.Figure(data=[go.Bar(
+        y=dados['Label'], x=dados['Valor'], orientation='h',
+        marker=dict(
+            color=dados['Valor'],
+            colorscale=[[0, 'rgba(197,225,165,0.9)'], [0.5, 'rgba(139,195,74,1)'], [1, 'rgba(46,125,50,1)']],
+            showscale=False, line=dict(color='white', width=2)
+        ),
+        text=[f'<b>{v:,.0f}</b>' for v in dados['Valor']],
+        textposition='outside',
+        textfont=dict(size=12, family='Inter', color='#1a1a1a')
+    )])
+
+    fig.update_layout(
+        showlegend=False, height=340,
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=140, r=60, t=10, b=30),
+        xaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)'),
+        yaxis=dict(showgrid=False)
+    )
+    return fig
+
+
+def criar_timeline_vencimentos(cal, horizonte_dias=365, granularidade='M', acumulado=False):
+    serie = serie_vencimentos(cal, horizonte_dias, granularidade, acumulado=acumulado)
+
+    if serie['QUANTIDADE'].sum() == 0:
+        return go.Figure()
+
+    coluna = 'ACUMULADO' if acumulado else 'QUANTIDADE'
+    # Rótulos só em períodos com vencimentos (a grade diária tem muitos zeros)
+    rotulos = [f'{v:,.0f}'.replace(',', '.') if v else '' for v in serie[coluna]]
+
+    fig = go.Figure(data=[go.Scatter(
+        x=serie['PERIODO'], y=serie[coluna],
+        # MELHORIA #5: Rótulos visíveis na timeline de vencimentos
+        mode='lines+markers' if granularidade == 'D' else 'lines+markers+text',
+        text=rotulos,
+        textposition='top center', fill='tozeroy',
+        fillcolor='rgba(229, 115, 115, 0.2)',
+        line=dict(color=COLORS['danger'], width=4),
+        marker=dict(size=6 if granularidade == 'D' else 10, color=COLORS['danger'], line=dict(color='white', width=2))
+    )])
+
+    fig.update_layout(
+        showlegend=False, height=340,
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=40, r=30, t=10, b=50)
+    )
+    return fig
+
+
+def criar_timeline_projetos(df_timeline, filtro_projetos=None, filtro_acoes=None, data_inicio=None, data_fim=None):
+    if df_timeline is None or df_timeline.empty:
+        return go.Figure()
+
+    df_filtrado = df_timeline.copy()
+
+    if filtro_projetos:
+        df_filtrado = df_filtrado[df_filtrado['PROJETO'].isin(filtro_projetos)]
+    if filtro_acoes:
+        df_filtrado = df_filtrado[df_filtrado['AÇÃO'].isin(filtro_acoes)]
+    if data_inicio:
+        df_filtrado = df_filtrado[df_filtrado['DATA'] >= pd.Timestamp(data_inicio)]
+    if data_fim:
+        df_filtrado = df_filtrado[df_filtrado['DATA'] <= pd.Timestamp(data_fim)]
+
+    if df_filtrado.empty:
+        return go.Figure()
+
+    fig = go.Figure()
+
+    for acao in df_filtrado['AÇÃO'].unique():
+        df_acao = df_filtrado[df_filtrado['AÇÃO'] == acao]
+        cor = CORES_ACAO.get(acao, COLORS['gray'])
+
+        fig.add_trace(go.Scatter(
+            x=df_acao['DATA'], y=df_acao['QUANTIDADE'],
+            mode='markers+text', name=acao,
+            marker=dict(size=14, color=cor, line=dict(color='white', width=2)),
+            text=df_acao['PROJETO'], textposition='top center',
+            textfont=dict(size=10, color='#1a1a1a', family='Inter'),
+            hovertemplate='<b>%{text}</b><br>%{y:,.0f} licenças<br>%{x|%d/%m/%Y}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        showlegend=True, height=500,
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=40, r=30, t=20, b=50),
+        xaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)'),
+        yaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)', title='Quantidade'),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+    )
+    return fig
+
+
+def criar_gauge_health(health_score):
+    if health_score >= 76:
+        color, status = COLORS['accent'], "Excelente"
+    elif health_score >= 51:
+        color, status = COLORS['warning'], "Atenção"
+    else:
+        color, status = COLORS['danger'], "Crítico"
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number", value=health_score,
+        title={'text': f"<b>{status}</b>", 'font': {'size': 18}},
+        number={'suffix': "%", 'font': {'size': 42, 'color': color}},
+        gauge={
+            'axis': {'range': [0, 100]},
+            'bar': {'color': color},
+            'steps': [
+                {'range': [0, 50], 'color': 'rgba(229,115,115,0.2)'},
+                {'range': [50, 75], 'color': 'rgba(255,183,77,0.2)'},
+                {'range': [75, 100], 'color': 'rgba(139,195,74,0.2)'}
+            ]
+        }
+    ))
+    fig.update_layout(height=350, paper_bgcolor='rgba(0,0,0,0)', margin=dict(l=10, r=10, t=50, b=10))
+    return fig
+
+
+def criar_top_projetos_risco(cal, horizonte_dias=30):
+    por_projeto = vencimentos_por_projeto(cal, horizonte_dias)
+    if por_projeto.empty:
+        return go.Figure()
+
+    top_risco = por_projeto.head(5).reset_index(name='Em Risco')
+    top_risco = top_risco.sort_values('Em Risco', ascending=True)
+
+    fig = go.Figure(data=[go.Bar(
+        y=top_risco['PROJETO'], x=top_risco['Em Risco'], orientation='h',
+        marker=dict(
+            color=top_risco['Em Risco'],
+            colorscale=[[0, 'rgba(255,183,77,0.8)'], [1, 'rgba(229,115,115,1)']],
+            showscale=False
+        ),
+        text=[f'<b>{v:,.0f}</b>' for v in top_risco['Em Risco']],
+        textposition='outside'
+    )])
+
+    fig.update_layout(
+        showlegend=False, height=300,
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=120, r=40, t=10, b=30)
+    )
+    return fig
@@ -0,0 +1,171 @@
+import atexit
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+CAMINHO_BANCO = Path(os.getenv("HISTORICO_CHAT_BANCO", ".historico_chat.db"))
+
+# Mensagens guardadas por usuário; as mais antigas saem a cada gravação
+RETENCAO_POR_USUARIO = int(os.getenv("HISTORICO_CHAT_RETENCAO", "200"))
+
+# Gravação em segundo plano: um lote por transação, a cada LOTE_INTERVALO s ou LOTE_MAXIMO itens
+LOTE_INTERVALO = 1.0
+LOTE_MAXIMO = 100
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS mensagens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario TEXT NOT NULL,
+    papel TEXT NOT NULL,
+    conteudo TEXT NOT NULL,
+    criado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mensagens_usuario_id ON mensagens (usuario, id);
+"""
+
+_fila = queue.Queue()
+_urgente = threading.Event()
+_gravador = None
+_lock = threading.Lock()
+
+# Operações ainda não gravadas por usuário: a leitura de um usuário só espera as dele
+_pendentes = {}
+_esperando = 0
+_condicao = threading.Condition()
+
+
+def _conectar():
+    conexao = sqlite3.connect(CAMINHO_BANCO, timeout=10)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    return conexao
+
+
+def _aplicar_retencao(conexao, usuarios):
+    for usuario in usuarios:
+        conexao.execute(
+            "DELETE FROM mensagens WHERE usuario = ? AND id <= ("
+            " SELECT id FROM mensagens WHERE usuario = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (usuario, usuario, RETENCAO_POR_USUARIO))
+
+
+def _gravar_lote(conexao, lote):
+    tocados = set()
+    with conexao:
+        for operacao, usuario, *dados in lote:
+            if operacao == 'inserir':
+                conexao.execute(
+                    "INSERT INTO mensagens (usuario, papel, conteudo, criado_em) VALUES (?, ?, ?, ?)",
+                    (usuario, *dados))
+                tocados.add(usuario)
+            else:
+                conexao.execute("DELETE FROM mensagens WHERE usuario = ?", (usuario,))
+        _aplicar_retencao(conexao, tocados)
+
+
+def _coletar_lote():
+    lote = [_fila.get()]
+    prazo = time.monotonic() + LOTE_INTERVALO
+    while len(lote) < LOTE_MAXIMO and not _urgente.is_set():
+        restante = prazo - time.monotonic()
+        if restante <= 0:
+            break
+        try:
+            lote.append(_fila.get(timeout=min(restante, 0.05)))
+        except queue.Empty:
+            pass
+    return lote
+
+
+def _laco_gravacao():
+    conexao = _conectar()
+    conexao.executescript(ESQUEMA)
+    while True:
+        lote = _coletar_lote()
+        try:
+            _gravar_lote(conexao, lote)
+        except sqlite3.Error as e:
+            # Histórico é conveniência: um lote perdido não derruba o chatbot
+            print(f"Histórico do chat: lote de {len(lote)} operações descartado ({e})", file=sys.stderr)
+        finally:
+            with _condicao:
+                for _, usuario, *_ in lote:
+                    _pendentes[usuario] -= 1
+                    if not _pendentes[usuario]:
+                        del _pendentes[usuario]
+                _condicao.notify_all()
+            for _ in lote:
+                _fila.task_done()
+
+
+def _iniciar():
+    global _gravador
+    with _lock:
+        if _gravador is None:
+            conexao = _conectar()
+            conexao.executescript(ESQUEMA)
+            conexao.close()
+            _gravador = threading.Thread(target=_laco_gravacao, name='historico-chat', daemon=True)
+            _gravador.start()
+            atexit.register(descarregar)
+
+
+def _enfileirar(operacao):
+    _iniciar()
+    with _condicao:
+        _pendentes[operacao[1]] = _pendentes.get(operacao[1], 0) + 1
+    _fila.put(operacao)
+
+
+def registrar(usuario, papel, conteudo):
+    """Enfileira uma mensagem; a gravação acontece em lote, fora da sessão"""
+    _enfileirar(('inserir', usuario, papel, str(conteudo), time.time()))
+
+
+def apagar(usuario):
+    """Remove a conversa do usuário (depois das mensagens ainda na fila)"""
+    _enfileirar(('apagar', usuario))
+
+
+def descarregar(usuario=None):
+    """Espera gravar as operações pendentes do usuário; sem usuário, a fila inteira"""
+    global _esperando
+    if _gravador is None:
+        return
+    with _condicao:
+        _esperando += 1
+        _urgente.set()
+    try:
+        if usuario is None:
+            _fila.join()
+        else:
+            with _condicao:
+                _condicao.wait_for(lambda: usuario not in _pendentes)
+    finally:
+        with _condicao:
+            _esperando -= 1
+            if not _esperando:
+                _urgente.clear()
+
+
+def carregar_recentes(usuario, limite, pular=0):
+    """Até `limite` mensagens do usuário em ordem cronológica, pulando as `pular` mais recentes.
+
+    Retorna (mensagens, total guardado). Lê pelo índice (usuario, id), do fim para o começo.
+    """
+    _iniciar()
+    descarregar(usuario)
+    conexao = _conectar()
+    try:
+        linhas = conexao.execute(
+            "SELECT papel, conteudo FROM mensagens WHERE usuario = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (usuario, limite, pular)).fetchall()
+        total = conexao.execute(
+            "SELECT count(*) FROM mensagens WHERE usuario = ?", (usuario,)).fetchone()[0]
+    finally:
+        conexao.close()
+    return [{"role": papel, "content": conteudo} for papel, conteudo in reversed(linhas)], total
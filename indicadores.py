@@ -0,0 +1,156 @@
+import pandas as pd
+
+from versao_dados import carimbar, carimbo
+
+
+def get_cache_signature(filtros_dict):
+    return (
+        tuple(sorted(filtros_dict.get('projetos', []))),
+        tuple(sorted(filtros_dict.get('operadoras', []))),
+        tuple(sorted(filtros_dict.get('status_op', []))),
+        tuple(sorted(filtros_dict.get('status_licenca', [])))
+    )
+
+
+def aplicar_filtros(df, filtros):
+    if not filtros or not any(filtros.values()):
+        return df
+    mask = pd.Series(True, index=df.index)
+    if filtros.get('projetos'):
+        mask &= df['PROJETO'].isin(filtros['projetos'])
+    if filtros.get('operadoras'):
+        mask &= df['OPERADORA'].isin(filtros['operadoras'])
+    if filtros.get('status_op'):
+        mask &= df['STATUS NA OP.'].isin(filtros['status_op'])
+    if filtros.get('status_licenca'):
+        mask &= df['STATUS_LICENCA'].isin(filtros['status_licenca'])
+    df_filtrado = df[mask]
+    origem = carimbo(df)
+    # Só um recorte direto de uma base carimbada (sem filtros anteriores) recebe a versão;
+    # o resto fica com o hash do conteúdo
+    if origem.get('versao') is not None and not origem.get('filtros'):
+        # A assinatura entra na versão dos dados: caches do chatbot distinguem cada combinação de
+        # filtros, e `filtros` permite ao motor SQL reaplicá-los direto no parquet
+        carimbar(df_filtrado, origem['versao'], assinatura_filtros=repr(get_cache_signature(filtros)),
+                 filtros={k: list(v) for k, v in filtros.items() if v})
+    return df_filtrado
+
+
+def calcular_metricas(df):
+    """KPIs do topo do dashboard (health score, válidas/expiradas, utilização)"""
+    hoje = pd.Timestamp.now().normalize()
+    df_venc = df[df['DATA DE VENCIMENTO'].notna()]
+
+    validas = int((df_venc['DATA DE VENCIMENTO'] > hoje).sum())
+    expiradas = int((df_venc['DATA DE VENCIMENTO'] <= hoje).sum())
+    total = len(df)
+
+    pct_validas = (validas / total * 100) if total > 0 else 0
+    conectadas_30d = (df['CATEGORIA_CONEXAO'] == '0-30 dias').sum() if 'CATEGORIA_CONEXAO' in df.columns else 0
+    pct_conectadas = (conectadas_30d / total * 100) if total > 0 else 0
+
+    venc_30 = df[(df['DATA DE VENCIMENTO'] > hoje) &
+                 (df['DATA DE VENCIMENTO'] <= hoje + pd.Timedelta(days=30))]
+    sem_alerta = total - len(venc_30)
+    pct_sem_alerta = (sem_alerta / total * 100) if total > 0 else 0
+
+    health_score = (pct_validas * 0.4) + (pct_conectadas * 0.3) + (pct_sem_alerta * 0.3)
+    chips_com_conexao = df['ÚLTIMA CONEXÃO'].notna().sum() if 'ÚLTIMA CONEXÃO' in df.columns else 0
+    taxa_utilizacao = (chips_com_conexao / total * 100) if total > 0 else 0
+
+    return {
+        'total': total, 'vinculadas': total, 'perc_vinculadas': 100.0,
+        'saldo': 0, 'validas': validas, 'expiradas': expiradas,
+        'health_score': round(health_score, 1),
+        'taxa_utilizacao': round(taxa_utilizacao, 1),
+        'conectadas_30d': conectadas_30d
+    }
+
+
+def calcular_entregas_por_projeto(df_chips, df_contratos):
+    """Entregas x licenças previstas e licenças funcionais, por projeto com contrato"""
+    if df_contratos is None:
+        return pd.DataFrame()
+
+    entregas = []
+
+    for projeto in df_chips['PROJETO'].unique():
+        df_proj = df_chips[df_chips['PROJETO'] == projeto]
+        total = len(df_proj)
+        contrato = df_contratos[df_contratos['PROJETO'] == projeto]
+        if contrato.empty:
+            continue
+
+        previstas = contrato['TOTAL DE LICENÇAS PREVISTAS'].values[0]
+        pct_entregue = (total / previstas * 100) if previstas > 0 else 0
+
+        claro = len(df_proj[df_proj['OPERADORA'] == 'CLARO'])
+        vivo = len(df_proj[df_proj['OPERADORA'] == 'VIVO'])
+        tim = len(df_proj[df_proj['OPERADORA'] == 'TIM'])
+        algar = len(df_proj[df_proj['OPERADORA'] == 'ALGAR'])
+
+        funcionais = len(df_proj[df_proj['STATUS NA OP.'].isin(['Ativo', 'Suspenso'])])
+        pct_funcional = (funcionais / total * 100) if total > 0 else 0
+
+        entregas.append({
+            'PROJETO': projeto,
+            'TOTAL ENTREGUES': total,
+            '% ENTREGUES': round(pct_entregue, 1),
+            'CLARO': claro,
+            'VIVO': vivo,
+            'TIM': tim,
+            'ALGAR': algar,
+            'FUNCIONAIS': funcionais,
+            '% FUNCIONAIS': round(pct_funcional, 1)
+        })
+
+    return pd.DataFrame(entregas)
+
+
+def gerar_alertas(df):
+    alertas = []
+    hoje = pd.Timestamp.now().normalize()
+
+    venc_30 = df[(df['DATA DE VENCIMENTO'] > hoje) &
+                 (df['DATA DE VENCIMENTO'] <= hoje + pd.Timedelta(days=30))]
+    if len(venc_30) > 0:
+        alertas.append(("warning", f"⚠️ {len(venc_30)} licenças vencem em 30 dias"))
+
+    if 'CATEGORIA_CONEXAO' in df.columns:
+        sem_conexao = df[df['CATEGORIA_CONEXAO'] == 'Mais de 180 dias']
+        if len(sem_conexao) > 0:
+            alertas.append(("error", f"🔴 {len(sem_conexao)} chips sem conexão há 180+ dias"))
+
+    if 'STATUS_LICENCA' in df.columns:
+        expiradas = df[df['STATUS_LICENCA'] == 'Expirado']
+        if len(expiradas) > 0:
+            alertas.append(("error", f"❌ {len(expiradas)} licenças expiradas"))
+
+    return alertas
+
+
+def gerar_alertas_contratuais(df_contratos, df_entregas):
+    if df_contratos is None:
+        return []
+
+    alertas = []
+    df = df_contratos
+
+    expirados = df[df['STATUS ATUAL DO CONTRATO'] == 'EXPIRADO']
+    if len(expirados) > 0:
+        alertas.append(("error", f"🔴 {len(expirados)} contrato(s) EXPIRADO(S)"))
+
+    expirando = df[df['STATUS ATUAL DO CONTRATO'] == 'EXPIRANDO']
+    if len(expirando) > 0:
+        alertas.append(("warning", f"⚠️ {len(expirando)} contrato(s) EXPIRANDO"))
+
+    if not df_entregas.empty:
+        baixa_entrega = df_entregas[df_entregas['% ENTREGUES'] < 80]
+        if len(baixa_entrega) > 0:
+            alertas.append(("warning", f"📉 {len(baixa_entrega)} projeto(s) com <80% de entregas"))
+
+        baixa_funcional = df_entregas[df_entregas['% FUNCIONAIS'] < 70]
+        if len(baixa_funcional) > 0:
+            alertas.append(("error", f"⚙️ {len(baixa_funcional)} projeto(s) com <70% de licenças funcionais"))
+
+    return alertas
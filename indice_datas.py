@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+
+class IndiceDatas:
+    """Datas de uma coluna em ordem, com o projeto de cada linha.
+
+    Montado uma vez por versão da base; qualquer intervalo sai por busca binária
+    (np.searchsorted) mais uma contagem só das linhas dentro dele.
+    """
+
+    def __init__(self, datas, projetos):
+        datas = pd.to_datetime(datas, errors='coerce')
+        validas = (datas.notna() & projetos.notna()).to_numpy()
+        self.sem_data = int((datas.isna() & projetos.notna()).sum())
+        codigos, self.projetos = pd.factorize(projetos[validas], sort=True)
+        valores = datas[validas].to_numpy('datetime64[ns]')
+        ordem = np.argsort(valores, kind='stable')
+        self.datas = valores[ordem]
+        self.codigos = codigos[ordem]
+        # Posição de cada data na base original, para recuperar as linhas de um intervalo
+        self.posicoes = np.flatnonzero(validas)[ordem]
+
+    def __len__(self):
+        return len(self.datas)
+
+    def _fatia(self, inicio, fim):
+        i = 0 if inicio is None else np.searchsorted(self.datas, pd.Timestamp(inicio).to_datetime64(), side='left')
+        j = len(self.datas) if fim is None else np.searchsorted(self.datas, pd.Timestamp(fim).to_datetime64(), side='right')
+        return i, max(i, j)
+
+    def contar(self, inicio=None, fim=None):
+        """Total de datas em [inicio, fim] (extremos inclusivos; None = aberto)"""
+        i, j = self._fatia(inicio, fim)
+        return j - i
+
+    def linhas(self, inicio=None, fim=None):
+        """Posições (iloc) das linhas com data em [inicio, fim]"""
+        i, j = self._fatia(inicio, fim)
+        return self.posicoes[i:j]
+
+    def por_projeto(self, inicio=None, fim=None):
+        """DataFrame por PROJETO com QTD, PRIMEIRA e ULTIMA data em [inicio, fim]"""
+        i, j = self._fatia(inicio, fim)
+        codigos = self.codigos[i:j]
+        if not len(codigos):
+            return pd.DataFrame({'QTD': pd.Series(dtype='int64'),
+                                 'PRIMEIRA': pd.Series(dtype='datetime64[ns]'),
+                                 'ULTIMA': pd.Series(dtype='datetime64[ns]')},
+                                index=pd.Index([], name='PROJETO'))
+        presentes, primeiro = np.unique(codigos, return_index=True)
+        _, ultimo = np.unique(codigos[::-1], return_index=True)
+        quantidade = np.bincount(codigos, minlength=len(self.projetos))[presentes]
+        return pd.DataFrame({
+            'QTD': quantidade.astype('int64'),
+            'PRIMEIRA': self.datas[i + primeiro],
+            'ULTIMA': self.datas[j - 1 - ultimo],
+        }, index=pd.Index(self.projetos[presentes], name='PROJETO'))
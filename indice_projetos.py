@@ -0,0 +1,158 @@
+import difflib
+import math
+from collections import deque
+
+STOPWORDS = {'RESUMO', 'DO', 'DA', 'DE', 'DOS', 'DAS', 'PROJETO', 'COMPLETO',
+             'FAÇA', 'FACA', 'UM', 'UMA', 'O', 'A', 'ME', 'DÊ', 'SOBRE',
+             'PARA', 'NO', 'NA', 'EM', 'COM', 'POR', 'SEM', 'ATE', 'ATÉ',
+             'VENCEM', 'VENCIMENTO', 'QUAIS', 'QUANTOS', 'DIAS'}
+
+CORTE_FUZZY = 0.85
+PONTUACAO = '?!.,;:"\'()'
+
+
+class AutomatoAhoCorasick:
+    """Busca todos os padrões de uma vez em tempo linear no tamanho do texto"""
+
+    def __init__(self, padroes):
+        self.transicoes = [{}]
+        self.falha = [0]
+        self.saidas = [[]]
+
+        for indice, padrao in enumerate(padroes):
+            estado = 0
+            for caractere in padrao:
+                proximo = self.transicoes[estado].get(caractere)
+                if proximo is None:
+                    proximo = len(self.transicoes)
+                    self.transicoes[estado][caractere] = proximo
+                    self.transicoes.append({})
+                    self.falha.append(0)
+                    self.saidas.append([])
+                estado = proximo
+            self.saidas[estado].append((indice, len(padrao)))
+
+        fila = deque(self.transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for caractere, proximo in self.transicoes[estado].items():
+                fila.append(proximo)
+                f = self.falha[estado]
+                while f and caractere not in self.transicoes[f]:
+                    f = self.falha[f]
+                destino = self.transicoes[f].get(caractere, 0)
+                self.falha[proximo] = destino if destino != proximo else 0
+                self.saidas[proximo] = self.saidas[proximo] + self.saidas[self.falha[proximo]]
+
+    def buscar(self, texto):
+        """Gera (índice do padrão, posição inicial) para cada ocorrência"""
+        estado = 0
+        for posicao, caractere in enumerate(texto):
+            while estado and caractere not in self.transicoes[estado]:
+                estado = self.falha[estado]
+            estado = self.transicoes[estado].get(caractere, 0)
+            for indice, tamanho in self.saidas[estado]:
+                yield indice, posicao - tamanho + 1
+
+
+def _eh_palavra(caractere):
+    return caractere.isalnum() or caractere == '_'
+
+
+def _janela_comprimentos(tamanho, corte=CORTE_FUZZY):
+    """Comprimentos com que `tamanho` ainda alcança o corte (ratio <= 2*min/soma)"""
+    return range(math.ceil(tamanho * corte / (2 - corte) - 1e-9), math.floor(tamanho * (2 - corte) / corte + 1e-9) + 1)
+
+
+def construir_indice_projetos(projetos):
+    """Índice dos nomes de projeto (na ordem em que aparecem na base)"""
+    projetos = [p for p in projetos if isinstance(p, str)]
+    maiusculos = [p.upper() for p in projetos]
+
+    exato, tokens = {}, {}
+    for i, nome in enumerate(maiusculos):
+        exato.setdefault(nome, i)
+        for token in nome.split():
+            if token not in STOPWORDS and len(token) >= 3:
+                tokens.setdefault(token, i)
+
+    # Palavra da pergunta não tem espaço: só pode estar dentro de um trecho sem espaço
+    # de um nome. Todo pedaço (3+ caracteres) desses trechos -> primeiro projeto que o contém
+    trechos = {}
+    for i, nome in enumerate(maiusculos):
+        for trecho in nome.split():
+            for inicio in range(len(trecho) - 2):
+                for fim in range(inicio + 3, len(trecho) + 1):
+                    trechos.setdefault(trecho[inicio:fim], i)
+
+    # Com ratio >= CORTE_FUZZY duas palavras dividem ao menos um bigrama
+    bigramas = {}
+    for token in tokens:
+        for inicio in range(len(token) - 1):
+            bigramas.setdefault((token[inicio:inicio + 2], len(token)), set()).add(token)
+
+    return {
+        'projetos': projetos,
+        'exato': exato,
+        'tokens': tokens,
+        'automato': AutomatoAhoCorasick(maiusculos),
+        'trechos': trechos,
+        'bigramas': bigramas,
+    }
+
+
+def detectar_projeto(indice, pergunta, fuzzy=False):
+    """Mesma precedência da detecção original: exato, nome completo, palavra-chave, reverso"""
+    projetos = indice['projetos']
+    if not projetos:
+        return None
+
+    pergunta_upper = pergunta.strip().upper()
+    palavras_filtradas = [p for p in pergunta_upper.split() if p not in STOPWORDS and len(p) > 1]
+    texto_limpo = ' '.join(palavras_filtradas)
+
+    # 1. MATCH EXATO
+    candidatos = [indice['exato'][t] for t in (texto_limpo, pergunta_upper) if t in indice['exato']]
+    if candidatos:
+        return projetos[min(candidatos)]
+
+    # 2. MATCH COMPLETO (nomes de até 2 letras só como palavra inteira)
+    melhor = None
+    for i, inicio in indice['automato'].buscar(pergunta_upper):
+        if melhor is not None and i >= melhor:
+            continue
+        if len(projetos[i]) <= 2:
+            fim = inicio + len(projetos[i])
+            if (inicio > 0 and _eh_palavra(pergunta_upper[inicio - 1])) or \
+               (fim < len(pergunta_upper) and _eh_palavra(pergunta_upper[fim])):
+                continue
+        melhor = i
+    if melhor is not None:
+        return projetos[melhor]
+
+    # 3. MATCH POR PALAVRA-CHAVE (sem a pontuação colada: "ARACAJU?" -> "ARACAJU")
+    palavras_significativas = [p for p in (p.strip(PONTUACAO) for p in palavras_filtradas) if len(p) >= 3]
+    for palavra in palavras_significativas:
+        if palavra in indice['trechos']:
+            return projetos[indice['trechos'][palavra]]
+
+    # 4. MATCH REVERSO
+    candidatos = [indice['tokens'][p] for p in palavras_significativas if p in indice['tokens']]
+    if candidatos:
+        return projetos[min(candidatos)]
+
+    # 5. APROXIMADO (erros de digitação)
+    if fuzzy:
+        for palavra in palavras_significativas:
+            if len(palavra) < 4:
+                continue
+            # Só os tokens de comprimento compatível que dividem um bigrama com a palavra
+            vocabulario = set()
+            for comprimento in _janela_comprimentos(len(palavra)):
+                for inicio in range(len(palavra) - 1):
+                    vocabulario |= indice['bigramas'].get((palavra[inicio:inicio + 2], comprimento), set())
+            parecidas = difflib.get_close_matches(palavra, sorted(vocabulario), n=1, cutoff=CORTE_FUZZY)
+            if parecidas:
+                return projetos[indice['tokens'][parecidas[0]]]
+
+    return None
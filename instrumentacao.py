@@ -0,0 +1,218 @@
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Pasta lida pelo textfile collector do node_exporter; vazia = não exporta
+METRICAS_DIR = os.getenv("METRICAS_PROMETHEUS_DIR", "")
+
+# Segundos mínimos entre duas gravações do .prom (cada rerun acumula, o arquivo não precisa acompanhar)
+METRICAS_INTERVALO = 10.0
+
+PREFIXO = "basemobile"
+
+_local = threading.local()
+_lock = threading.Lock()
+_totais = {}
+_reruns = {'execucoes': 0, 'interrompidos': 0, 'segundos': 0.0}
+_gravado_em = 0.0
+
+
+def tamanho_resultado(valor):
+    """(tamanho, unidade): linhas de DataFrame, pontos de figura, bytes de texto ou itens de lista"""
+    if valor is None:
+        return None, None
+    if hasattr(valor, 'shape'):
+        return len(valor), 'linhas'
+    if hasattr(valor, 'data') and hasattr(valor, 'layout'):
+        pontos = 0
+        for traco in valor.data:
+            serie = next((s for s in (getattr(traco, 'x', None), getattr(traco, 'values', None)) if s is not None), None)
+            pontos += len(serie) if serie is not None else 1
+        return pontos, 'pontos'
+    if isinstance(valor, str):
+        return len(valor.encode('utf-8')), 'bytes'
+    if isinstance(valor, (list, tuple, dict)):
+        return len(valor), 'itens'
+    return None, None
+
+
+class Etapa:
+    __slots__ = ('nome', 'ms', 'fim_ms', 'cache', 'tamanho', 'unidade')
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.ms = self.fim_ms = None
+        self.cache = self.tamanho = self.unidade = None
+
+    def resultado(self, valor):
+        """Anota o tamanho de `valor` e o devolve"""
+        self.tamanho, self.unidade = tamanho_resultado(valor)
+        return valor
+
+
+class MedicaoRerun:
+    """Etapas de um rerun do app (tempo, cache e tamanho), em ordem de término.
+
+    Etapas podem terminar em threads do pool de gráficos; `concluir` soma o
+    rerun aos totais do processo, que vão para o painel e para o Prometheus.
+    """
+
+    def __init__(self, pagina=None):
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self.etapas = []
+        self.total_ms = None
+        self.interrompida = False
+        self._lock = threading.Lock()
+
+    @property
+    def concluida(self):
+        return self.total_ms is not None
+
+    @contextmanager
+    def etapa(self, nome, cacheavel=False):
+        registro = Etapa(nome)
+        anterior = getattr(_local, 'etapa', None)
+        _local.etapa = registro
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            _local.etapa = anterior
+            fim = time.perf_counter()
+            registro.ms = (fim - inicio) * 1000
+            registro.fim_ms = (fim - self.inicio) * 1000
+            if cacheavel and registro.cache is None:
+                # O corpo da função cacheada marca 'miss'; sem marca, o cache respondeu
+                registro.cache = 'hit'
+            with self._lock:
+                self.etapas.append(registro)
+
+    def concluir(self, interrompida=False):
+        """Fecha o rerun; interrompido (st.rerun/st.stop) vale até o fim da última etapa"""
+        if self.concluida:
+            return
+        if interrompida:
+            self.total_ms = max((e.fim_ms for e in self.etapas), default=0.0)
+        else:
+            self.total_ms = (time.perf_counter() - self.inicio) * 1000
+        self.interrompida = interrompida
+        with _lock:
+            _reruns['execucoes'] += 1
+            _reruns['interrompidos'] += interrompida
+            _reruns['segundos'] += self.total_ms / 1000
+            for e in self.etapas:
+                total = _totais.setdefault(e.nome, {'execucoes': 0, 'segundos': 0.0, 'hit': 0, 'miss': 0,
+                                                    'tamanho': None, 'unidade': None})
+                total['execucoes'] += 1
+                total['segundos'] += e.ms / 1000
+                if e.cache:
+                    total[e.cache] += 1
+                if e.tamanho is not None:
+                    total['tamanho'], total['unidade'] = e.tamanho, e.unidade
+
+
+def iniciar(pagina=None):
+    """Medição do rerun que roda nesta thread; etapa() sem medição explícita cai nela"""
+    _local.medicao = MedicaoRerun(pagina)
+    return _local.medicao
+
+
+def etapa(nome, cacheavel=False):
+    """Etapa na medição desta thread (fora de um rerun, só cronometra)"""
+    medicao = getattr(_local, 'medicao', None) or MedicaoRerun()
+    return medicao.etapa(nome, cacheavel)
+
+
+def marcar_cache(resultado):
+    """Marca a etapa em andamento nesta thread como 'hit' ou 'miss'; um miss prevalece"""
+    registro = getattr(_local, 'etapa', None)
+    if registro is not None and registro.cache != 'miss':
+        registro.cache = resultado
+
+
+def totais():
+    """Cópia dos totais do processo: ({etapa: {...}}, reruns)"""
+    with _lock:
+        return {nome: dict(t) for nome, t in _totais.items()}, dict(_reruns)
+
+
+def _rotulos(**rotulos):
+    def escapar(valor):
+        return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escapar(v)}"' for k, v in rotulos.items() if v is not None) + '}'
+
+
+def texto_prometheus(processo=None):
+    """Totais do processo no formato de texto do Prometheus (0.0.4)"""
+    etapas, reruns = totais()
+    p = _rotulos(processo=processo)
+    linhas = [
+        f"# HELP {PREFIXO}_rerun_segundos Tempo total dos reruns do app.",
+        f"# TYPE {PREFIXO}_rerun_segundos summary",
+        f"{PREFIXO}_rerun_segundos_sum{p} {reruns['segundos']:.6f}",
+        f"{PREFIXO}_rerun_segundos_count{p} {reruns['execucoes']}",
+        f"# HELP {PREFIXO}_reruns_interrompidos_total Reruns cortados por st.rerun ou st.stop.",
+        f"# TYPE {PREFIXO}_reruns_interrompidos_total counter",
+        f"{PREFIXO}_reruns_interrompidos_total{p} {reruns['interrompidos']}",
+        f"# HELP {PREFIXO}_etapa_segundos Tempo por etapa do rerun.",
+        f"# TYPE {PREFIXO}_etapa_segundos summary",
+    ]
+    for nome, t in sorted(etapas.items()):
+        r = _rotulos(etapa=nome, processo=processo)
+        linhas.append(f"{PREFIXO}_etapa_segundos_sum{r} {t['segundos']:.6f}")
+        linhas.append(f"{PREFIXO}_etapa_segundos_count{r} {t['execucoes']}")
+    linhas += [f"# HELP {PREFIXO}_etapa_cache_total Consultas ao cache por etapa e resultado.",
+               f"# TYPE {PREFIXO}_etapa_cache_total counter"]
+    for nome, t in sorted(etapas.items()):
+        for resultado in ('hit', 'miss'):
+            if t['hit'] or t['miss']:
+                linhas.append(f"{PREFIXO}_etapa_cache_total{_rotulos(etapa=nome, resultado=resultado, processo=processo)} "
+                              f"{t[resultado]}")
+    linhas += [f"# HELP {PREFIXO}_etapa_tamanho Tamanho do último resultado da etapa.",
+               f"# TYPE {PREFIXO}_etapa_tamanho gauge"]
+    for nome, t in sorted(etapas.items()):
+        if t['tamanho'] is not None:
+            linhas.append(f"{PREFIXO}_etapa_tamanho{_rotulos(etapa=nome, unidade=t['unidade'], processo=processo)} "
+                          f"{t['tamanho']}")
+    return "\n".join(linhas) + "\n"
+
+
+def exportar_prometheus(processo, forcar=False):
+    """Grava METRICAS_DIR/basemobile_<processo>.prom (troca atômica), no máximo a cada METRICAS_INTERVALO"""
+    global _gravado_em
+    if not METRICAS_DIR:
+        return None
+    agora = time.monotonic()
+    with _lock:
+        if not forcar and agora - _gravado_em < METRICAS_INTERVALO:
+            return None
+        _gravado_em = agora
+    pasta = Path(METRICAS_DIR)
+    pasta.mkdir(parents=True, exist_ok=True)
+    caminho = pasta / f"{PREFIXO}_{re.sub(r'[^A-Za-z0-9_.-]', '_', str(processo))}.prom"
+    temporario = caminho.with_name(f".{caminho.name}.{os.getpid()}.tmp")
+    temporario.write_text(texto_prometheus(processo), encoding='utf-8')
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def juntar_textos_prometheus(textos):
+    """Junta os textos de vários processos agrupando cada métrica (o formato não aceita famílias repetidas)"""
+    familias = {}
+    for texto in textos:
+        atual = None
+        for linha in texto.splitlines():
+            if linha.startswith('# HELP ') or linha.startswith('# TYPE '):
+                atual = linha.split()[2]
+                cabecalho = familias.setdefault(atual, {'HELP': None, 'TYPE': None, 'amostras': []})
+                cabecalho[linha.split()[1]] = linha
+            elif linha.strip() and atual is not None:
+                familias[atual]['amostras'].append(linha)
+    linhas = []
+    for familia in familias.values():
+        linhas += [l for l in (familia['HELP'], familia['TYPE']) if l] + familia['amostras']
+    return "\n".join(linhas) + "\n" if linhas else ""
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from chatbot_pplx import formatar_numero, processar_pergunta
+from dados import carregar_dados_gerenciais, carregar_mapeamento
+from versao_dados import versao_dataset
+
+# Perguntas respondidas ao mesmo tempo; as respostas pesadas ainda passam por LIMITE_RESPOSTAS_PESADAS
+LOTE_TRABALHADORES = int(os.getenv("LOTE_TRABALHADORES", "4"))
+
+
+class _DestinoSilencioso:
+    """Faz o papel do st.empty fora do app: do LLM só interessa o texto final"""
+
+    def markdown(self, texto):
+        pass
+
+
+def ler_perguntas(caminho):
+    """Perguntas de um .txt (uma por linha, # comenta) ou .json/.jsonl (textos ou objetos com "pergunta")"""
+    caminho = Path(caminho)
+    texto = caminho.read_text(encoding='utf-8')
+    if caminho.suffix == '.json':
+        itens = json.loads(texto)
+    elif caminho.suffix == '.jsonl':
+        itens = [json.loads(linha) for linha in texto.splitlines() if linha.strip()]
+    else:
+        itens = [linha.strip() for linha in texto.splitlines() if linha.strip() and not linha.lstrip().startswith('#')]
+    return [item['pergunta'] if isinstance(item, dict) else str(item) for item in itens]
+
+
+def responder_lote(perguntas, df, dfcontratos=None, dftimeline=None, trabalhadores=None, usar_llm=False):
+    """Responde todas as perguntas sobre a mesma base, em paralelo.
+
+    As threads compartilham os índices e caches do chatbot: a primeira pergunta
+    que precisa de uma estrutura a monta e as outras esperam por ela. Sem
+    `usar_llm`, perguntas fora das intenções recebem as sugestões de sempre.
+    Retorna, na ordem das perguntas, [{pergunta, resposta, ms, erro}].
+    """
+    destino = _DestinoSilencioso() if usar_llm else None
+
+    def responder(pergunta):
+        inicio = time.perf_counter()
+        try:
+            resposta, erro = processar_pergunta(df, pergunta, dfcontratos, dftimeline, destino=destino), None
+        except Exception as e:
+            resposta, erro = None, f"{type(e).__name__}: {e}"
+        return {'pergunta': pergunta, 'resposta': resposta,
+                'ms': round((time.perf_counter() - inicio) * 1000, 1), 'erro': erro}
+
+    with ThreadPoolExecutor(max_workers=trabalhadores or LOTE_TRABALHADORES, thread_name_prefix='lote') as pool:
+        return list(pool.map(responder, perguntas))
+
+
+def gerar_digest(resultados, df):
+    """Relatório Markdown com todas as perguntas e respostas"""
+    linhas = [f"# 💬 Perguntas e Respostas — {datetime.now().strftime('%d/%m/%Y %H:%M')}\n",
+              f"**Base:** {formatar_numero(len(df))} chips (versão `{versao_dataset(df)}`)  ",
+              f"**Perguntas:** {len(resultados)}\n"]
+    for resultado in resultados:
+        linhas.append("---\n")
+        linhas.append(f"**❓ {resultado['pergunta']}**\n")
+        linhas.append(resultado['resposta'] if resultado['erro'] is None else f"❌ Erro: {resultado['erro']}")
+        linhas.append("")
+    return "\n".join(linhas)
+
+
+def gravar_resultados(resultados, df, caminho, formato=None):
+    """Grava em JSONL (uma resposta por linha) ou Markdown; o formato sai da extensão"""
+    caminho = Path(caminho)
+    formato = formato or ('md' if caminho.suffix == '.md' else 'jsonl')
+    if formato == 'md':
+        caminho.write_text(gerar_digest(resultados, df), encoding='utf-8')
+    else:
+        with caminho.open('w', encoding='utf-8') as arquivo:
+            for resultado in resultados:
+                arquivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+
+def comparar_com_referencia(resultados, caminho):
+    """Perguntas cuja resposta mudou em relação a um JSONL gravado antes: [(pergunta, antes, agora)]"""
+    referencia = {}
+    with Path(caminho).open(encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                item = json.loads(linha)
+                referencia[item['pergunta']] = item.get('resposta')
+    return [(r['pergunta'], referencia[r['pergunta']], r['resposta'])
+            for r in resultados
+            if r['pergunta'] in referencia and referencia[r['pergunta']] != r['resposta']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Responde perguntas ao chatbot em lote, sem a interface (digest noturno, regressão).")
+    parser.add_argument('perguntas', nargs='*', help="perguntas (além das do --arquivo)")
+    parser.add_argument('-a', '--arquivo', help=".txt (uma por linha), .json ou .jsonl com perguntas")
+    parser.add_argument('-s', '--saida', help="arquivo de saída .jsonl ou .md (padrão: JSONL na saída padrão)")
+    parser.add_argument('-r', '--referencia', help="JSONL de uma execução anterior para comparar respostas")
+    parser.add_argument('-p', '--pasta', default='.', help="pasta com as planilhas (padrão: atual)")
+    parser.add_argument('-t', '--trabalhadores', type=int, default=LOTE_TRABALHADORES)
+    parser.add_argument('--llm', action='store_true', help="usar o LLM para perguntas fora das intenções")
+    args = parser.parse_args(argv)
+
+    # Caminhos do usuário valem a partir da pasta atual, antes de entrar na pasta dos dados
+    perguntas = ler_perguntas(args.arquivo) if args.arquivo else []
+    perguntas += args.perguntas
+    if not perguntas:
+        parser.error("nenhuma pergunta informada")
+    saida = Path(args.saida).resolve() if args.saida else None
+    referencia = Path(args.referencia).resolve() if args.referencia else None
+    os.chdir(args.pasta)
+
+    df, _ = carregar_mapeamento()
+    if df.empty:
+        print("❌ Base não encontrada (MAPEAMENTO DE CHIPS.xlsx)", file=sys.stderr)
+        return 2
+    dfcontratos, dftimeline = carregar_dados_gerenciais()
+
+    inicio = time.perf_counter()
+    resultados = responder_lote(perguntas, df, dfcontratos, dftimeline, args.trabalhadores, args.llm)
+    duracao = time.perf_counter() - inicio
+
+    if saida:
+        gravar_resultados(resultados, df, saida)
+    else:
+        for resultado in resultados:
+            print(json.dumps(resultado, ensure_ascii=False))
+
+    erros = [r for r in resultados if r['erro'] is not None]
+    print(f"{len(resultados)} pergunta(s) em {duracao:.2f}s, {len(erros)} erro(s)", file=sys.stderr)
+    for resultado in erros:
+        print(f"  ERRO  {resultado['pergunta']!r}: {resultado['erro']}", file=sys.stderr)
+
+    divergencias = comparar_com_referencia(resultados, referencia) if referencia else []
+    for pergunta, _, _ in divergencias:
+        print(f"  MUDOU {pergunta!r}", file=sys.stderr)
+    return 1 if erros or divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
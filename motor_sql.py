@@ -0,0 +1,100 @@
+import threading
+from pathlib import Path
+
+import duckdb
+
+from versao_dados import carimbo, carimbo_arquivo
+
+CAMINHO_PARQUET = Path(".cache_mapeamento.parquet")
+CAMINHO_EXCEL = Path("MAPEAMENTO DE CHIPS.xlsx")
+
+# Chave de aplicar_filtros -> coluna da base
+COLUNAS_FILTRO = {
+    'projetos': 'PROJETO',
+    'operadoras': 'OPERADORA',
+    'status_op': 'STATUS NA OP.',
+    'status_licenca': 'STATUS_LICENCA',
+}
+
+_conexao = None
+_lock = threading.Lock()
+
+
+def obter_conexao():
+    """Banco DuckDB em memória do processo; cada consulta usa o próprio cursor"""
+    global _conexao
+    with _lock:
+        if _conexao is None:
+            _conexao = duckdb.connect(":memory:")
+        return _conexao
+
+
+def ident(coluna):
+    """Nome de coluna como identificador SQL ("DATA DE VENCIMENTO", "STATUS NA OP.")"""
+    return '"' + str(coluna).replace('"', '""') + '"'
+
+
+def _origem_parquet(df):
+    """CTE que lê a base direto do parquet de cache, com os filtros ativos como predicados.
+
+    Só vale quando o DataFrame é a base carregada do Excel atual (ou um recorte dela
+    por aplicar_filtros), carimbado por eles, e o parquet foi gravado depois do Excel.
+    """
+    attrs = carimbo(df)
+    versao = attrs.get('versao')
+    try:
+        if versao is None or versao != carimbo_arquivo(CAMINHO_EXCEL):
+            return None
+        if CAMINHO_PARQUET.stat().st_mtime < CAMINHO_EXCEL.stat().st_mtime:
+            return None
+    except OSError:
+        return None
+
+    filtros = attrs.get('filtros', {})
+    if any(chave not in COLUNAS_FILTRO for chave in filtros):
+        return None
+
+    condicoes, parametros = [], {}
+    for chave, valores in filtros.items():
+        condicoes.append(f"list_contains($filtro_{chave}, {ident(COLUNAS_FILTRO[chave])})")
+        parametros[f"filtro_{chave}"] = list(valores)
+
+    caminho = str(CAMINHO_PARQUET.resolve()).replace("'", "''")
+    cte = f"chips AS (SELECT * FROM read_parquet('{caminho}')"
+    if condicoes:
+        cte += " WHERE " + " AND ".join(condicoes)
+    return cte + ")", parametros
+
+
+def _com_cte(sql, cte):
+    corpo = sql.lstrip()
+    if corpo[:4].upper() == "WITH":
+        return f"WITH {cte}, {corpo[4:]}"
+    return f"WITH {cte} {corpo}"
+
+
+def consultar(sql, parametros=None, chips=None, usar_parquet=True, **tabelas):
+    """Executa uma consulta só-leitura e devolve um DataFrame.
+
+    `chips` (a base do chatbot) e os demais DataFrames nomeados (contratos=...,
+    timeline=...) ficam acessíveis pelo nome na consulta. A base é lida do parquet
+    de cache quando possível; senão o próprio DataFrame é varrido sem cópia.
+    Parâmetros nomeados: $hoje, $projeto...
+    """
+    parametros = dict(parametros or {})
+    cursor = obter_conexao().cursor()
+    try:
+        if chips is not None:
+            origem = _origem_parquet(chips) if usar_parquet else None
+            if origem is not None:
+                cte, extras = origem
+                sql = _com_cte(sql, cte)
+                parametros.update(extras)
+            else:
+                cursor.register("chips", chips)
+        for nome, frame in tabelas.items():
+            if frame is not None:
+                cursor.register(nome, frame)
+        return cursor.execute(sql, parametros).df()
+    finally:
+        cursor.close()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+COLUNAS_NAVEGADOR = [
+    'ICCID', 'PROJETO', 'OPERADORA', 'STATUS NA OP.', 'STATUS_LICENCA',
+    'DATA DE ENTREGA', 'DATA DE ATIVAÇÃO', 'DATA DE VENCIMENTO', 'ÚLTIMA CONEXÃO', 'CATEGORIA_CONEXAO'
+]
+COLUNAS_DATA = ['DATA DE ENTREGA', 'DATA DE ATIVAÇÃO', 'DATA DE VENCIMENTO', 'ÚLTIMA CONEXÃO']
+
+
+def colunas_disponiveis(df):
+    return [c for c in COLUNAS_NAVEGADOR if c in df.columns]
+
+
+def ordenar_posicoes(df, coluna=None, ascendente=True, busca=None):
+    """Posições (iloc) das linhas na ordem pedida, já filtradas pela busca de ICCID"""
+    posicoes = np.arange(len(df))
+
+    if busca and 'ICCID' in df.columns:
+        achados = df['ICCID'].astype(str).str.contains(busca.strip(), regex=False, na=False).to_numpy()
+        posicoes = posicoes[achados]
+
+    if coluna and coluna in df.columns and len(posicoes) > 1:
+        valores = df[coluna].iloc[posicoes].reset_index(drop=True)
+        ordem = valores.sort_values(ascending=ascendente, na_position='last', kind='stable').index.to_numpy()
+        posicoes = posicoes[ordem]
+
+    return posicoes
+
+
+def total_paginas(n_linhas, tamanho):
+    return max(1, -(-n_linhas // tamanho))
+
+
+def obter_pagina(df, posicoes, pagina, tamanho):
+    """Só as linhas da página visível, com datas formatadas para exibição"""
+    inicio = (pagina - 1) * tamanho
+    colunas = colunas_disponiveis(df)
+    pagina_df = df.iloc[posicoes[inicio:inicio + tamanho]][colunas].copy()
+
+    for coluna in COLUNAS_DATA:
+        if coluna in pagina_df.columns:
+            datas = pd.to_datetime(pagina_df[coluna], errors='coerce')
+            pagina_df[coluna] = datas.dt.strftime('%d/%m/%Y').fillna('-')
+
+    return pagina_df
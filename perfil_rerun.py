@@ -0,0 +1,90 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Capturas do profiler: .prof (pstats completo), .txt (hotspots) e .json (contexto)
+PERFIL_DIR = os.getenv("PERFIL_DIR", "perfis")
+PERFIL_TOP_N = int(os.getenv("PERFIL_TOP_N", "40"))
+
+_local = threading.local()
+
+
+def ativo():
+    """True enquanto esta thread roda um rerun sob o profiler (evita perfilar de novo dentro dele)"""
+    return getattr(_local, 'ativo', False)
+
+
+def hotspots(estatisticas, top_n=PERFIL_TOP_N):
+    """Funções com mais tempo próprio: [{funcao, arquivo, linha, chamadas, proprio_ms, acumulado_ms}]"""
+    linhas = sorted(estatisticas.stats.items(), key=lambda item: item[1][2], reverse=True)[:top_n]
+    return [{'funcao': funcao, 'arquivo': arquivo, 'linha': linha, 'chamadas': nc,
+             'proprio_ms': round(tt * 1000, 3), 'acumulado_ms': round(ct * 1000, 3)}
+            for (arquivo, linha, funcao), (cc, nc, tt, ct, _) in linhas]
+
+
+def _relatorio_texto(estatisticas, top_n):
+    saida = io.StringIO()
+    estatisticas.stream = saida
+    for ordem in ('cumulative', 'tottime'):
+        saida.write(f"===== top {top_n} por {ordem} =====\n")
+        estatisticas.sort_stats(ordem).print_stats(top_n)
+    return saida.getvalue()
+
+
+def gravar(perfil, contexto, pasta=PERFIL_DIR, top_n=PERFIL_TOP_N):
+    """Grava a captura e devolve o contexto completo (com os caminhos e os hotspots)"""
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    nome = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{contexto.get('pagina') or 'app'}"
+    estatisticas = pstats.Stats(perfil)
+
+    perfil.dump_stats(str(pasta / f"{nome}.prof"))
+    (pasta / f"{nome}.txt").write_text(_relatorio_texto(estatisticas, top_n), encoding='utf-8')
+    contexto = {**contexto, 'arquivo_prof': f"{nome}.prof", 'arquivo_txt': f"{nome}.txt",
+                'hotspots': hotspots(estatisticas, top_n)}
+    (pasta / f"{nome}.json").write_text(json.dumps(contexto, indent=2, ensure_ascii=False, default=str),
+                                        encoding='utf-8')
+    return contexto
+
+
+def executar_perfilado(caminho_script, globais, contexto, pasta=PERFIL_DIR, top_n=PERFIL_TOP_N):
+    """Roda o script de novo, nos mesmos globais, sob o cProfile, e grava a captura.
+
+    `contexto()` é chamado no fim, para registrar o estado que o rerun deixou
+    (filtros, versão dos dados). Exceções do script, inclusive as de controle
+    do Streamlit (st.rerun, st.stop), são gravadas em `encerrado_por` e repassadas.
+    """
+    codigo = compile(Path(caminho_script).read_text(encoding='utf-8'), caminho_script, 'exec')
+    perfil = cProfile.Profile()
+    encerrado_por = None
+    _local.ativo = True
+    inicio = time.perf_counter()
+    try:
+        perfil.runctx(codigo, globais, globais)
+    except BaseException as e:
+        encerrado_por = type(e).__name__
+        raise
+    finally:
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        _local.ativo = False
+        gravar(perfil, {'capturado_em': datetime.now().isoformat(timespec='seconds'),
+                        'duracao_ms': round(duracao_ms, 1), 'encerrado_por': encerrado_por,
+                        **contexto()}, pasta, top_n)
+
+
+def capturas_recentes(quantidade=10, pasta=PERFIL_DIR):
+    """Contextos das últimas capturas gravadas, da mais nova para a mais antiga"""
+    arquivos = sorted(Path(pasta).glob("*.json"), reverse=True)[:quantidade]
+    capturas = []
+    for arquivo in arquivos:
+        try:
+            capturas.append(json.loads(arquivo.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return capturas
@@ -0,0 +1,160 @@
+import hashlib
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent
+DIR_ASSETS = RAIZ / "assets"
+DIR_STATIC = RAIZ / "static"
+DIR_EXPORTS = DIR_STATIC / "exports"
+URL_STATIC = "app/static"
+
+# Teto das exportações no /app/static; para o resto do static vale o limite de 200 MB do Streamlit
+TAMANHO_MAXIMO_EXPORTACAO = int(os.getenv("EXPORTACAO_TAMANHO_MAXIMO_MB", "4096")) * 1024 * 1024
+
+# Nome lógico -> arquivos de origem (primeiro que existir)
+LOGOS = {
+    "img/BM-Icone.png": ["BM-Icone.png", "BM Ícone.png"],
+    "img/BASE-MOBILE-Fundo-Transparente.png": ["BASE-MOBILE-Fundo-Transparente.png"],
+}
+
+FONTE_FAMILIA = "Inter"
+
+# O handler de static do Streamlit 1.30 só entrega imagens com Content-Type real;
+# o resto sai como text/plain + nosniff e o navegador recusa CSS assim.
+EXTENSOES_LIBERADAS = {
+    ".css": "text/css", ".woff2": "font/woff2", ".woff": "font/woff",
+    ".csv": "text/csv", ".parquet": "application/vnd.apache.parquet",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def registrar_tipos_mime():
+    for ext, mime in EXTENSOES_LIBERADAS.items():
+        mimetypes.add_type(mime, ext)
+
+
+def liberar_tipos_estaticos():
+    """Permite servir CSS, fontes e exportações pelo /app/static com o MIME correto"""
+    try:
+        from streamlit.web.server import app_static_file_handler as handler
+    except ImportError:
+        return False
+
+    registrar_tipos_mime()
+
+    atuais = tuple(handler.SAFE_APP_STATIC_FILE_EXTENSIONS)
+    handler.SAFE_APP_STATIC_FILE_EXTENSIONS = atuais + tuple(
+        ext for ext in EXTENSOES_LIBERADAS if ext not in atuais)
+    _liberar_exportacoes_grandes(handler.AppStaticFileHandler)
+    return True
+
+
+def exportacao_servivel(caminho):
+    """Se o arquivo exportado cabe no teto do /app/static"""
+    return os.path.getsize(caminho) <= TAMANHO_MAXIMO_EXPORTACAO
+
+
+def _liberar_exportacoes_grandes(classe):
+    """Exportações passam dos 200 MB; o StaticFileHandler do tornado já as entrega em blocos de 64 KB"""
+    if getattr(classe, "_validar_original", None):
+        return
+    original = classe._validar_original = classe.validate_absolute_path
+    base = classe.__mro__[1].validate_absolute_path
+
+    def validar(self, root, absolute_path):
+        real = os.path.realpath(absolute_path)
+        if (os.path.isfile(real) and Path(real).is_relative_to(DIR_EXPORTS.resolve())
+                and exportacao_servivel(real)):
+            # Sem o teto do Streamlit; a checagem de raiz do tornado continua valendo
+            return base(self, root, absolute_path)
+        return original(self, root, absolute_path)
+
+    classe.validate_absolute_path = validar
+
+
+def _hash(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()[:10]
+
+
+def _publicar(conteudo, nome_logico):
+    """Grava em static/ com o hash do conteúdo no nome e devolve a URL relativa"""
+    pasta, nome = os.path.split(nome_logico)
+    base, ext = os.path.splitext(nome)
+    h = _hash(conteudo)
+
+    destino_dir = DIR_STATIC / pasta
+    destino_dir.mkdir(parents=True, exist_ok=True)
+    destino = destino_dir / f"{base}.{h}{ext}"
+
+    # Remove versões antigas do mesmo arquivo
+    padrao = re.compile(re.escape(base) + r"\.[0-9a-f]{10}" + re.escape(ext) + "$")
+    for antigo in destino_dir.iterdir():
+        if antigo != destino and padrao.match(antigo.name):
+            try:
+                antigo.unlink()
+            except OSError:
+                pass
+
+    if not destino.exists():
+        tmp = destino.with_name(destino.name + f".{os.getpid()}.tmp")
+        tmp.write_bytes(conteudo)
+        os.replace(tmp, destino)
+
+    # ?v= faz o tornado responder com Cache-Control de longa duração
+    return f"{URL_STATIC}/{pasta}/{destino.name}?v={h}"
+
+
+def _css_fontes(urls_fontes):
+    regras = []
+    for nome, url in sorted(urls_fontes.items()):
+        # Inter-700.woff2 -> peso 700; sem número = fonte variável
+        peso = re.search(r"-(\d{3})\.", nome)
+        faixa = peso.group(1) if peso else "100 900"
+        fmt = "woff2" if nome.endswith(".woff2") else "woff"
+        # CSS fica em static/css/, fontes em static/fonts/
+        relativa = "../" + url[len(URL_STATIC) + 1:]
+        regras.append(
+            f"@font-face {{ font-family: '{FONTE_FAMILIA}'; font-style: normal; font-weight: {faixa}; "
+            f"font-display: swap; src: url('{relativa}') format('{fmt}'); }}\n"
+        )
+    return "".join(regras)
+
+
+def url_static(caminho):
+    """URL relativa de um arquivo gravado dentro de static/"""
+    relativo = Path(caminho).resolve().relative_to(DIR_STATIC)
+    return f"{URL_STATIC}/{relativo.as_posix()}"
+
+
+def css_inline(nome_logico):
+    """CSS de origem para quando o static serving estiver desligado"""
+    return (DIR_ASSETS / nome_logico).read_text(encoding="utf-8")
+
+
+def publicar_assets():
+    """Publica CSS, fontes e logos em static/ com nomes por hash; retorna {nome lógico: url}"""
+    manifesto = {}
+
+    fontes = {}
+    dir_fontes = DIR_ASSETS / "fonts"
+    if dir_fontes.exists():
+        for arquivo in sorted(dir_fontes.iterdir()):
+            if arquivo.suffix in (".woff2", ".woff"):
+                fontes[arquivo.name] = _publicar(arquivo.read_bytes(), f"fonts/{arquivo.name}")
+    manifesto.update({f"fonts/{nome}": url for nome, url in fontes.items()})
+
+    css_fontes = _css_fontes(fontes)
+    for arquivo in sorted((DIR_ASSETS / "css").glob("*.css")):
+        conteudo = css_fontes + arquivo.read_text(encoding="utf-8")
+        manifesto[f"css/{arquivo.name}"] = _publicar(conteudo.encode("utf-8"), f"css/{arquivo.name}")
+
+    for nome_logico, variantes in LOGOS.items():
+        for v in variantes:
+            origem = RAIZ / v
+            if origem.exists():
+                manifesto[nome_logico] = _publicar(origem.read_bytes(), nome_logico)
+                break
+
+    return manifesto
@@ -0,0 +1,110 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from estatisticas_projetos import COLUNAS_STATUS, COLUNAS_ULTIMA_CONEXAO, COLUNAS_VENCIMENTO
+from extrator_periodos import deslocamento, extrair_duracao, rotulo_duracao
+from roteador_intencoes import normalizar
+
+# "e desses, quais são da VIVO?", "entre eles...", "e da Claro?"
+_RE_CONTINUACAO = re.compile(
+    r'\b(desses|dessas|destes|destas|deles|delas|neles|nelas|dentre eles|dentre elas|'
+    r'entre eles|entre elas|desse grupo|nesse grupo|nessa lista|dessa lista)\b'
+    r'|^e\s+(d[aoe]s?|n[ao]s?|os|as|quantos|quantas|quais)\b')
+
+
+def eh_continuacao(pergunta):
+    """A pergunta se refere ao resultado da resposta anterior?"""
+    return bool(_RE_CONTINUACAO.search(normalizar(pergunta).strip()))
+
+
+def _buscar_coluna(df, variacoes):
+    for variacao in variacoes:
+        if variacao in df.columns:
+            return variacao
+    return None
+
+
+def _valor_citado(texto, valores):
+    """Primeiro valor (ex.: operadora, status) citado no texto normalizado, por palavra"""
+    for valor in valores:
+        termo = normalizar(str(valor)).strip()
+        if termo and re.search(r'\b' + re.escape(termo) + r's?\b', texto):
+            return valor
+    return None
+
+
+def extrair_filtros(pergunta, df, projeto=None, hoje=None):
+    """Filtros de refinamento citados na pergunta: [(rótulo, coluna, tipo, valor)]"""
+    hoje = hoje or pd.Timestamp.now().normalize()
+    texto = normalizar(pergunta)
+    filtros = []
+
+    if projeto is not None:
+        filtros.append((f"Projeto {projeto}", 'PROJETO', 'igual', projeto))
+
+    if 'OPERADORA' in df.columns:
+        operadora = _valor_citado(texto, df['OPERADORA'].dropna().unique())
+        if operadora is not None:
+            filtros.append((f"Operadora {operadora}", 'OPERADORA', 'igual', operadora))
+
+    coluna_status = _buscar_coluna(df, COLUNAS_STATUS)
+    if coluna_status:
+        status = _valor_citado(texto, df[coluna_status].dropna().unique())
+        if status is not None:
+            filtros.append((f"Status {status}", coluna_status, 'igual', status))
+
+    coluna_venc = _buscar_coluna(df, COLUNAS_VENCIMENTO)
+    if coluna_venc:
+        if 'expirad' in texto or 'vencid' in texto:
+            filtros.append(("Licença expirada", coluna_venc, 'antes', hoje))
+        elif 'valid' in texto:
+            filtros.append(("Licença válida", coluna_venc, 'desde', hoje))
+
+    coluna_conexao = _buscar_coluna(df, COLUNAS_ULTIMA_CONEXAO)
+    if coluna_conexao:
+        if 'nunca conect' in texto:
+            filtros.append(("Nunca conectou", coluna_conexao, 'vazio', None))
+        elif 'sem conexao' in texto or 'offline' in texto:
+            duracao = extrair_duracao(pergunta) or (180, 'dia')
+            # Mesmo critério de CATEGORIA_CONEXAO: mais que o período completo
+            limite = hoje - deslocamento(*duracao) - pd.Timedelta(days=1)
+            filtros.append((f"Sem conexão há mais de {rotulo_duracao(*duracao)}", coluna_conexao,
+                            'ate', limite))
+
+    return filtros
+
+
+def aplicar_filtros_selecao(df, posicoes, filtros):
+    """Posições (iloc) de `posicoes` que passam em todos os filtros.
+
+    Só as linhas da seleção são lidas: o custo acompanha o tamanho da resposta
+    anterior, não o da base.
+    """
+    for _, coluna, tipo, valor in filtros:
+        if not len(posicoes):
+            break
+        valores = df[coluna].to_numpy()[posicoes]
+        if tipo == 'igual':
+            manter = valores == valor
+        else:
+            datas = pd.to_datetime(pd.Series(valores), errors='coerce', cache=False)
+            if tipo == 'vazio':
+                manter = datas.isna().to_numpy()
+            elif tipo == 'antes':
+                manter = (datas < valor).to_numpy()
+            elif tipo == 'desde':
+                manter = (datas >= valor).to_numpy()
+            else:
+                manter = (datas <= valor).to_numpy()
+        posicoes = posicoes[manter]
+    return posicoes
+
+
+def contar_por(df, posicoes, coluna):
+    """Série valor -> quantidade da coluna nas linhas selecionadas, maior primeiro"""
+    if coluna not in df.columns or not len(posicoes):
+        return pd.Series(dtype='int64')
+    valores, quantidades = np.unique(df[coluna].to_numpy()[posicoes].astype(str), return_counts=True)
+    return pd.Series(quantidades, index=valores).sort_values(ascending=False, kind='stable')
@@ -0,0 +1,134 @@
+import math
+
+import pandas as pd
+
+from estatisticas_projetos import FAIXAS_VENCIMENTO, contagens_totais
+
+# Estimativa sem tokenizer (evita dependência): ~4 caracteres por token em português
+CARACTERES_POR_TOKEN = 4
+ORDEM_STATUS_CONTRATO = {'EXPIRADO': 0, 'EXPIRANDO': 1, 'EM RENOVAÇÃO': 2, 'VÁLIDO': 3}
+
+
+def estimar_tokens(texto):
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def _pct(parte, total):
+    return f"{parte / total * 100:.1f}%" if total else "0%"
+
+
+def _data(valor):
+    data = pd.to_datetime(valor, errors='coerce')
+    return data.strftime('%d/%m/%Y') if pd.notna(data) else '-'
+
+
+def _secao_geral(estat):
+    tabela = estat['tabela']
+    total = estat['total_linhas']
+    linhas = [f"Data de referência: {estat['hoje'].strftime('%d/%m/%Y')}",
+              f"Chips: {total} em {len(tabela)} projetos"]
+    for coluna, rotulo in (('ATIVADOS', 'Ativados'), ('EXPIRADAS', 'Licenças expiradas'),
+                           ('VENC_30D', 'Vencem em 30 dias'), ('VENC_90D', 'Vencem em 90 dias'),
+                           ('SEM_CONEXAO_180', 'Sem conexão há 180+ dias'), ('CANCELADOS', 'Cancelados')):
+        if coluna in tabela.columns:
+            qtd = int(tabela[coluna].sum())
+            linhas.append(f"{rotulo}: {qtd} ({_pct(qtd, total)})")
+    return "## Visão geral", linhas
+
+
+def _secao_contagem(titulo, contagem, ordem=None, total=None):
+    totais = contagens_totais(contagem)
+    if totais.empty:
+        return titulo, []
+    if ordem:
+        totais = totais.reindex([v for v in ordem if v in totais.index])
+    return titulo, [f"{valor}: {int(qtd)}" + (f" ({_pct(qtd, total)})" if total else "")
+                    for valor, qtd in totais.items()]
+
+
+def _secao_projetos(estat):
+    tabela = estat['tabela'].sort_values('TOTAL', ascending=False, kind='stable')
+    colunas = [('ATIVADOS', 'ativ'), ('EXPIRADAS', 'exp'), ('VENC_30D', 'v30'),
+               ('VENC_90D', 'v90'), ('SEM_CONEXAO_180', 'inat180'), ('CANCELADOS', 'canc')]
+    colunas = [(c, r) for c, r in colunas if c in tabela.columns]
+    legenda = "projeto: chips | " + " | ".join(r for _, r in colunas)
+    linhas = [legenda]
+    for projeto, linha in tabela.iterrows():
+        valores = " | ".join(str(int(linha[c])) for c, _ in colunas)
+        linhas.append(f"{projeto}: {int(linha['TOTAL'])} | {valores}")
+    return "## Por projeto (maiores primeiro)", linhas
+
+
+def _secao_contratos(dfcontratos):
+    if dfcontratos is None or dfcontratos.empty or 'PROJETO' not in dfcontratos.columns:
+        return "## Contratos", []
+    contratos = dfcontratos.copy()
+    status = contratos.get('STATUS ATUAL DO CONTRATO', pd.Series('', index=contratos.index))
+    contratos['_ordem'] = status.map(ORDEM_STATUS_CONTRATO).fillna(len(ORDEM_STATUS_CONTRATO))
+    linhas = []
+    for _, c in contratos.sort_values('_ordem', kind='stable').iterrows():
+        partes = [str(c['PROJETO'])]
+        if 'STATUS ATUAL DO CONTRATO' in c:
+            partes.append(str(c['STATUS ATUAL DO CONTRATO']))
+        if 'TOTAL DE LICENÇAS PREVISTAS' in c:
+            partes.append(f"{c['TOTAL DE LICENÇAS PREVISTAS']} licenças previstas")
+        if 'DATA DA ÚLTIMA RENOVAÇÃO CONTRATUAL' in c:
+            partes.append(f"renovado em {_data(c['DATA DA ÚLTIMA RENOVAÇÃO CONTRATUAL'])}")
+        if 'DURAÇÃO CONTRATUAL (MESES)' in c:
+            partes.append(f"{c['DURAÇÃO CONTRATUAL (MESES)']} meses")
+        linhas.append(" | ".join(partes))
+    return "## Contratos (críticos primeiro)", linhas
+
+
+def _secao_timeline(dftimeline, hoje):
+    if dftimeline is None or dftimeline.empty or 'DATA' not in dftimeline.columns:
+        return "## Timeline", []
+    eventos = dftimeline.assign(DATA=pd.to_datetime(dftimeline['DATA'], errors='coerce')).dropna(subset=['DATA'])
+    # Próximos eventos primeiro (mais perto de hoje), depois os passados mais recentes
+    futuros = eventos[eventos['DATA'] >= hoje].sort_values('DATA')
+    passados = eventos[eventos['DATA'] < hoje].sort_values('DATA', ascending=False)
+    linhas = []
+    for _, e in pd.concat([futuros, passados]).iterrows():
+        quantidade = f" | {e['QUANTIDADE']}" if 'QUANTIDADE' in e else ""
+        linhas.append(f"{e['DATA'].strftime('%d/%m/%Y')} | {e.get('PROJETO', '-')} | {e.get('AÇÃO', '-')}{quantidade}")
+    return "## Timeline (próximos eventos, depois recentes)", linhas
+
+
+def construir_resumo(estat, dfcontratos=None, dftimeline=None, orcamento_tokens=1500):
+    """Resumo estatístico da base para o contexto do LLM, dentro de `orcamento_tokens`.
+
+    As seções entram por prioridade; a que não couber inteira entra com as primeiras
+    linhas e uma linha dizendo quantas ficaram de fora.
+    """
+    total = estat['total_linhas']
+    secoes = [
+        _secao_geral(estat),
+        _secao_contagem("## Vencimento das licenças", estat['faixas_vencimento'], FAIXAS_VENCIMENTO, total),
+        _secao_contagem("## Última conexão", estat['conexao'], total=total),
+        _secao_projetos(estat),
+        _secao_contagem("## Operadoras", estat['operadoras'], total=total),
+        _secao_contratos(dfcontratos),
+        _secao_timeline(dftimeline, estat['hoje']),
+    ]
+
+    partes = []
+    restante = orcamento_tokens
+    for titulo, linhas in secoes:
+        if not linhas:
+            continue
+        custo_titulo = estimar_tokens(titulo + "\n")
+        # Título + pelo menos uma linha + aviso de omissão, senão a seção fica de fora
+        if custo_titulo + estimar_tokens(linhas[0] + "\n") + 10 > restante:
+            continue
+        partes.append(titulo)
+        restante -= custo_titulo
+        for i, linha in enumerate(linhas):
+            custo = estimar_tokens(linha + "\n")
+            faltam = len(linhas) - i
+            if custo > restante or (faltam > 1 and custo + 10 > restante):
+                partes.append(f"... (+{faltam} linhas omitidas)")
+                restante -= 10
+                break
+            partes.append(linha)
+            restante -= custo
+    return "\n".join(partes)
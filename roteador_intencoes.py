@@ -0,0 +1,247 @@
+import re
+import sys
+import time
+import unicodedata
+
+from indice_projetos import construir_indice_projetos, detectar_projeto
+
+# Cada intenção casa quando TODOS os grupos têm ao menos um termo presente
+# e nenhum termo de "excluir" aparece. Termos já normalizados (minúsculo, sem acento)
+# e comparados por substring, como na cadeia de `in pergunta_lower` original.
+INTENCOES = [
+    {'nome': 'listar_projetos',
+     'grupos': [['lista de projetos', 'projetos disponiveis', 'liste os projetos']],
+     'bonus': 4},
+    # Horizonte ou intervalo qualquer ("em 45 dias", "entre março e junho"): o período
+    # é extraído depois, por extrator_periodos
+    {'nome': 'vencimentos_periodo',
+     'grupos': [['vencem', 'vence ', 'vencimento', 'vencendo', 'expiram', 'expira '],
+                ['dia', 'semana', 'mes', 'ano', 'entre', '/', 'janeiro', 'fevereiro', 'marco',
+                 'abril', 'maio', 'junho', 'julho', 'agosto', 'setembro', 'outubro', 'novembro',
+                 'dezembro']],
+     'bonus': 2,
+     'requer_periodo': True},
+    {'nome': 'sem_conexao_periodo',
+     'grupos': [['sem conexao', 'offline', 'sem conectar', 'nao conecta'],
+                ['dia', 'semana', 'mes', 'ano']],
+     'bonus': 2,
+     'requer_periodo': True},
+    # Planilha de dados gerenciais: contratos (unidos aos chips) e timeline
+    {'nome': 'contratos_vencendo',
+     'grupos': [['contrato'], ['vence', 'vencimento', 'vencendo', 'expira', 'vigencia', 'renova', 'termina']],
+     'excluir': ['expirad'],
+     'bonus': 3},
+    {'nome': 'entregas_contrato',
+     'grupos': [['entreg', 'previst']],
+     'excluir': ['quando', 'timeline', 'evento'],
+     'bonus': 3},
+    {'nome': 'pontos_focais',
+     'grupos': [['focal', 'focais', 'responsave', 'contato']],
+     'bonus': 3},
+    {'nome': 'contratos_status',
+     'grupos': [['contrato']],
+     'bonus': 2},
+    {'nome': 'eventos_timeline',
+     'grupos': [['timeline', 'evento', 'cronograma', 'agenda', 'quando', 'pagamento', 'substituic',
+                 'vinculac', 'cancelamento']],
+     'bonus': 2},
+    {'nome': 'vencimentos_30d',
+     'grupos': [['vencem', 'vencimento', 'vencendo'], ['30', 'proximos'], ['quais', 'projeto']]},
+    # Com um projeto identificado, o relatório dele passa à frente dos agregados declarados
+    # depois ("status das ativações do ES"), como na cadeia original
+    {'nome': 'relatorio_projeto',
+     'grupos': [['resumo', 'completo', 'relatorio', 'tudo', 'sobre', 'dados', 'informacoes', 'status', 'situacao']],
+     'requer_projeto': True,
+     'bonus_projeto': 2},
+    {'nome': 'cancelados',
+     'grupos': [['cancelad']]},
+    {'nome': 'chips_por_projeto',
+     'grupos': [['quantos', 'total'], ['chip'], ['projeto']],
+     'excluir': ['cancelad', 'venc']},
+    {'nome': 'sem_conexao_180',
+     'grupos': [['180', 'sem conexao']]},
+    {'nome': 'status_ativacoes',
+     'grupos': [['ativa'], ['status', 'geral']]},
+    {'nome': 'distribuicao_operadora',
+     'grupos': [['operadora']],
+     'excluir': ['cancelad']},
+    {'nome': 'licencas_expiradas',
+     'grupos': [['expirad', 'vencidas']]},
+]
+
+# Projetos que as perguntas do corpus citam (a detecção roda sobre estes nomes)
+PROJETOS_CORPUS = ['Governo do estado da Bahia', 'ES', 'IAUPE', 'Prefeitura de Joinville', 'Pref. de Aracaju']
+
+# Perguntas rotuladas: a intenção esperada em primeiro lugar (None = nenhuma)
+CORPUS_ROTULADO = [
+    ("Liste os projetos disponíveis", 'listar_projetos'),
+    ("Qual a lista de projetos?", 'listar_projetos'),
+    ("Quais projetos disponiveis vencem nos próximos 30 dias?", 'listar_projetos'),
+    # Com dias/meses na pergunta vai para o período; resolver_intencao volta para
+    # vencimentos_30d quando o período é de 30 dias ou não tem número
+    ("Quais projetos vencem em 30 dias?", 'vencimentos_periodo'),
+    ("Quais licenças vencem nos próximos dias?", 'vencimentos_periodo'),
+    ("Vencimentos por projeto nos proximos 30 dias", 'vencimentos_periodo'),
+    ("Quais chips estão vencendo nos próximos 30 dias?", 'vencimentos_periodo'),
+    ("Quais projetos vencem nos próximos", 'vencimentos_30d'),
+    ("Quantos chips vencem em 45 dias?", 'vencimentos_periodo'),
+    ("Licenças que vencem entre março e junho", 'vencimentos_periodo'),
+    ("O que vence até 31/12?", 'vencimentos_periodo'),
+    ("Resumo do projeto IAUPE", 'relatorio_projeto'),
+    ("Relatório completo do ES", 'relatorio_projeto'),
+    ("Me dê informações sobre Joinville", 'relatorio_projeto'),
+    ("Qual a situação do projeto Aracaju?", 'relatorio_projeto'),
+    # Agregado + projeto citado: o projeto vence
+    ("Qual o status das ativações do projeto ES?", 'relatorio_projeto'),
+    ("Status geral das ativações do IAUPE", 'relatorio_projeto'),
+    ("Qual a situação dos chips cancelados de Joinville", 'relatorio_projeto'),
+    ("Dados por operadora do projeto Aracaju", 'relatorio_projeto'),
+    ("Status dos chips sem conexão da Bahia", 'relatorio_projeto'),
+    ("Quais os dados das licenças expiradas do IAUPE?", 'relatorio_projeto'),
+    # Sem palavra de relatório o agregado continua respondendo
+    ("Quantos chips cancelados no projeto ES?", 'cancelados'),
+    ("Qual a distribuição por operadora do IAUPE?", 'distribuicao_operadora'),
+    ("Quantos chips cancelados?", 'cancelados'),
+    ("Chips cancelados por operadora", 'cancelados'),
+    ("Total de chips cancelados por projeto", 'cancelados'),
+    ("Quantos chips por projeto?", 'chips_por_projeto'),
+    ("Total de chips de cada projeto", 'chips_por_projeto'),
+    ("Quantos chips sem conexão há 180 dias?", 'sem_conexao_periodo'),
+    ("Chips sem conexao", 'sem_conexao_180'),
+    ("Quais chips estão há mais de 180 dias offline?", 'sem_conexao_periodo'),
+    ("Chips sem conexão há 90 dias", 'sem_conexao_periodo'),
+    ("Quais chips estão offline há mais de 2 meses?", 'sem_conexao_periodo'),
+    ("Qual o status geral das ativações?", 'status_ativacoes'),
+    ("Status das ativações", 'status_ativacoes'),
+    ("Como está a ativação geral?", 'status_ativacoes'),
+    ("Qual o status dos contratos?", 'contratos_status'),
+    ("Qual a situação do contrato do ES?", 'contratos_status'),
+    ("Quais contratos estão expirados?", 'contratos_status'),
+    ("Quais contratos vencem nos próximos 90 dias?", 'contratos_vencendo'),
+    ("Quando termina o contrato de Joinville?", 'contratos_vencendo'),
+    ("Quem é o focal point do IAUPE?", 'pontos_focais'),
+    ("Responsáveis pelos contratos", 'pontos_focais'),
+    ("Qual o percentual de entrega por projeto?", 'entregas_contrato'),
+    ("Quantas licenças previstas foram entregues?", 'entregas_contrato'),
+    ("Quais os próximos eventos da timeline?", 'eventos_timeline'),
+    ("Quando é o próximo pagamento da Bahia?", 'eventos_timeline'),
+    ("Qual a distribuição por operadora?", 'distribuicao_operadora'),
+    ("Quantos chips em cada operadora?", 'distribuicao_operadora'),
+    ("Quantas licenças expiradas?", 'licencas_expiradas'),
+    ("Licenças vencidas", 'licencas_expiradas'),
+    ("Quais licenças já expiraram?", None),
+    ("Bom dia!", None),
+    ("Qual a previsão do tempo?", None),
+]
+
+
+def normalizar(texto):
+    """Minúsculas sem acentos - 'Situação' e 'situacao' viram o mesmo termo"""
+    decomposto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def _compilar(intencoes):
+    termos = set()
+    for intencao in intencoes:
+        for grupo in intencao['grupos']:
+            termos.update(normalizar(t) for t in grupo)
+        termos.update(normalizar(t) for t in intencao.get('excluir', []))
+
+    # Um único regex: em cada posição o lookahead pega o termo mais longo;
+    # os termos mais curtos que começam ali são prefixos dele (pré-calculados).
+    ordenados = sorted(termos, key=len, reverse=True)
+    padrao = re.compile('(?=(' + '|'.join(re.escape(t) for t in ordenados) + '))')
+    prefixos = {t: frozenset(u for u in termos if t.startswith(u)) for t in termos}
+
+    regras = []
+    for ordem, intencao in enumerate(intencoes):
+        grupos = [frozenset(normalizar(t) for t in grupo) for grupo in intencao['grupos']]
+        regras.append({
+            'nome': intencao['nome'],
+            'grupos': grupos,
+            'excluir': frozenset(normalizar(t) for t in intencao.get('excluir', [])),
+            'pontuacao': len(grupos) + intencao.get('bonus', 0),
+            'bonus_projeto': intencao.get('bonus_projeto', 0),
+            'ordem': ordem,
+        })
+    return padrao, prefixos, regras
+
+
+_PADRAO, _PREFIXOS, _REGRAS = _compilar(INTENCOES)
+REQUER_PROJETO = {i['nome'] for i in INTENCOES if i.get('requer_projeto')}
+REQUER_PERIODO = {i['nome'] for i in INTENCOES if i.get('requer_periodo')}
+
+
+def termos_encontrados(pergunta):
+    encontrados = set()
+    for m in _PADRAO.finditer(normalizar(pergunta)):
+        encontrados |= _PREFIXOS[m.group(1)]
+    return encontrados
+
+
+def pontuar(pergunta, com_projeto=False):
+    """[(intenção, pontuação)] de todas as intenções que casam, melhor primeiro.
+
+    `com_projeto`: a pergunta cita um projeto da base (soma os bonus_projeto).
+    """
+    encontrados = termos_encontrados(pergunta)
+    if not encontrados:
+        return []
+
+    candidatas = []
+    for regra in _REGRAS:
+        if regra['excluir'] & encontrados:
+            continue
+        if all(grupo & encontrados for grupo in regra['grupos']):
+            pontuacao = regra['pontuacao'] + (regra['bonus_projeto'] if com_projeto else 0)
+            candidatas.append((pontuacao, -regra['ordem'], regra['nome']))
+
+    candidatas.sort(reverse=True)
+    return [(nome, pontuacao) for pontuacao, _, nome in candidatas]
+
+
+def rotear(pergunta, com_projeto=False):
+    """Intenções candidatas em ordem de preferência"""
+    return [nome for nome, _ in pontuar(pergunta, com_projeto)]
+
+
+def melhor_intencao(pergunta, com_projeto=False):
+    candidatas = rotear(pergunta, com_projeto)
+    return candidatas[0] if candidatas else None
+
+
+def avaliar_corpus(corpus=CORPUS_ROTULADO, projetos=PROJETOS_CORPUS):
+    """Erros de roteamento e empates de pontuação no corpus rotulado"""
+    indice = construir_indice_projetos(projetos)
+    erros, ambiguas = [], []
+    for pergunta, esperada in corpus:
+        pontos = pontuar(pergunta, detectar_projeto(indice, pergunta) is not None)
+        obtida = pontos[0][0] if pontos else None
+        if obtida != esperada:
+            erros.append((pergunta, esperada, obtida))
+        if len(pontos) > 1 and pontos[0][1] == pontos[1][1]:
+            ambiguas.append((pergunta, pontos[:2]))
+    return {'total': len(corpus), 'erros': erros, 'ambiguas': ambiguas}
+
+
+def medir_vazao(perguntas=None, repeticoes=2000):
+    """Perguntas roteadas por segundo"""
+    perguntas = perguntas or [p for p, _ in CORPUS_ROTULADO]
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for pergunta in perguntas:
+            pontuar(pergunta)
+    return (repeticoes * len(perguntas)) / (time.perf_counter() - inicio)
+
+
+if __name__ == "__main__":
+    resultado = avaliar_corpus()
+    print(f"Corpus: {resultado['total']} perguntas, {len(resultado['erros'])} erro(s), "
+          f"{len(resultado['ambiguas'])} empate(s)")
+    for pergunta, esperada, obtida in resultado['erros']:
+        print(f"  ERRO  {pergunta!r}: esperada={esperada} obtida={obtida}")
+    for pergunta, pontos in resultado['ambiguas']:
+        print(f"  EMPATE {pergunta!r}: {pontos}")
+    print(f"Vazão: {medir_vazao():,.0f} perguntas/s")
+    sys.exit(1 if resultado['erros'] else 0)
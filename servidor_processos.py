@@ -0,0 +1,271 @@
+import argparse
+import itertools
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from tornado import httpclient, ioloop, web, websocket
+
+import base_compartilhada
+import instrumentacao
+from dados import carimbos_planilhas, carregar_dados_gerenciais, carregar_mapeamento
+from recursos_estaticos import DIR_EXPORTS, exportacao_servivel, registrar_tipos_mime
+
+# Processos do app atrás do proxy; o padrão acompanha os núcleos
+APP_PROCESSOS = int(os.getenv("APP_PROCESSOS", str(os.cpu_count() or 2)))
+APP_PORTA = int(os.getenv("APP_PORTA", "8501"))
+APP_PORTA_PROCESSOS = int(os.getenv("APP_PORTA_PROCESSOS", "8601"))
+
+# tmpfs: o Arrow publicado fica na RAM uma vez e cada processo só o mapeia
+DIR_MEMORIA = "/dev/shm/basemobile" if Path("/dev/shm").is_dir() else str(Path(tempfile.gettempdir()) / "basemobile")
+
+# Segundos entre conferências dos processos e das planilhas
+INTERVALO_SUPERVISAO = 5.0
+
+# Mesmo limite de mensagem do servidor do Streamlit (tabelas grandes passam pelo websocket)
+TAMANHO_MAXIMO_MENSAGEM = 200 * 1024 * 1024
+
+# Navegador fica no mesmo processo: a sessão, os uploads e as mídias moram nele
+COOKIE_PROCESSO = "bm_processo"
+
+# Cabeçalhos de conexão valem só entre dois pontos; não atravessam o proxy
+SALTO_A_SALTO = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te', 'trailers',
+                 'transfer-encoding', 'upgrade', 'content-length'}
+
+
+def publicar_base(pasta):
+    """Lê as planilhas e publica uma geração nova; None se não houver base"""
+    df, _ = carregar_mapeamento()
+    if df.empty:
+        return None
+    dfcontratos, dftimeline = carregar_dados_gerenciais()
+    return base_compartilhada.publicar(df, dfcontratos, dftimeline, pasta)
+
+
+class Processos:
+    """Processos `streamlit run app.py`, um por porta, reiniciados se caírem"""
+
+    def __init__(self, quantidade, porta_inicial, pasta_memoria, pasta_metricas):
+        self.portas = [porta_inicial + i for i in range(quantidade)]
+        self.filhos = [None] * quantidade
+        self.pasta_memoria = pasta_memoria
+        self.pasta_metricas = pasta_metricas
+        self._rodizio = itertools.cycle(range(quantidade))
+
+    def iniciar(self, indice):
+        comando = [sys.executable, '-m', 'streamlit', 'run', 'app.py',
+                   '--server.port', str(self.portas[indice]), '--server.address', '127.0.0.1',
+                   '--server.headless', 'true']
+        ambiente = {**os.environ, 'BASE_COMPARTILHADA': str(self.pasta_memoria),
+                    'METRICAS_PROMETHEUS_DIR': str(self.pasta_metricas)}
+        self.filhos[indice] = subprocess.Popen(comando, env=ambiente)
+
+    def iniciar_todos(self):
+        for indice in range(len(self.portas)):
+            self.iniciar(indice)
+
+    def supervisionar(self):
+        for indice, filho in enumerate(self.filhos):
+            if filho is not None and filho.poll() is not None:
+                print(f"Processo {indice} (porta {self.portas[indice]}) saiu com {filho.returncode}; reiniciando",
+                      file=sys.stderr)
+                self.iniciar(indice)
+
+    def escolher(self, cookie):
+        """Processo do cookie, se válido; senão o próximo do rodízio"""
+        if cookie is not None and cookie.isdigit() and int(cookie) < len(self.portas):
+            return int(cookie)
+        return next(self._rodizio)
+
+    def encerrar(self):
+        for filho in self.filhos:
+            if filho is not None and filho.poll() is None:
+                filho.terminate()
+        for filho in self.filhos:
+            if filho is not None:
+                try:
+                    filho.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    filho.kill()
+
+
+class ProxyHTTP(web.RequestHandler):
+    SUPPORTED_METHODS = ("GET", "HEAD", "POST", "PUT", "DELETE", "PATCH", "OPTIONS")
+
+    def initialize(self, processos):
+        self.processos = processos
+
+    async def encaminhar(self):
+        indice = self.processos.escolher(self.get_cookie(COOKIE_PROCESSO))
+        requisicao = httpclient.HTTPRequest(
+            f"http://127.0.0.1:{self.processos.portas[indice]}{self.request.uri}",
+            method=self.request.method,
+            headers={k: v for k, v in self.request.headers.get_all() if k.lower() not in SALTO_A_SALTO},
+            body=self.request.body if self.request.method in ("POST", "PUT", "PATCH", "DELETE") else None,
+            follow_redirects=False, decompress_response=False, allow_nonstandard_methods=True,
+            request_timeout=300)
+        resposta = await httpclient.AsyncHTTPClient().fetch(requisicao, raise_error=False)
+
+        if resposta.code == 599:
+            # Processo iniciando ou reiniciando
+            self.set_status(502)
+            self.finish("Processo do app indisponível; tente novamente em instantes.")
+            return
+
+        self.set_status(resposta.code, resposta.reason)
+        for nome in ("Content-Type", "Server", "Date"):
+            self.clear_header(nome)
+        for nome, valor in resposta.headers.get_all():
+            if nome.lower() not in SALTO_A_SALTO:
+                self.add_header(nome, valor)
+        if self.get_cookie(COOKIE_PROCESSO) != str(indice):
+            self.set_cookie(COOKIE_PROCESSO, str(indice), httponly=True, samesite="Lax")
+        if resposta.body and resposta.code not in (204, 304) and self.request.method != "HEAD":
+            self.write(resposta.body)
+        self.finish()
+
+    get = head = post = put = delete = patch = options = encaminhar
+
+
+class ProxyWebSocket(websocket.WebSocketHandler):
+    def initialize(self, processos):
+        self.processos = processos
+        self.destino = None
+
+    def select_subprotocol(self, subprotocolos):
+        return subprotocolos[0] if subprotocolos else None
+
+    async def open(self, *args):
+        indice = self.processos.escolher(self.get_cookie(COOKIE_PROCESSO))
+        subprotocolos = [p.strip() for p in self.request.headers.get("Sec-WebSocket-Protocol", "").split(",") if p.strip()]
+        requisicao = httpclient.HTTPRequest(
+            f"ws://127.0.0.1:{self.processos.portas[indice]}{self.request.uri}",
+            headers={'Cookie': self.request.headers.get('Cookie', '')})
+        try:
+            self.destino = await websocket.websocket_connect(
+                requisicao, subprotocols=subprotocolos or None, max_message_size=TAMANHO_MAXIMO_MENSAGEM)
+        except Exception:
+            self.close(1011, "processo do app indisponível")
+            return
+        ioloop.IOLoop.current().spawn_callback(self._repassar_respostas)
+
+    async def _repassar_respostas(self):
+        while True:
+            mensagem = await self.destino.read_message()
+            if mensagem is None:
+                self.close()
+                return
+            try:
+                await self.write_message(mensagem, binary=isinstance(mensagem, bytes))
+            except websocket.WebSocketClosedError:
+                self.destino.close()
+                return
+
+    async def on_message(self, mensagem):
+        if self.destino is not None:
+            await self.destino.write_message(mensagem, binary=isinstance(mensagem, bytes))
+
+    def on_close(self):
+        if self.destino is not None:
+            self.destino.close()
+
+
+class Metricas(web.RequestHandler):
+    """Métricas de todos os processos num texto só, para o Prometheus raspar"""
+
+    def initialize(self, processos):
+        self.processos = processos
+
+    def get(self):
+        textos = [c.read_text(encoding='utf-8')
+                  for c in sorted(Path(self.processos.pasta_metricas).glob(f"{instrumentacao.PREFIXO}_*.prom"))]
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.finish(instrumentacao.juntar_textos_prometheus(textos))
+
+
+class Exportacoes(web.StaticFileHandler):
+    """Exportações saem direto do disco, em blocos e no ritmo do navegador, sem passar pelo proxy em memória"""
+
+    def validate_absolute_path(self, root, absolute_path):
+        caminho = super().validate_absolute_path(root, absolute_path)
+        if caminho and not exportacao_servivel(caminho):
+            raise web.HTTPError(404, reason="File is too large")
+        return caminho
+
+    def set_extra_headers(self, path):
+        self.set_header("X-Content-Type-Options", "nosniff")
+
+
+def criar_proxy(processos):
+    httpclient.AsyncHTTPClient.configure(None, max_clients=200)
+    registrar_tipos_mime()
+    return web.Application([
+        (r"/_stcore/stream", ProxyWebSocket, {'processos': processos}),
+        (r"/app/static/exports/(.*)", Exportacoes, {'path': str(DIR_EXPORTS)}),
+        (r"/metrics", Metricas, {'processos': processos}),
+        (r".*", ProxyHTTP, {'processos': processos}),
+    ], websocket_max_message_size=TAMANHO_MAXIMO_MENSAGEM)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Vários processos do app atrás de um proxy local, com a base em memória compartilhada.")
+    parser.add_argument('-n', '--processos', type=int, default=APP_PROCESSOS)
+    parser.add_argument('--porta', type=int, default=APP_PORTA, help="porta do proxy (a que o navegador usa)")
+    parser.add_argument('--porta-processos', type=int, default=APP_PORTA_PROCESSOS, help="porta do primeiro processo")
+    parser.add_argument('--memoria', default=DIR_MEMORIA, help="pasta em tmpfs para a base publicada")
+    parser.add_argument('-p', '--pasta', default='.', help="pasta do app e das planilhas (padrão: atual)")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.pasta)
+    carimbos = carimbos_planilhas()
+    geracao = publicar_base(args.memoria)
+    if geracao is None:
+        print("❌ Base não encontrada (MAPEAMENTO DE CHIPS.xlsx)", file=sys.stderr)
+        return 2
+
+    # Os processos gravam um .prom cada; o proxy os junta em /metrics
+    pasta_metricas = instrumentacao.METRICAS_DIR or str(Path(args.memoria) / "metricas")
+    processos = Processos(args.processos, args.porta_processos, args.memoria, pasta_metricas)
+    processos.iniciar_todos()
+    criar_proxy(processos).listen(args.porta)
+    print(f"Proxy em http://localhost:{args.porta} -> {args.processos} processo(s) "
+          f"(portas {processos.portas[0]}-{processos.portas[-1]}), base em {args.memoria} (geração {geracao}), "
+          f"métricas em /metrics", file=sys.stderr)
+
+    laco = ioloop.IOLoop.current()
+    publicando = False
+
+    async def supervisionar():
+        nonlocal carimbos, publicando
+        processos.supervisionar()
+        atuais = carimbos_planilhas()
+        if atuais == carimbos or publicando:
+            return
+        # A leitura do Excel não pode travar o proxy
+        publicando = True
+        try:
+            nova = await laco.run_in_executor(None, publicar_base, args.memoria)
+            carimbos = atuais
+            if nova is not None:
+                print(f"Planilhas alteradas: geração {nova} publicada", file=sys.stderr)
+        finally:
+            publicando = False
+
+    ioloop.PeriodicCallback(supervisionar, INTERVALO_SUPERVISAO * 1000).start()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sinal, lambda *_: laco.add_callback_from_signal(laco.stop))
+    try:
+        laco.start()
+    finally:
+        processos.encerrar()
+        shutil.rmtree(args.memoria, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
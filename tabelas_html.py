@@ -0,0 +1,154 @@
+import pandas as pd
+
+
+def format_number(num):
+    try:
+        return f"{int(num):,}".replace(',', '.')
+    except:
+        return str(num)
+
+
+def gerar_html_tabela_entregas(df_entregas, estilo=""):
+    """Gera HTML da tabela de entregas - USAR COM st.components.v1.html()"""
+    if df_entregas.empty:
+        return "<p>Nenhum dado disponível</p>"
+
+    linhas = []
+    for _, row in df_entregas.iterrows():
+        pct_ent = row['% ENTREGUES']
+        cor_ent = '#4CAF50' if pct_ent >= 90 else ('#FFB74D' if pct_ent >= 70 else '#E57373')
+
+        pct_func = row['% FUNCIONAIS']
+        cor_func = '#4CAF50' if pct_func >= 80 else ('#FFB74D' if pct_func >= 60 else '#E57373')
+
+        linhas.append(f"""
+        <tr style="border-bottom: 1px solid rgba(0,0,0,0.1);">
+            <td style="padding: 0.8rem; font-weight: 600;">{row['PROJETO']}</td>
+            <td style="padding: 0.8rem; text-align: center;">{format_number(row['TOTAL ENTREGUES'])}</td>
+            <td style="padding: 0.8rem; text-align: center; background: {cor_ent}20; color: {cor_ent}; font-weight: 700;">{pct_ent:.1f}%</td>
+            <td style="padding: 0.8rem; text-align: center;">{format_number(row['CLARO'])}</td>
+            <td style="padding: 0.8rem; text-align: center;">{format_number(row['VIVO'])}</td>
+            <td style="padding: 0.8rem; text-align: center;">{format_number(row['TIM'])}</td>
+            <td style="padding: 0.8rem; text-align: center;">{format_number(row['ALGAR'])}</td>
+            <td style="padding: 0.8rem; text-align: center;">{format_number(row['FUNCIONAIS'])}</td>
+            <td style="padding: 0.8rem; text-align: center; background: {cor_func}20; color: {cor_func}; font-weight: 700;">{pct_func:.1f}%</td>
+        </tr>
+        """)
+
+    html_final = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        {estilo}
+    </head>
+    <body>
+        <div class="container">
+            <table>
+                <thead>
+                    <tr>
+                        <th>PROJETO</th>
+                        <th>TOTAL</th>
+                        <th>% ENTREGUES</th>
+                        <th>CLARO</th>
+                        <th>VIVO</th>
+                        <th>TIM</th>
+                        <th>ALGAR</th>
+                        <th>FUNCIONAIS</th>
+                        <th>% FUNCIONAIS</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {''.join(linhas)}
+                </tbody>
+            </table>
+        </div>
+    </body>
+    </html>
+    """
+
+    return html_final
+
+
+def gerar_html_tabela_contratos(df_contratos, estilo=""):
+    """Gera HTML da tabela de contratos - ESTILO IDÊNTICO À DE ENTREGAS"""
+    if df_contratos.empty:
+        return "<p>Nenhum dado disponível</p>"
+
+    linhas = []
+    for _, row in df_contratos.iterrows():
+        status = row['STATUS ATUAL DO CONTRATO']
+
+        # Cores por status
+        if status == 'VÁLIDO':
+            cor_status = '#4CAF50'
+        elif status == 'EXPIRANDO':
+            cor_status = '#FFB74D'
+        elif status == 'EXPIRADO':
+            cor_status = '#E57373'
+        elif status == 'EM RENOVAÇÃO':
+            cor_status = '#64B5F6'
+        else:
+            cor_status = '#BDBDBD'
+
+        # Formatar datas
+        data_inicial = pd.to_datetime(row['DATA INICIAL'], errors='coerce')
+        data_inicial_fmt = data_inicial.strftime('%d/%m/%Y') if pd.notna(data_inicial) else '-'
+
+        data_renovacao = pd.to_datetime(row['DATA DA ÚLTIMA RENOVAÇÃO CONTRATUAL'], errors='coerce')
+        data_renovacao_fmt = data_renovacao.strftime('%d/%m/%Y') if pd.notna(data_renovacao) else '-'
+
+        # Formatar licenças previstas
+        try:
+            licencas = format_number(row['TOTAL DE LICENÇAS PREVISTAS'])
+        except:
+            licencas = str(row['TOTAL DE LICENÇAS PREVISTAS']) if pd.notna(row['TOTAL DE LICENÇAS PREVISTAS']) else '-'
+
+        # Formatar duração
+        duracao = f"{row['DURAÇÃO CONTRATUAL (MESES)']} m" if pd.notna(row['DURAÇÃO CONTRATUAL (MESES)']) else '-'
+
+        linhas.append(f"""
+        <tr style="border-bottom: 1px solid rgba(0,0,0,0.1);">
+            <td style="padding: 0.8rem; font-weight: 600;">{row['PROJETO']}</td>
+            <td style="padding: 0.8rem; text-align: center;">{row['FOCAL POINT 1']}</td>
+            <td style="padding: 0.8rem; text-align: center;">{row['FOCAL POINT 2']}</td>
+            <td style="padding: 0.8rem; text-align: center;">{data_inicial_fmt}</td>
+            <td style="padding: 0.8rem; text-align: center;">{row['SERVIÇOS CONTRATADOS']}</td>
+            <td style="padding: 0.8rem; text-align: center; font-weight: 700;">{licencas}</td>
+            <td style="padding: 0.8rem; text-align: center;">{data_renovacao_fmt}</td>
+            <td style="padding: 0.8rem; text-align: center;">{duracao}</td>
+            <td style="padding: 0.8rem; text-align: center; background: {cor_status}20; color: {cor_status}; font-weight: 700;">{status}</td>
+        </tr>
+        """)
+
+    html_final = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        {estilo}
+    </head>
+    <body>
+        <div class="container">
+            <table class="contratos">
+                <thead>
+                    <tr>
+                        <th>PROJETO</th>
+                        <th>FOCAL 1</th>
+                        <th>FOCAL 2</th>
+                        <th>DATA INICIAL</th>
+                        <th>SERVIÇOS</th>
+                        <th>LICENÇAS</th>
+                        <th>ÚLT. RENOVAÇÃO</th>
+                        <th>DURAÇÃO</th>
+                        <th>STATUS</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {''.join(linhas)}
+                </tbody>
+            </table>
+        </div>
+    </body>
+    </html>
+    """
+
+    return html_final
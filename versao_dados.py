@@ -0,0 +1,222 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+_hashes_conteudo = {}
+_carimbados = {}
+_lock_hashes = threading.Lock()
+
+
+def carimbo_arquivo(caminho):
+    """Versão de um arquivo de origem: muda quando o arquivo é regravado"""
+    stat = caminho.stat()
+    return hashlib.sha1(f"{caminho.name}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:12]
+
+
+def _hash_conteudo(df):
+    h = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()[:12]
+
+
+def _esquecer(chave, ref, registro):
+    # Sem o lock: o coletor pode chamar isto dentro de um trecho que já o segura.
+    # Só remove a entrada do objeto morto, não a de outro que reaproveitou o id
+    if registro.get(chave, (None,))[0] is ref:
+        registro.pop(chave, None)
+
+
+def carimbar(df, versao, **attrs):
+    """Grava a versão (e outros attrs) em `df` e registra este objeto como carimbado.
+
+    Só loaders e aplicar_filtros carimbam. O pandas copia attrs para recortes e
+    cópias, então o attr sozinho não prova nada: versao_dataset só confia nele no
+    objeto registrado aqui.
+    """
+    df.attrs['versao'] = versao
+    df.attrs.update(attrs)
+    chave = id(df)
+    ref = weakref.ref(df, lambda r, c=chave: _esquecer(c, r, _carimbados))
+    with _lock_hashes:
+        _carimbados[chave] = (ref,)
+    return df
+
+
+def carimbo(df):
+    """attrs de versão de `df` quando ele mesmo foi carimbado; {} quando herdados ou ausentes"""
+    if df is None:
+        return {}
+    with _lock_hashes:
+        registro = _carimbados.get(id(df))
+    return df.attrs if registro is not None and registro[0]() is df else {}
+
+
+def versao_dataset(df):
+    """Identificador da versão dos dados de um DataFrame.
+
+    Bases carimbadas pelos loaders trazem `attrs['versao']` (e `attrs['assinatura_filtros']`
+    quando saem de aplicar_filtros). Qualquer outro DataFrame, inclusive recortes que
+    herdaram esses attrs, usa o hash do conteúdo, memorizado enquanto o objeto existir.
+    """
+    if df is None:
+        return "vazio"
+
+    versao = carimbo(df).get('versao')
+    if versao is not None:
+        return f"{versao}:{df.attrs.get('assinatura_filtros', '')}"
+
+    chave = id(df)
+    with _lock_hashes:
+        memo = _hashes_conteudo.get(chave)
+        if memo is not None and memo[0]() is df:
+            return memo[1]
+
+    versao = _hash_conteudo(df)
+    with _lock_hashes:
+        ref = weakref.ref(df, lambda r, c=chave: _esquecer(c, r, _hashes_conteudo))
+        _hashes_conteudo[chave] = (ref, versao)
+    return versao
+
+
+_INTERROMPIDO = object()
+
+
+class LimiteConcorrencia:
+    """Semáforo que também conta quem está esperando (profundidade da fila)"""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._semaforo = threading.BoundedSemaphore(maximo)
+        self._lock = threading.Lock()
+        self.executando = 0
+        self.na_fila = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.na_fila += 1
+        try:
+            self._semaforo.acquire()
+        finally:
+            with self._lock:
+                self.na_fila -= 1
+        with self._lock:
+            self.executando += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.executando -= 1
+        self._semaforo.release()
+
+    def lotado(self):
+        return self.executando >= self.maximo
+
+    def estatisticas(self):
+        with self._lock:
+            return {'maximo': self.maximo, 'executando': self.executando, 'na_fila': self.na_fila}
+
+
+class CacheLRU:
+    """Dicionário limitado com descarte do menos usado (thread-safe).
+
+    obter_ou_calcular é single-flight: chamadas simultâneas com a mesma chave
+    esperam o mesmo cálculo em vez de repeti-lo.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+        self.acertos = 0
+        self.falhas = 0
+        self.coalescidas = 0
+
+    def __len__(self):
+        return len(self._dados)
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            if chave not in self._dados:
+                self.falhas += 1
+                return padrao
+            self.acertos += 1
+            self._dados.move_to_end(chave)
+            return self._dados[chave]
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = valor
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.maxsize:
+                self._dados.popitem(last=False)
+
+    def obter_ou_calcular(self, chave, calcular, limite=None):
+        """Valor em cache ou calculado uma única vez; `limite` (LimiteConcorrencia) só no cálculo"""
+        while True:
+            with self._lock:
+                if chave in self._dados:
+                    self.acertos += 1
+                    self._dados.move_to_end(chave)
+                    return self._dados[chave]
+                self.falhas += 1
+                futuro = self._em_andamento.get(chave)
+                lider = futuro is None
+                if lider:
+                    futuro = self._em_andamento[chave] = Future()
+                else:
+                    self.coalescidas += 1
+            if lider:
+                break
+            valor = futuro.result()
+            # Líder interrompido (ex.: rerun da sessão dele): tenta de novo, talvez como líder
+            if valor is not _INTERROMPIDO:
+                return valor
+
+        try:
+            if limite is not None:
+                with limite:
+                    valor = calcular()
+            else:
+                valor = calcular()
+        except Exception as e:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+            futuro.set_exception(e)
+            raise
+        except BaseException:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+            futuro.set_result(_INTERROMPIDO)
+            raise
+
+        self.set(chave, valor)
+        with self._lock:
+            self._em_andamento.pop(chave, None)
+        futuro.set_result(valor)
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+            self.acertos = 0
+            self.falhas = 0
+            self.coalescidas = 0
+
+    def estatisticas(self):
+        """Ocupação e taxa de acerto desde a criação (ou do último limpar)"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'itens': len(self._dados),
+                'maxsize': self.maxsize,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'coalescidas': self.coalescidas,
+                'em_andamento': len(self._em_andamento),
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            }